@@ -0,0 +1,69 @@
+"""
+Bulk-ingest resumes from a ZIP archive or a directory, from the command line.
+
+    python -m backend.ingest resumes.zip --job-id 3
+    python -m backend.ingest resumes/accepted --job-description-file jd.txt
+    python -m backend.ingest /srv/inbox --job-id 3 --watch --interval 10
+
+Runs the screening workflow in this process against the same databases as the
+backend (see core/config.py), so results show up on the dashboard. Prints one JSON
+line per file as it finishes and a totals line at the end; exits 1 if any file
+failed. With --watch it keeps polling the directory for new PDFs until interrupted.
+"""
+import argparse
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+from core.ingest import INGEST_MAX_CONCURRENCY, iter_directory, iter_zip, watch_directory
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="ZIP archive or directory of PDFs")
+    job = parser.add_mutually_exclusive_group(required=True)
+    job.add_argument("--job-id", type=int)
+    job.add_argument("--job-description", help="job description text")
+    job.add_argument("--job-description-file", type=Path)
+    parser.add_argument("--max-concurrency", type=int, default=INGEST_MAX_CONCURRENCY)
+    parser.add_argument("--no-recursive", action="store_true", help="only the directory itself, not subdirectories")
+    parser.add_argument("--watch", action="store_true", help="keep ingesting new PDFs dropped into the directory")
+    parser.add_argument("--interval", type=float, default=5.0, help="--watch polling interval, seconds")
+    args = parser.parse_args(argv)
+
+    if args.source.is_dir():
+        recursive = not args.no_recursive
+        sources = (watch_directory(args.source, args.interval, recursive) if args.watch
+                   else iter_directory(args.source, recursive))
+    elif zipfile.is_zipfile(args.source):
+        if args.watch:
+            parser.error("--watch needs a directory")
+        sources = iter_zip(args.source)
+    else:
+        parser.error(f"{args.source} is neither a directory nor a ZIP archive")
+
+    # Loads the model and opens the databases, so only after the arguments are known to be good.
+    import backend.main as backend
+
+    description = args.job_description_file.read_text() if args.job_description_file else args.job_description
+    try:
+        job_id, description = backend.resolve_job(args.job_id, description)
+    except (LookupError, ValueError) as e:
+        parser.error(str(e))
+
+    failed = 0
+    try:
+        for row in backend.ingest(sources, description, job_id, args.max_concurrency):
+            failed += row.get("status") == "error"
+            print(json.dumps(row), flush=True)
+    except KeyboardInterrupt:
+        print("Interrupted; letting in-flight runs finish.", file=sys.stderr)
+    finally:
+        backend.executor.shutdown(wait=True)
+        backend.embedding_batcher.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
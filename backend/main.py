@@ -1,26 +1,59 @@
 import os
+import asyncio
+import logging
+import json
 import shutil
+import threading
+import time
 import uuid
+import zipfile
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 import sqlite3
+import numpy as np
+from dataclasses import replace
 from datetime import datetime, timedelta
+from collections import Counter
+from typing import Iterator, List, Optional
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-import speech_recognition as sr
-from gtts import gTTS
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 
 load_dotenv()
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger("backend")
 
-from core.graph import hr_app_workflow
-from core.state import HRApplicationState
+from core.graph import hr_app_workflow, run_application
+from core.config import settings
+from core.db import DB_PATH
+from core.skills import matcher_for_job
+from core.rules import DecisionRules, rules_engine, DEFAULT_REJECTION_THRESHOLD, DEFAULT_HUMAN_REVIEW_THRESHOLD
+from core.checkpoint import run_registry, thread_id_for
+from core.tools import embedding_batcher
+from core.state import HRApplicationState, new_application_state
+from core.blob_store import blob_store, content_ref
+from core.compression import unpack_text
+from core.ingest import INGEST_MAX_CONCURRENCY, SkippedEntry, iter_directory, iter_zip, run_bounded
+from core.export import EXPORT_FORMATS, check_format, export_chunks, export_columns, iter_pages
+from core.candidates import candidate_filters, get_or_create_job, init_db, insert_candidate, insert_candidates
+from core.invites import (
+    INVITE_TOKEN_TTL_DAYS, TOKEN_EXPIRY_SQL, InviteDispatcher, build_invite_message, enqueue_invites, invite_job_status,
+    invite_link, open_smtp_session,
+)
+from core.token_cache import token_cache_from_env
+from core.retention import RetentionScheduler, expire_candidates, policy_from_env, reclaim_space, retention_status
+from core.rescoring import ats_scores, blob_to_vector, decision_diff, hybrid_scores, vector_to_blob
 from core.llm_chains import interview_chain
+from core.stt import recognizer_from_env, split_wav_header
+from core.tts import cache_from_env, stream_audio, COMMON_PHRASES, GREETING_TEMPLATE
+from core.metrics import (
+    REGISTRY, PROMETHEUS_CONTENT_TYPE, HTTP_SECONDS, QUEUE_DEPTH, WORKFLOW_SECONDS, track_stage,
+)
 from pydantic import BaseModel
 
 app = FastAPI(title="HR AI Application Backend", version="1.0.0")
@@ -38,123 +71,366 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-TEMP_FILES_DIR = Path("backend/temp_files")
-TEMP_FILES_DIR.mkdir(parents=True, exist_ok=True)
+def worker_temp_dir() -> Path:
+    """Scratch dir of this worker process; workers share settings.temp_dir and each wipes its own on shutdown."""
+    return settings.temp_dir / f"worker-{os.getpid()}"
+
+# PDFs of in-flight runs live here (not in the temp dir, which is wiped on shutdown)
+# so an interrupted run can be resumed after a restart.
+SPOOL_DIR = settings.spool_dir
+SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+
+# Workflow runs share one embedding batcher, so more workers means bigger encode batches.
+executor = ThreadPoolExecutor(max_workers=int(os.getenv("WORKFLOW_MAX_WORKERS", "4")))
+
+tts_cache = cache_from_env()
+stt_engine = recognizer_from_env()
+# Separate pool so sentence synthesis never queues behind resume workflows.
+tts_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TTS_MAX_WORKERS", "4")))
+# Sends queued bulk invites in the background, paced for the mail provider.
+invite_dispatcher = InviteDispatcher(DB_PATH)
+# Interview pages re-fetch /candidate/{token} on every Streamlit rerun.
+token_cache = token_cache_from_env()
+# Moves candidates past the hot window (RETENTION_HOT_DAYS) to the archive DB and prunes unused blobs.
+retention_policy = policy_from_env()
+retention_scheduler = RetentionScheduler(retention_policy, DB_PATH, on_change=token_cache.clear, blobs=blob_store)
+
+# Rows per page (and per response chunk) of /candidates/export.
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
 
-executor = ThreadPoolExecutor(max_workers=4) 
+inflight_workflows = 0
+# thread_id -> future, so identical concurrent uploads share one run.
+active_runs = {}
+active_runs_lock = threading.Lock()
+
+QUEUE_DEPTH.set_function(lambda: executor._work_queue.qsize(), queue="workflow_executor")
+QUEUE_DEPTH.set_function(lambda: inflight_workflows, queue="workflow_inflight")
+QUEUE_DEPTH.set_function(embedding_batcher.queue_depth, queue="embedding_batcher")
+QUEUE_DEPTH.set_function(lambda: tts_executor._work_queue.qsize(), queue="tts_executor")
+QUEUE_DEPTH.set_function(invite_dispatcher.queue_depth, queue="invite_queue")
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+# Nothing blocking runs on the event loop: handlers that only touch sqlite/SMTP/blobs are
+# plain `def` (FastAPI runs them in its threadpool), async ones offload with asyncio.to_thread.
 
 def get_executor():
     """Dependency for getting the shared ThreadPoolExecutor."""
     return executor
 
 # --- DATABASE SETUP ---
-DB_PATH = Path("..") / "hr_smarthire.db"
-if not DB_PATH.parent.exists():
-    DB_PATH = Path("hr_smarthire.db")
+init_db()
 
-def init_db():
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS candidates (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        file_name TEXT,
-        email TEXT,
-        ats_score REAL,
-        decision TEXT,
-        summary TEXT,
-        resume_text TEXT,
-        job_description TEXT,
-        token TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    # Check/Add columns if missing (simple migration)
-    try:
-        cursor.execute("SELECT token FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE candidates ADD COLUMN token TEXT")
-    
-    try:
-        cursor.execute("SELECT resume_text FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE candidates ADD COLUMN resume_text TEXT")
-        
-    try:
-        cursor.execute("SELECT job_description FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE candidates ADD COLUMN job_description TEXT")
-    
-    try:
-        cursor.execute("SELECT created_at FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        # SQLite doesn't support DEFAULT CURRENT_TIMESTAMP in ALTER TABLE
-        # Add column with NULL default, then update existing rows
-        cursor.execute("ALTER TABLE candidates ADD COLUMN created_at TIMESTAMP")
-        cursor.execute("UPDATE candidates SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
-        
-    conn.commit()
-    conn.close()
+def execute_run(thread_id: str, pdf_path: Path, job_ref: str, file_name: Optional[str] = None) -> HRApplicationState:
+    """Run/resume one candidate's checkpointed workflow and retire its spooled PDF."""
+    run_registry.start(thread_id, pdf_path, job_ref, file_name)
+    initial_state = new_application_state(pdf_path, blob_store.get(job_ref), run_id=thread_id, file_name=file_name)
+    # If this raises, the run stays 'running' and the next startup retries it.
+    final_state = run_application(initial_state, thread_id)
+    run_registry.finish(thread_id, "failed" if final_state.get("extraction_error") else "done")
+    Path(pdf_path).unlink(missing_ok=True)
+    return final_state
 
-init_db()
+def submit_run(thread_id: str, pdf_path: Path, job_ref: str, file_name: Optional[str] = None):
+    # Bulk ingestion submits from threadpool threads, not just the event loop.
+    with active_runs_lock:
+        future = active_runs.get(thread_id)
+        if future is None:
+            future = executor.submit(execute_run, thread_id, pdf_path, job_ref, file_name)
+            active_runs[thread_id] = future
+            future.add_done_callback(lambda _: active_runs.pop(thread_id, None))
+    return future
+
+@app.on_event("startup")
+async def startup_event():
+    # Runs in each worker after the (optional) preload fork, so this is the worker's pid.
+    worker_temp_dir().mkdir(parents=True, exist_ok=True)
+    # Render the fixed interviewer phrases in the background so first turns hit the cache.
+    asyncio.get_running_loop().run_in_executor(None, tts_cache.prerender, COMMON_PHRASES)
+    # Resume runs that were in flight when the previous process died.
+    for run in run_registry.incomplete():
+        if not Path(run["pdf_path"]).exists():
+            logger.warning("Cannot resume run %s: spooled PDF %s is gone.", run["thread_id"], run["pdf_path"])
+            run_registry.finish(run["thread_id"], "lost")
+            continue
+        logger.info("Resuming interrupted run %s (%s)", run["thread_id"], run["file_name"])
+        submit_run(run["thread_id"], Path(run["pdf_path"]), run["job_ref"], run["file_name"])
+    # Finish sending invites queued before a restart.
+    if invite_dispatcher.queue_depth():
+        invite_dispatcher.start()
+    retention_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("Shutting down... Cleaning up temporary files.")
-    if TEMP_FILES_DIR.exists():
-        shutil.rmtree(TEMP_FILES_DIR)
-        print(f"Cleaned up {TEMP_FILES_DIR}")
+    logger.info("Shutting down... Cleaning up temporary files.")
+    temp_dir = worker_temp_dir()
+    if temp_dir.exists():
+        shutil.rmtree(temp_dir)
+        logger.info("Cleaned up %s", temp_dir)
     executor.shutdown(wait=True)
-    print("ThreadPoolExecutor shut down.")
+    logger.info("ThreadPoolExecutor shut down.")
+    tts_executor.shutdown(wait=False, cancel_futures=True)
+    embedding_batcher.close()
+    logger.info("Embedding batcher stopped.")
+    invite_dispatcher.close()
+    retention_scheduler.close()
 
-@app.post("/process_resume/")
+class ScreeningResult(BaseModel):
+    """Slim /process_resume/ response. Large texts are returned as refs unless expanded."""
+    job_id: Optional[int] = None
+    email: str
+    ats_score: float
+    decision: Optional[str] = None
+    duplicate_of: Optional[int] = None
+    candidate_id: Optional[int] = None
+    prefilter_reason: Optional[str] = None  # set when core.prefilter rejected it early
+    resume_summary: Optional[str] = None
+    email_sent: bool = False
+    extraction_error: bool = False
+    scoring_error: bool = False
+    email_error: bool = False
+    error_message: Optional[str] = None
+    resume_ref: Optional[str] = None
+    job_ref: Optional[str] = None
+    resume_chars: int = 0
+    resume_text: Optional[str] = None
+    job_text: Optional[str] = None
+
+EXPANDABLE_FIELDS = {"resume_text": "resume_ref", "job_text": "job_ref"}
+
+def build_screening_result(final_state: HRApplicationState, expand: set, job_id: Optional[int] = None) -> ScreeningResult:
+    result = ScreeningResult(
+        job_id=job_id,
+        email=final_state.get("email", ""),
+        ats_score=final_state.get("ats_score", 0.0),
+        resume_summary=final_state.get("resume_summary"),
+        email_sent=final_state.get("email_sent", False),
+        extraction_error=final_state.get("extraction_error", False),
+        scoring_error=final_state.get("scoring_error", False),
+        email_error=final_state.get("email_error", False),
+        error_message=final_state.get("error_message"),
+        resume_ref=final_state.get("resume_ref"),
+        job_ref=final_state.get("job_ref"),
+        resume_chars=final_state.get("resume_chars", 0),
+        duplicate_of=final_state.get("duplicate_of"),
+        candidate_id=final_state.get("candidate_id"),
+        prefilter_reason=final_state.get("prefilter_reason"),
+    )
+    if not (result.extraction_error or result.scoring_error):
+        # Same per-job rules decide_next routed with, so callers never re-derive the bucket.
+        result.decision = rules_engine.for_job(job_id).decide(result.ats_score)
+    for field in expand:
+        setattr(result, field, blob_store.get(final_state.get(EXPANDABLE_FIELDS[field])))
+    return result
+
+def parse_expand(expand: str) -> set:
+    fields = {f.strip() for f in (expand or "").split(",") if f.strip()}
+    unknown = fields - set(EXPANDABLE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand field(s): {', '.join(sorted(unknown))}")
+    return fields
+
+def spool_upload(pdf_bytes: bytes, job_description: str, job_id: Optional[int] = None):
+    """Register the JD (as a job and a blob) and spool the PDF for its run. Blocking; call off the loop."""
+    if job_id is None:
+        conn = sqlite3.connect(str(DB_PATH))
+        with conn:
+            job_id = get_or_create_job(conn, job_description)
+        conn.close()
+    job_ref = blob_store.put(job_description)
+    thread_id = thread_id_for(pdf_bytes, job_ref)
+    pdf_path = SPOOL_DIR / f"{thread_id}.pdf"
+    if thread_id not in active_runs:
+        pdf_path.write_bytes(pdf_bytes)
+    return job_id, job_ref, thread_id, pdf_path
+
+@app.post("/process_resume/", response_model=ScreeningResult, response_model_exclude_none=True)
 async def process_resume(
     resume_file: UploadFile = File(...),
-    job_description: str = Form(...),
+    job_description: Optional[str] = Form(None),
+    job_id: Optional[int] = Form(None),
+    expand: str = Form(""),
     executor: ThreadPoolExecutor = Depends(get_executor)
 ):
     """
-    Processes a resume PDF against a job description using the LangGraph workflow.
+    Processes a resume PDF against a job (job_id) or an ad-hoc job description using
+    the LangGraph workflow. An ad-hoc JD is registered as a job, and the job_id is returned.
+    Pass expand=resume_text,job_text to inline the texts instead of their refs.
     """
+    expand_fields = parse_expand(expand)
     if not resume_file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
-
-    unique_filename = f"{uuid.uuid4()}_{resume_file.filename}"
-    pdf_path = TEMP_FILES_DIR / unique_filename
+    if job_id is None and not (job_description or "").strip():
+        raise HTTPException(status_code=400, detail="Provide job_id or job_description.")
+    if job_id is not None:
+        job = await asyncio.to_thread(fetch_job, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        job_description = job["description"]
 
     try:
-        with open(pdf_path, "wb") as buffer:
-            shutil.copyfileobj(resume_file.file, buffer)
-        print(f"Received and saved PDF to: {pdf_path}")
-        
-        initial_state: HRApplicationState = {
-            'pdf_path': str(pdf_path),
-            'job_text': job_description,
-            'resume_text': '',
-            'email': '',
-            'ats_score': 0.0,
-            'resume_summary': None,
-            'extraction_error': False,
-            'scoring_error': False,
-            'email_error': False,
-            'error_message': None,
-            'email_sent': False, 
-        }
+        pdf_bytes = await resume_file.read()
+        job_id, job_ref, thread_id, pdf_path = await asyncio.to_thread(
+            spool_upload, pdf_bytes, job_description, job_id
+        )
+        logger.debug("Received and spooled PDF to: %s", pdf_path)
 
-        print("Invoking LangGraph workflow in background...")
-        future = executor.submit(hr_app_workflow.invoke, initial_state)
-        final_state = future.result() 
-        print("LangGraph workflow completed.")
-        
-        return JSONResponse(content=final_state)
+        global inflight_workflows
+        inflight_workflows += 1
+        started = time.perf_counter()
+        outcome = "exception"
+        try:
+            future = submit_run(thread_id, pdf_path, job_ref, resume_file.filename)
+            # Await instead of blocking on .result() so other uploads keep flowing into the pool.
+            final_state = await asyncio.wrap_future(future)
+            outcome = "error" if final_state.get("error_message") else "ok"
+        finally:
+            inflight_workflows -= 1
+            WORKFLOW_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+        # Rules lookup and expanded texts hit sqlite.
+        return await asyncio.to_thread(build_screening_result, final_state, expand_fields, job_id)
 
     except Exception as e:
-        print(f"Unhandled error during resume processing: {e}")
+        logger.exception("Unhandled error during resume processing: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
-    finally:
-        if pdf_path.exists():
-            os.remove(pdf_path)
-            print(f"Cleaned up temporary PDF: {pdf_path}")
+
+@app.get("/texts/{ref}")
+def get_text(ref: str):
+    """Materialize a resume/JD ref returned by /process_resume/."""
+    text = blob_store.get(ref)
+    if not text:
+        raise HTTPException(status_code=404, detail="Unknown text ref.")
+    return {"ref": ref, "text": text}
+
+# --- Bulk ingestion ---
+
+def resolve_job(job_id: Optional[int], job_description: Optional[str]):
+    """(job_id, description) for a job id or an ad-hoc JD (registered as a job). Blocking."""
+    if job_id is not None:
+        job = fetch_job(job_id)
+        if job is None:
+            raise LookupError(f"Job {job_id} not found.")
+        return job_id, job["description"]
+    if not (job_description or "").strip():
+        raise ValueError("Provide job_id or job_description.")
+    conn = sqlite3.connect(str(DB_PATH))
+    with conn:
+        job_id = get_or_create_job(conn, job_description)
+    conn.close()
+    return job_id, job_description
+
+def ingest_result(name: str, final_state: Optional[HRApplicationState], error: Optional[Exception], job_id: int) -> dict:
+    if error is not None:
+        return {"file": name, "status": "skipped" if isinstance(error, SkippedEntry) else "error", "error": str(error)}
+    result = build_screening_result(final_state, set(), job_id)
+    failed = result.extraction_error or result.scoring_error
+    return {
+        "file": name,
+        "status": "error" if failed else "duplicate" if result.duplicate_of else "ok",
+        "candidate_id": result.candidate_id,
+        "ats_score": result.ats_score,
+        "decision": result.decision,
+        "duplicate_of": result.duplicate_of,
+        "prefilter_reason": result.prefilter_reason,
+        "error": result.error_message,
+    }
+
+def ingest(sources, job_description: str, job_id: int, max_concurrency: int = INGEST_MAX_CONCURRENCY) -> Iterator[dict]:
+    """
+    Screen every PDF from `sources` (core.ingest) through the same spooled, checkpointed
+    runs as /process_resume/, at most max_concurrency at a time. Yields one result per
+    file as its run finishes, then {"totals": {status: count}}. Blocking.
+    """
+    def submit(name: str, pdf_bytes: bytes):
+        _, job_ref, thread_id, pdf_path = spool_upload(pdf_bytes, job_description, job_id)
+        return submit_run(thread_id, pdf_path, job_ref, Path(name).name)
+
+    totals = Counter()
+    for name, final_state, error in run_bounded(sources, submit, max(1, min(max_concurrency, INGEST_MAX_CONCURRENCY))):
+        row = ingest_result(name, final_state, error, job_id)
+        totals[row["status"]] += 1
+        yield row
+    yield {"totals": dict(totals)}
+
+def ndjson_response(rows: Iterator[dict]) -> StreamingResponse:
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+
+@app.post("/ingest/zip")
+async def ingest_zip(
+    archive: UploadFile = File(...),
+    job_description: Optional[str] = Form(None),
+    job_id: Optional[int] = Form(None),
+    max_concurrency: int = Form(INGEST_MAX_CONCURRENCY),
+):
+    """
+    Screen every PDF in a ZIP archive. Members are decompressed one at a time as run
+    slots free up; the response streams one JSON line per file as it finishes.
+    """
+    try:
+        job_id, job_description = await asyncio.to_thread(resolve_job, job_id, job_description)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Only the archive itself is kept on disk (the upload may not outlive the request).
+    zip_path = worker_temp_dir() / f"ingest-{uuid.uuid4().hex}.zip"
+
+    def save_archive():
+        with open(zip_path, "wb") as f:
+            shutil.copyfileobj(archive.file, f)
+        return zipfile.is_zipfile(zip_path)
+
+    if not await asyncio.to_thread(save_archive):
+        zip_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Not a ZIP archive.")
+
+    def rows():
+        try:
+            yield from ingest(iter_zip(zip_path), job_description, job_id, max_concurrency)
+        finally:
+            zip_path.unlink(missing_ok=True)
+
+    return ndjson_response(rows())
+
+class IngestDirectoryRequest(BaseModel):
+    path: str = ""  # relative to HR_INGEST_ROOT
+    job_id: Optional[int] = None
+    job_description: Optional[str] = None
+    recursive: bool = True
+    max_concurrency: int = INGEST_MAX_CONCURRENCY
+
+@app.post("/ingest/directory")
+def ingest_directory(request: IngestDirectoryRequest):
+    """Screen every PDF in a directory under HR_INGEST_ROOT; streams one JSON line per file."""
+    root = (settings.ingest_root / request.path).resolve()
+    if not root.is_relative_to(settings.ingest_root):
+        raise HTTPException(status_code=400, detail="Path must be inside the ingest root.")
+    if not root.is_dir():
+        raise HTTPException(status_code=404, detail="Directory not found.")
+    try:
+        job_id, job_description = resolve_job(request.job_id, request.job_description)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ndjson_response(ingest(iter_directory(root, request.recursive), job_description, job_id, request.max_concurrency))
 
 class InterviewRequest(BaseModel):
     resume_text: str
@@ -168,12 +444,13 @@ async def interview_endpoint(request: InterviewRequest):
          raise HTTPException(status_code=500, detail="LLM not initialized.")
     
     try:
-        response = interview_chain.invoke({
-            "resume_text": request.resume_text,
-            "job_text": request.job_text,
-            "chat_history": request.chat_history,
-            "user_input": request.user_input
-        })
+        with track_stage("llm"):
+            response = await interview_chain.ainvoke({
+                "resume_text": request.resume_text,
+                "job_text": request.job_text,
+                "chat_history": request.chat_history,
+                "user_input": request.user_input
+            })
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -181,35 +458,270 @@ async def interview_endpoint(request: InterviewRequest):
 @app.post("/stt/")
 async def speech_to_text(audio_file: UploadFile = File(...)):
     try:
-        recognizer = sr.Recognizer()
-        audio_path = TEMP_FILES_DIR / f"{uuid.uuid4()}_{audio_file.filename}"
-        
-        with open(audio_path, "wb") as buffer:
-            shutil.copyfileobj(audio_file.file, buffer)
-            
-        with sr.AudioFile(str(audio_path)) as source:
-            audio_data = recognizer.record(source)
-            text = recognizer.recognize_google(audio_data)
-        
-        os.remove(audio_path)
+        # Decode straight from memory; nothing touches the temp dir.
+        wav_bytes = await audio_file.read()
+        with track_stage("stt"):
+            text = await asyncio.to_thread(stt_engine.transcribe, wav_bytes)
         return {"text": text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"STT Error: {e}")
 
+@app.websocket("/stt/stream")
+async def speech_to_text_stream(websocket: WebSocket, sample_rate: int = 16000):
+    """
+    Incremental STT. Send binary frames of mono 16-bit PCM (the first frame may carry
+    a WAV header) while recording, then the text message "end". The server replies
+    with {"partial": ...} as the engine produces them and a final {"text": ...}.
+    """
+    await websocket.accept()
+    stream = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("text") == "end":
+                break
+            chunk = message.get("bytes")
+            if not chunk:
+                continue
+            if stream is None:
+                header_rate, chunk = split_wav_header(chunk)
+                stream = stt_engine.new_stream(header_rate or sample_rate)
+            partial = await asyncio.to_thread(stream.accept, chunk)
+            if partial:
+                await websocket.send_json({"partial": partial})
+        text = await asyncio.to_thread(stream.finish) if stream else ""
+        await websocket.send_json({"text": text})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        await websocket.send_json({"error": f"STT Error: {e}"})
+        await websocket.close(code=1011)
+
 class TTSRequest(BaseModel):
     text: str
 
 @app.post("/tts/")
 async def text_to_speech(request: TTSRequest):
     try:
-        tts = gTTS(text=request.text, lang='en')
-        filename = f"{uuid.uuid4()}.mp3"
-        filepath = TEMP_FILES_DIR / filename
-        tts.save(str(filepath))
-        return FileResponse(filepath, media_type="audio/mpeg", filename=filename)
+        filepath = await asyncio.to_thread(tts_cache.get, request.text)
+        return FileResponse(filepath, media_type=tts_cache.media_type, filename=filepath.name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS Error: {e}")
 
+def _tts_stream_response(text: str) -> StreamingResponse:
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="TTS Error: text is empty.")
+    return StreamingResponse(
+        stream_audio(tts_cache, text, tts_executor),
+        media_type=tts_cache.media_type,
+        headers={"Cache-Control": "no-store"},
+    )
+
+@app.post("/tts/stream")
+async def text_to_speech_stream(request: TTSRequest):
+    """
+    Stream audio sentence by sentence (chunked transfer), so playback of the first
+    sentence starts while the rest are still being synthesized.
+    """
+    return _tts_stream_response(request.text)
+
+@app.get("/tts/stream")
+async def text_to_speech_stream_get(text: str):
+    """GET variant so a browser <audio src=...> element can play the stream directly."""
+    return _tts_stream_response(text)
+
+@app.head("/tts/stream")
+def text_to_speech_stream_head():
+    """The stream's media type (set by the TTS engine) without synthesizing anything."""
+    return Response(media_type=tts_cache.media_type, headers={"Cache-Control": "no-store"})
+
+# --- Jobs ---
+
+class JobCreate(BaseModel):
+    title: Optional[str] = None
+    description: str
+    rejection_threshold: Optional[float] = None
+    human_review_threshold: Optional[float] = None
+
+class JobUpdate(BaseModel):
+    title: Optional[str] = None
+    description: str
+
+class JobThresholds(BaseModel):
+    rejection_threshold: float
+    human_review_threshold: float
+
+JOB_COLUMNS = "id, title, description, content_hash, rejection_threshold, human_review_threshold, created_at"
+
+def fetch_job(job_id: int) -> Optional[dict]:
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id=?", (job_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+@app.post("/jobs/")
+def create_job(job: JobCreate):
+    """Create a job, or return the existing one with the same description (updating any fields given)."""
+    if job.rejection_threshold is not None and job.human_review_threshold is not None:
+        try:
+            DecisionRules(job.rejection_threshold, job.human_review_threshold)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        with conn:
+            job_id = get_or_create_job(conn, job.description, job.title)
+            conn.execute(
+                "UPDATE jobs SET title=COALESCE(?, title), rejection_threshold=COALESCE(?, rejection_threshold), "
+                "human_review_threshold=COALESCE(?, human_review_threshold) WHERE id=?",
+                (job.title, job.rejection_threshold, job.human_review_threshold, job_id),
+            )
+        conn.close()
+        rules_engine.invalidate()
+        return fetch_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB Error: {e}")
+
+@app.get("/jobs/")
+def list_jobs():
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        rows = conn.execute("""
+            SELECT j.id, j.title, j.content_hash, length(j.description), j.rejection_threshold,
+                   j.human_review_threshold, j.created_at, COUNT(c.id)
+            FROM jobs j LEFT JOIN candidates c ON c.job_id = j.id
+            GROUP BY j.id ORDER BY j.created_at DESC
+        """).fetchall()
+        conn.close()
+        return [{
+            "id": row[0],
+            "title": row[1],
+            "content_hash": row[2],
+            "description_chars": row[3],
+            "rejection_threshold": row[4],
+            "human_review_threshold": row[5],
+            "created_at": row[6],
+            "candidates": row[7],
+        } for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB Error: {e}")
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int):
+    job = fetch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    job["required_skills"] = matcher_for_job(job["description"]).required
+    return job
+
+def rescore_job(job_id: int, description: str, title: Optional[str] = None) -> dict:
+    """
+    Point a job at a (possibly edited) description and re-score its stored candidates.
+
+    Resume embeddings are cached on the candidate rows and the JD embedding on the job,
+    so only never-embedded resumes and a changed JD go through the model.
+    """
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.row_factory = sqlite3.Row
+    try:
+        job = conn.execute("SELECT description, embedding FROM jobs WHERE id=?", (job_id,)).fetchone()
+        if job is None:
+            raise LookupError(job_id)
+        content_hash = content_ref(description)
+        clash = conn.execute("SELECT id FROM jobs WHERE content_hash=? AND id<>?", (content_hash, job_id)).fetchone()
+        if clash:
+            raise ValueError(f"Job {clash[0]} already has this description.")
+
+        rows = [dict(r) for r in conn.execute(
+            "SELECT id, file_name, ats_score, decision, resume_text, resume_embedding FROM candidates WHERE job_id = ?",
+            (job_id,),
+        )]
+        for r in rows:
+            r["resume_text"] = unpack_text(r["resume_text"])
+        missing = [r for r in rows if blob_to_vector(r["resume_embedding"]) is None]
+        job_vector = blob_to_vector(job["embedding"]) if description == job["description"] else None
+        texts = [r["resume_text"] or "" for r in missing] + ([description] if job_vector is None else [])
+        if texts:
+            with track_stage("embedding"):
+                vectors = embedding_batcher.encode(texts)
+            for row, vector in zip(missing, vectors):
+                row["resume_embedding"] = vector_to_blob(vector)
+            if job_vector is None:
+                job_vector = vectors[-1]
+
+        diff = {"updates": [], "moved": [], "transitions": {}}
+        if rows:
+            resume_vectors = np.stack([blob_to_vector(r["resume_embedding"]) for r in rows])
+            scores = hybrid_scores(ats_scores(resume_vectors, job_vector), [r["resume_text"] for r in rows], description)
+            diff = decision_diff(rows, scores, rules_engine.for_job(job_id))
+
+        with conn:
+            conn.executemany(
+                "UPDATE candidates SET resume_embedding = ? WHERE id = ?",
+                [(r["resume_embedding"], r["id"]) for r in missing],
+            )
+            conn.executemany(
+                "UPDATE candidates SET ats_score = ?, decision = ? WHERE id = ?",
+                [(u["new_score"], u["new_decision"], u["id"]) for u in diff["updates"]],
+            )
+            conn.execute(
+                "UPDATE jobs SET description=?, content_hash=?, embedding=?, title=COALESCE(?, title) WHERE id=?",
+                (description, content_hash, vector_to_blob(job_vector), title, job_id),
+            )
+        rules_engine.invalidate()
+        token_cache.clear()  # cached interview pages carry the old job text
+        return {"job_id": job_id, "updated": len(diff["updates"]), "moved": diff["moved"], "summary": diff["transitions"]}
+    finally:
+        conn.close()
+
+async def _rescore(job_id: int, description: str, title: Optional[str] = None) -> dict:
+    try:
+        return await asyncio.to_thread(rescore_job, job_id, description, title)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rescore Error: {e}")
+
+@app.put("/jobs/{job_id}")
+async def update_job(job_id: int, request: JobUpdate):
+    """
+    Edit a job's description and re-score every stored candidate of that job, reporting
+    who moved between Rejected / Review / Accepted.
+    """
+    return await _rescore(job_id, request.description, request.title)
+
+@app.put("/jobs/{job_id}/thresholds")
+def update_job_thresholds(job_id: int, request: JobThresholds):
+    """
+    Change a job's decision thresholds and re-bucket its stored candidates in one
+    UPDATE over their existing scores (nothing is re-embedded).
+    """
+    try:
+        rules = DecisionRules(request.rejection_threshold, request.human_review_threshold)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fetch_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET rejection_threshold=?, human_review_threshold=? WHERE id=?",
+                (rules.rejection_threshold, rules.human_review_threshold, job_id),
+            )
+            summary = rules_engine.reapply(conn, job_id, rules)
+        conn.close()
+        rules_engine.invalidate()
+        return {"job_id": job_id, **rules.as_dict(), "summary": summary}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB Error: {e}")
+
 # --- DB & Remote Access Endpoints ---
 
 class CandidateCreate(BaseModel):
@@ -219,41 +731,74 @@ class CandidateCreate(BaseModel):
     decision: str
     summary: str
     resume_text: str
-    job_description: str
+    job_id: Optional[int] = None
+    job_description: Optional[str] = None
 
 @app.post("/candidates/")
-async def create_candidate(candidate: CandidateCreate):
+def create_candidate(candidate: CandidateCreate):
+    if candidate.job_id is None and not candidate.job_description:
+        raise HTTPException(status_code=400, detail="Provide job_id or job_description.")
     try:
         conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO candidates (file_name, email, ats_score, decision, summary, resume_text, job_description) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (candidate.file_name, candidate.email, candidate.ats_score, candidate.decision, candidate.summary, candidate.resume_text, candidate.job_description)
-        )
+        conn.execute("BEGIN IMMEDIATE")
+        job_id = candidate.job_id
+        if job_id is None:
+            job_id = get_or_create_job(conn, candidate.job_description)
+        saved = insert_candidate(conn, candidate.model_dump(), job_id)
         conn.commit()
         conn.close()
-        return {"message": "Candidate saved"}
+        message = "Duplicate candidate linked" if saved["duplicate_of"] else "Candidate saved"
+        return {"message": message, "job_id": job_id, **saved}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB Error: {e}")
+
+@app.post("/candidates/bulk")
+def create_candidates_bulk(candidates: List[CandidateCreate]):
+    """Save a batch of candidates in one transaction (one commit, one connection)."""
+    if any(c.job_id is None and not c.job_description for c in candidates):
+        raise HTTPException(status_code=400, detail="Every candidate needs job_id or job_description.")
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.execute("BEGIN IMMEDIATE")
+        job_ids_by_description = {}
+        job_ids = []
+        for candidate in candidates:
+            if candidate.job_id is None and candidate.job_description not in job_ids_by_description:
+                job_ids_by_description[candidate.job_description] = get_or_create_job(conn, candidate.job_description)
+            job_ids.append(candidate.job_id if candidate.job_id is not None else job_ids_by_description[candidate.job_description])
+        saved = insert_candidates(conn, [c.model_dump() for c in candidates], job_ids)
+        conn.commit()
+        conn.close()
+        return {
+            "message": f"Saved {len(saved)} candidates",
+            "duplicates": sum(1 for row in saved if row["duplicate_of"]),
+            "candidates": [{"job_id": job_id, **row} for job_id, row in zip(job_ids, saved)],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB Error: {e}")
 
 @app.get("/candidates/")
-async def get_candidates(days: int = None):
+def get_candidates(days: int = None, job_id: int = None, include_duplicates: bool = False,
+                   decision: str = None, min_score: float = None):
     """
     Get candidates from database.
     If days parameter is provided, only return candidates from the last X days.
     If days is None, return all candidates.
+    If job_id is provided, only return candidates screened against that job.
+    decision and min_score narrow the list to one decision / ATS scores of at least min_score.
+    Rows linked to an earlier candidate (duplicate_of) are hidden unless include_duplicates.
+    Summary and resume text are left out; fetch them per candidate from /candidates/{id}.
     """
     try:
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
-        
-        if days is None:
-            cursor.execute("SELECT id, file_name, email, ats_score, decision, summary, created_at FROM candidates ORDER BY created_at DESC")
-        else:
-            cursor.execute(
-                "SELECT id, file_name, email, ats_score, decision, summary, created_at FROM candidates WHERE created_at >= datetime('now', '-' || ? || ' days') ORDER BY created_at DESC",
-                (days,)
-            )
+
+        conditions, params = candidate_filters(days, job_id, include_duplicates, decision, min_score)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor.execute(
+            f"SELECT id, file_name, email, ats_score, decision, created_at, job_id, duplicate_of FROM candidates {where} ORDER BY created_at DESC",
+            params,
+        )
         
         rows = cursor.fetchall()
         conn.close()
@@ -266,20 +811,81 @@ async def get_candidates(days: int = None):
                 "email": row[2],
                 "ats_score": row[3],
                 "decision": row[4],
-                "summary": row[5],
-                "created_at": row[6] if len(row) > 6 else None
+                "created_at": row[5],
+                "job_id": row[6],
+                "duplicate_of": row[7],
             })
         return candidates
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB Error: {e}")
 
+@app.get("/candidates/export")
+def export_candidates(format: str = "csv", days: int = None, job_id: int = None, include_duplicates: bool = False,
+                      decision: str = None, min_score: float = None, include_resume_text: bool = False):
+    """
+    Stream the candidate list (same filters as /candidates/) as csv, jsonl or parquet.
+    Rows are read and encoded a page at a time, so memory does not grow with the table.
+    """
+    try:
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    conditions, params = candidate_filters(days, job_id, include_duplicates, decision, min_score)
+    columns = export_columns(include_resume_text)
+    pages = iter_pages(columns, conditions, params, page_size=EXPORT_PAGE_SIZE)
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_chunks(format, columns, pages),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="candidates-{datetime.now():%Y%m%d-%H%M%S}.{extension}"'},
+    )
+
+@app.get("/candidates/{candidate_id}")
+def get_candidate(candidate_id: int):
+    """One candidate with its summary and resume text (decompressed here, not in the list)."""
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            "SELECT id, file_name, email, ats_score, decision, summary, resume_text, created_at, job_id, duplicate_of "
+            "FROM candidates WHERE id=?",
+            (candidate_id,),
+        ).fetchone()
+        conn.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB Error: {e}")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Candidate not found.")
+    candidate = dict(row)
+    candidate["summary"] = unpack_text(candidate["summary"])
+    candidate["resume_text"] = unpack_text(candidate["resume_text"])
+    return candidate
+
+class RescoreRequest(BaseModel):
+    job_description: str
+    new_job_description: str
+
+def job_id_for_description(description: str) -> Optional[int]:
+    conn = sqlite3.connect(str(DB_PATH))
+    row = conn.execute("SELECT id FROM jobs WHERE content_hash=?", (content_ref(description),)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+@app.post("/candidates/rescore")
+async def rescore(request: RescoreRequest):
+    """Re-score by JD text rather than job id: the job whose description is job_description gets the new one."""
+    job_id = await asyncio.to_thread(job_id_for_description, request.job_description)
+    if job_id is None:
+        raise HTTPException(status_code=404, detail="No job with that description.")
+    return await _rescore(job_id, request.new_job_description)
+
 class InviteCandidateRequest(BaseModel):
     candidate_id: int
     name: str
     email: str
 
 @app.post("/invite_candidate/")
-async def invite_candidate(request: InviteCandidateRequest):
+def invite_candidate(request: InviteCandidateRequest):
     sender_email = os.getenv("EMAIL_SENDER")
     sender_password = os.getenv("EMAIL_PASSWORD")
     
@@ -287,100 +893,23 @@ async def invite_candidate(request: InviteCandidateRequest):
         raise HTTPException(status_code=500, detail="Email credentials not configured.")
 
     token = str(uuid.uuid4())
-    link = f"http://localhost:8501/?token={token}"
+    link = invite_link(token)
 
     try:
         # Update DB with token
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
-        cursor.execute("UPDATE candidates SET token=? WHERE id=?", (token, request.candidate_id))
+        cursor.execute(
+            f"UPDATE candidates SET token=?, token_expires_at={TOKEN_EXPIRY_SQL} WHERE id=?",
+            (token, INVITE_TOKEN_TTL_DAYS, request.candidate_id),
+        )
         conn.commit()
         conn.close()
+        token_cache.invalidate_candidates([request.candidate_id])
         
         # Send Email
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = request.email
-        msg['Subject'] = "Invitation to AI Mock Interview"
-
-        # Plain text version
-        plain_text = f"""Dear {request.name},
-
-Congratulations! You have been selected for the next round of our recruitment process.
-
-We are excited to invite you to an AI-powered mock interview. This is a unique opportunity for us to learn more about your skills and experience in an interactive format.
-
-To start your interview, please click the link below:
-{link}
-
-Please ensure you have a stable internet connection and are in a quiet environment before starting.
-
-Best regards,
-HR Team
-"""
-
-        # HTML version
-        html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; }}
-        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-        .content {{ background: white; padding: 30px; border-radius: 0 0 10px 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .footer {{ text-align: center; margin-top: 20px; font-size: 12px; color: #666; }}
-        h1 {{ margin: 0; font-size: 24px; }}
-        p {{ margin: 15px 0; }}
-        .button {{ display: inline-block; padding: 12px 24px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; font-weight: bold; margin: 20px 0; }}
-        .button:hover {{ background-color: #5a6fd6; }}
-        .note {{ background-color: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0; font-size: 14px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Interview Invitation</h1>
-        </div>
-        <div class="content">
-            <p>Dear {request.name},</p>
-            
-            <p><strong>Congratulations!</strong> You have been selected for the next round of our recruitment process.</p>
-            
-            <p>We are excited to invite you to an <strong>AI-powered mock interview</strong>. This is a unique opportunity for us to learn more about your skills and experience in an interactive format.</p>
-            
-            <div style="text-align: center;">
-                <a href="{link}" class="button">Start Interview Now</a>
-            </div>
-            
-            <p>If the button above doesn't work, you can copy and paste the following link into your browser:</p>
-            <p style="word-break: break-all; color: #667eea;">{link}</p>
-            
-            <div class="note">
-                <p style="margin: 0;"><strong>📝 Important Tips:</strong></p>
-                <ul style="margin: 10px 0; padding-left: 20px;">
-                    <li>Ensure you have a stable internet connection</li>
-                    <li>Find a quiet environment with minimal background noise</li>
-                    <li>Allow access to your microphone when prompted</li>
-                </ul>
-            </div>
-            
-            <p>Best regards,<br>
-            <strong>HR Team</strong></p>
-        </div>
-        <div class="footer">
-            <p>This is an automated message from our AI-powered recruitment system.</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-        msg.attach(MIMEText(plain_text, 'plain'))
-        msg.attach(MIMEText(html_content, 'html'))
-
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
+        msg = build_invite_message(sender_email, request.name, request.email, link)
+        server = open_smtp_session(sender_email, sender_password)
         server.send_message(msg)
         server.quit()
         
@@ -388,57 +917,139 @@ HR Team
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {e}")
 
-@app.get("/candidate/{token}")
-async def get_candidate_by_token(token: str):
+class BulkInviteRequest(BaseModel):
+    candidate_ids: List[int]
+
+@app.post("/invite_candidates/bulk")
+def invite_candidates_bulk(request: BulkInviteRequest):
+    """
+    Generate interview tokens for many candidates in one transaction and queue their
+    invites for the background sender. Returns at once with a job id to poll.
+    """
+    if not os.getenv("EMAIL_SENDER") or not os.getenv("EMAIL_PASSWORD"):
+        raise HTTPException(status_code=500, detail="Email credentials not configured.")
     try:
         conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        cursor.execute("SELECT file_name, email, resume_text, job_description FROM candidates WHERE token=?", (token,))
-        row = cursor.fetchone()
+        conn.execute("BEGIN IMMEDIATE")
+        ids = list(dict.fromkeys(request.candidate_ids))
+        rows = conn.execute(
+            f"SELECT id, file_name, email FROM candidates WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall() if ids else []
+        invitable = [row for row in rows if row[2]]
+        job_id = enqueue_invites(conn, invitable)
+        conn.commit()
         conn.close()
-        
-        if row:
-            return {
-                "name": row[0],
-                "email": row[1],
-                "resume_text": row[2],
-                "job_text": row[3]
-            }
-        else:
-            raise HTTPException(status_code=404, detail="Candidate not found or invalid token.")
+        token_cache.invalidate_candidates([row[0] for row in invitable])
+        invite_dispatcher.wake()
+        queued = {row[0] for row in invitable}
+        return {
+            "job_id": job_id,
+            "queued": len(queued),
+            "skipped": [cid for cid in ids if cid not in queued],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {e}")
+
+@app.get("/invite_jobs/{job_id}")
+def get_invite_job(job_id: str):
+    conn = sqlite3.connect(str(DB_PATH))
+    status = invite_job_status(conn, job_id)
+    conn.close()
+    if status is None:
+        raise HTTPException(status_code=404, detail="Invite job not found.")
+    return status
+
+def fetch_token_row(token: str):
+    conn = sqlite3.connect(str(DB_PATH))
+    row = conn.execute(
+        "SELECT c.id, c.file_name, c.email, c.resume_text, COALESCE(j.description, c.job_description), "
+        "CAST(strftime('%s', c.token_expires_at) AS REAL) "
+        "FROM candidates c LEFT JOIN jobs j ON j.id = c.job_id WHERE c.token=?",
+        (token,),
+    ).fetchone()
+    conn.close()
+    return row
+
+def lookup_token(token: str):
+    """
+    (entry, fetched) for an interview token: from the token cache, or read from the DB
+    and cached on a miss (fetched=True); (None, False) for an unknown token. Runs off the
+    event loop, since even a cache hit may poll the shared generation in sqlite.
+    """
+    entry = token_cache.get(token)
+    if entry is not None:
+        return entry, False
+    row = fetch_token_row(token)
+    if not row:
+        return None, False
+    return token_cache.put(token, row[0], {
+        "name": row[1],
+        "email": row[2],
+        "resume_text": unpack_text(row[3]),
+        "job_text": row[4],
+        "greeting": GREETING_TEMPLATE.format(name=row[1])
+    }, row[5]), True
+
+@app.get("/candidate/{token}")
+async def get_candidate_by_token(token: str):
+    try:
+        entry, fetched = await asyncio.to_thread(lookup_token, token)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database Error: {e}")
 
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Candidate not found or invalid token.")
+    if fetched:
+        # Warm the cache so the greeting plays without a synthesis round trip.
+        asyncio.get_running_loop().run_in_executor(None, tts_cache.prerender, [entry.payload["greeting"]])
+
+    if entry.link_expired():
+        raise HTTPException(status_code=410, detail="This interview link has expired.")
+    return entry.payload
+
 @app.post("/reset-dashboard/")
-async def reset_dashboard(days: int = None):
+def reset_dashboard(days: int = None, purge: bool = False):
     """
     Reset dashboard by clearing old candidate data.
-    If days is provided, delete candidates older than that many days.
-    If days is None, delete ALL candidates.
+    If days is provided, clear candidates older than that many days.
+    If days is None, clear ALL candidates.
+    Rows are moved to the archive DB in small batches (RETENTION_MODE), or deleted with purge=true.
     """
+    policy = replace(retention_policy, mode="delete") if purge else retention_policy
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
-        if days is None:
-            # Delete ALL candidates
-            cursor.execute("DELETE FROM candidates")
-            deleted = cursor.rowcount
-        else:
-            # Delete candidates older than X days
-            cursor.execute(
-                "DELETE FROM candidates WHERE created_at < datetime('now', '-' || ? || ' days')",
-                (days,)
-            )
-            deleted = cursor.rowcount
-        
-        conn.commit()
-        conn.close()
-        
-        return {"message": f"Dashboard reset successfully. Deleted {deleted} candidates."}
+        conn = sqlite3.connect(str(DB_PATH), timeout=30)
+        try:
+            cleared = expire_candidates(conn, days, policy, blobs=blob_store)
+            reclaim_space(conn, policy)
+        finally:
+            conn.close()
+        token_cache.clear()
+        verb = "Archived" if policy.mode == "archive" else "Deleted"
+        return {"message": f"Dashboard reset successfully. {verb} {cleared} candidates."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Reset Error: {e}")
 
+@app.get("/retention/")
+def get_retention():
+    """Retention policy, live/expired/archived row counts and free pages of the candidates DB."""
+    try:
+        return {**retention_status(retention_policy), "last_run": retention_scheduler.last_report}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Retention Error: {e}")
+
+@app.post("/retention/run")
+def run_retention_now():
+    """Run a retention pass now instead of waiting for the scheduler."""
+    try:
+        return retention_scheduler.run_once()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Retention Error: {e}")
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of workflow, stage, queue and HTTP metrics."""
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     return {"message": "HR AI Application Backend is running! Use /docs for API documentation."}
@@ -0,0 +1,285 @@
+"""
+Throughput/latency benchmark for the resume screening pipeline.
+
+Generates synthetic resume PDFs and JDs, stubs the LLM and SMTP with local fakes
+(the embedding model is real) and measures:
+
+  * stage micro-benchmarks: extract_text_from_pdf and llm_ats_score per size class
+  * end-to-end hr_app_workflow in single, threaded and batch (Runnable.batch) modes
+
+Reports resumes/sec, per-stage latency percentiles, per-resume stage cost and peak
+RSS, and saves JSON under benchmarks/results/ so runs can be compared with --compare.
+
+    python -m benchmarks.bench_pipeline --count 40 --threads 8
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/pipeline-<ts>.json
+
+To measure the pre-filter (core.prefilter), run once without and once with
+--prefilter on the same corpus and compare: the comparison shows the change in
+per-resume cost and lists resumes the pre-filter rejected that the full pipeline
+did not. --corpus screens a directory of real PDFs instead of synthetic ones.
+
+    python -m benchmarks.bench_pipeline --corpus resumes --jd-file jd.txt --modes threaded
+    python -m benchmarks.bench_pipeline --corpus resumes --jd-file jd.txt --modes threaded --prefilter \
+        --compare benchmarks/results/pipeline-<ts>.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.fakes import install_fakes
+from benchmarks.synthetic import SIZES, job_description, write_corpus
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered),
+        "p50_ms": 1000 * pick(0.50),
+        "p90_ms": 1000 * pick(0.90),
+        "p99_ms": 1000 * pick(0.99),
+        "max_ms": 1000 * ordered[-1],
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux (bytes on macOS); this suite targets Linux hosts.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class SampleCollector:
+    """Observer attached to core.metrics histograms to keep exact samples per label."""
+
+    def __init__(self, label):
+        self.label = label
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __call__(self, value, labels):
+        with self._lock:
+            self.samples[labels.get(self.label, "")].append(value)
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(list)
+
+
+def run_stage_benchmarks(corpus, jd_text):
+    from core.tools import extract_text_from_pdf, llm_ats_score
+
+    results = {}
+    for size, paths in corpus.items():
+        extract_times, score_times, texts = [], [], []
+        for path in paths:
+            start = time.perf_counter()
+            data = extract_text_from_pdf.invoke({"pdf_path": str(path)})
+            extract_times.append(time.perf_counter() - start)
+            texts.append(data["resume_text"])
+        for text in texts:
+            start = time.perf_counter()
+            llm_ats_score.invoke({"resume_text": text, "job_text": jd_text})
+            score_times.append(time.perf_counter() - start)
+        results[size] = {
+            "extract_text_from_pdf": percentiles(extract_times),
+            "llm_ats_score": percentiles(score_times),
+        }
+    return results
+
+
+def run_mode(mode, paths, jd_text, threads, collectors):
+    from core.candidates import connect
+    from core.checkpoint import run_config
+    from core.graph import hr_app_workflow
+    from core.state import new_application_state
+
+    for collector in collectors:
+        collector.reset()
+    # Same corpus every mode: clear saved candidates so no run is short-circuited as a duplicate.
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM candidate_lsh")
+        conn.execute("DELETE FROM candidates")
+    conn.close()
+    # Fresh checkpoint threads per mode so no run is short-circuited by an earlier one.
+    run_ids = [f"bench-{mode}-{i}-{time.time_ns()}" for i in range(len(paths))]
+    states = [new_application_state(path, jd_text, run_id=run_id) for path, run_id in zip(paths, run_ids)]
+    configs = [run_config(run_id) for run_id in run_ids]
+    errors = 0
+
+    start = time.perf_counter()
+    if mode == "single":
+        outputs = [hr_app_workflow.invoke(state, config) for state, config in zip(states, configs)]
+    elif mode == "threaded":
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outputs = list(pool.map(hr_app_workflow.invoke, states, configs))
+    elif mode == "batch":
+        for config in configs:
+            config["max_concurrency"] = threads
+        outputs = hr_app_workflow.batch(states, config=configs)
+    else:
+        raise ValueError(f"Unknown mode {mode}")
+    elapsed = time.perf_counter() - start
+
+    from core.rules import rules_engine
+
+    decisions = {}
+    for path, output in zip(paths, outputs):
+        if output.get("extraction_error") or output.get("scoring_error") or output.get("email_error"):
+            errors += 1
+            decisions[Path(path).name] = "error"
+        else:
+            decisions[Path(path).name] = rules_engine.for_ref(output.get("job_ref")).decide(output.get("ats_score", 0.0))
+    node_collector, stage_collector = collectors
+    return {
+        "resumes": len(paths),
+        "errors": errors,
+        "wall_seconds": elapsed,
+        "resumes_per_sec": len(paths) / elapsed if elapsed else 0.0,
+        "nodes": {node: percentiles(s) for node, s in node_collector.samples.items()},
+        "stages": {stage: percentiles(s) for stage, s in stage_collector.samples.items()},
+        # Summed stage time per resume, so early exits show up as lower cost.
+        "cost_per_resume_ms": {stage: 1000 * sum(s) / len(paths) for stage, s in stage_collector.samples.items()},
+        "llm_calls_per_resume": len(stage_collector.samples.get("llm", [])) / len(paths),
+        "prefiltered": sum(1 for output in outputs if output.get("prefilter_reason")),
+        "decisions": decisions,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous_path):
+    previous = json.loads(Path(previous_path).read_text())
+    print(f"\nComparison against {previous_path} ({previous.get('git_revision')}):")
+    for mode, result in current["modes"].items():
+        old = previous.get("modes", {}).get(mode)
+        if not old:
+            continue
+        old_rate, new_rate = old["resumes_per_sec"], result["resumes_per_sec"]
+        change = 100.0 * (new_rate - old_rate) / old_rate if old_rate else float("nan")
+        print(f"  {mode:<9} resumes/sec {old_rate:8.2f} -> {new_rate:8.2f} ({change:+.1f}%)")
+        for stage, stats in result["stages"].items():
+            old_stats = old.get("stages", {}).get(stage)
+            if old_stats:
+                print(f"      {stage:<10} p99 {old_stats['p99_ms']:8.1f}ms -> {stats['p99_ms']:8.1f}ms")
+        old_cost, new_cost = old.get("cost_per_resume_ms"), result["cost_per_resume_ms"]
+        if old_cost:
+            before, after = sum(old_cost.values()), sum(new_cost.values())
+            change = 100.0 * (after - before) / before if before else float("nan")
+            print(f"      cost/resume {before:8.1f}ms -> {after:8.1f}ms ({change:+.1f}%)")
+        # Resumes the full pipeline kept but this run rejected: what the pre-filter margin let through.
+        old_decisions = old.get("decisions", {})
+        lost = sorted(name for name, decision in result["decisions"].items()
+                      if decision == "Rejected" and old_decisions.get(name) in ("Review", "Accepted"))
+        if old_decisions:
+            print(f"      newly rejected {len(lost)}/{sum(d in ('Review', 'Accepted') for d in old_decisions.values())} "
+                  f"previously kept{': ' + ', '.join(lost[:10]) if lost else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=24, help="resumes per size class")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated size classes")
+    parser.add_argument("--modes", default="single,threaded,batch")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--jd-words", type=int, default=250)
+    parser.add_argument("--jd-file", type=Path, help="job description to screen against instead of a synthetic one")
+    parser.add_argument("--corpus", type=Path, help="directory of real resume PDFs instead of the synthetic corpus")
+    parser.add_argument("--off-topic-share", type=float, default=0.0,
+                        help="share of synthetic resumes written for unrelated roles")
+    parser.add_argument("--prefilter", action="store_true", help="enable the pre-filter stage (PREFILTER_ENABLED=1)")
+    parser.add_argument("--prefilter-margin", type=float, help="PREFILTER_MARGIN for this run")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--smtp-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.TemporaryDirectory(prefix="hr-bench-")
+    os.environ.setdefault("HR_BLOB_DB", str(Path(workdir.name) / "blobs.db"))
+    os.environ.setdefault("HR_CHECKPOINT_DB", str(Path(workdir.name) / "checkpoints.db"))
+    os.environ.setdefault("HR_DB_PATH", str(Path(workdir.name) / "candidates.db"))
+    # Read by core.graph at import, so set before it loads.
+    os.environ["PREFILTER_ENABLED"] = "1" if args.prefilter else "0"
+    if args.prefilter_margin is not None:
+        os.environ["PREFILTER_MARGIN"] = str(args.prefilter_margin)
+    install_fakes(args.llm_latency_ms, args.smtp_latency_ms)
+    import core.graph  # noqa: F401  (loads the model and compiles the graph)
+    from core.candidates import init_db
+    init_db()
+    from core.metrics import NODE_SECONDS, STAGE_SECONDS
+    install_fakes(args.llm_latency_ms, args.smtp_latency_ms)
+
+    node_collector, stage_collector = SampleCollector("node"), SampleCollector("stage")
+    NODE_SECONDS.observers.append(node_collector)
+    STAGE_SECONDS.observers.append(stage_collector)
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    jd_text = args.jd_file.read_text() if args.jd_file else job_description(args.jd_words)
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "rss_before_mb": peak_rss_mb(),
+        "modes": {},
+    }
+
+    with workdir as tmp:
+        if args.corpus:
+            corpus = {"corpus": sorted(p for p in args.corpus.rglob("*") if p.suffix.lower() == ".pdf")}
+        else:
+            # Distinct seeds per size class, so no two resumes share a candidate email.
+            corpus = {size: write_corpus(Path(tmp) / size, args.count, size, seed=i * 100_000,
+                                         off_topic_share=args.off_topic_share)
+                      for i, size in enumerate(sizes)}
+        all_paths = [p for paths in corpus.values() for p in paths]
+
+        report["stages_by_size"] = run_stage_benchmarks(corpus, jd_text)
+        for mode in [m for m in args.modes.split(",") if m]:
+            result = run_mode(mode, all_paths, jd_text, args.threads, (node_collector, stage_collector))
+            report["modes"][mode] = result
+            print(f"{mode:<9} {result['resumes']:5d} resumes  {result['resumes_per_sec']:8.2f}/s  "
+                  f"errors={result['errors']}  prefiltered={result['prefiltered']}  "
+                  f"cost/resume={sum(result['cost_per_resume_ms'].values()):.1f}ms  "
+                  f"peak_rss={result['peak_rss_mb']:.0f}MB")
+            for stage, stats in sorted(result["stages"].items()):
+                print(f"    {stage:<10} p50={stats['p50_ms']:7.1f}ms p90={stats['p90_ms']:7.1f}ms "
+                      f"p99={stats['p99_ms']:7.1f}ms")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    out_path = args.output / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {out_path}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Local stand-ins for the network back ends (Groq LLM, Gmail SMTP, gTTS).
+
+Call `install_fakes()` BEFORE importing core.graph / backend.main so that the
+module-level clients pick up the dummy credentials, then again after import to
+swap the chains in place.
+"""
+import asyncio
+import os
+import smtplib
+import sys
+import time
+
+
+class FakeLLM:
+    """Drop-in for a `prompt | llm | StrOutputParser()` chain with fixed latency."""
+
+    def __init__(self, latency_ms: float = 200.0, reply: str = "Strong Python and ML background. Good fit.",
+                 unique_replies: bool = False):
+        self.latency = latency_ms / 1000.0
+        self.reply = reply
+        # Interview turns differ in practice; unique replies keep TTS from hitting its cache.
+        self.unique_replies = unique_replies
+        self.calls = 0
+
+    def _next_reply(self):
+        self.calls += 1
+        if self.unique_replies:
+            return f"{self.reply} Question number {self.calls}: tell me more about your last project?"
+        return self.reply
+
+    def invoke(self, inputs, config=None, **kwargs):
+        time.sleep(self.latency)
+        return self._next_reply()
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._next_reply()
+
+
+class FakeSMTP:
+    """Accepts login/send_message and sleeps to mimic a provider round trip."""
+
+    latency = 0.05
+    sent = 0
+
+    def __init__(self, *args, **kwargs):
+        time.sleep(FakeSMTP.latency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, *args, **kwargs):
+        pass
+
+    def ehlo(self, *args, **kwargs):
+        pass
+
+    def login(self, *args, **kwargs):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def send_message(self, msg, *args, **kwargs):
+        time.sleep(FakeSMTP.latency)
+        FakeSMTP.sent += 1
+        return {}
+
+    def quit(self):
+        pass
+
+    close = quit
+
+
+class FakeTTSEngine:
+    """Returns a tiny silent MP3-ish payload after a fixed delay."""
+
+    media_type = "audio/mpeg"
+    extension = "mp3"
+    voice = "fake:en"
+
+    def __init__(self, latency_ms: float = 150.0):
+        self.latency = latency_ms / 1000.0
+
+    def synthesize(self, text: str) -> bytes:
+        time.sleep(self.latency)
+        return b"\xff\xfb\x90\x00" + text.encode("utf-8")[:64]
+
+
+class FakeRecognizer:
+    """STT engine that ignores the audio and returns a canned answer."""
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 100.0, text: str = "I built a recommendation system in Python."):
+        self.latency = latency_ms / 1000.0
+        self.text = text
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        time.sleep(self.latency)
+        return self.text
+
+    def new_stream(self, sample_rate: int = 16000):
+        from core.stt import BufferedStream
+
+        return BufferedStream(self, sample_rate)
+
+
+def install_fakes(llm_latency_ms: float = 200.0, smtp_latency_ms: float = 50.0, tts_latency_ms: float = 150.0):
+    """Patch credentials, SMTP, and (if already imported) LLM chains / TTS engine."""
+    os.environ.setdefault("GROQ_API_KEY", "benchmark-fake-key")
+    os.environ.setdefault("EMAIL_SENDER", "bench@example.com")
+    os.environ.setdefault("EMAIL_PASSWORD", "benchmark")
+
+    FakeSMTP.latency = smtp_latency_ms / 1000.0
+    smtplib.SMTP = FakeSMTP
+    smtplib.SMTP_SSL = FakeSMTP
+
+    llm = FakeLLM(llm_latency_ms)
+    tts = FakeTTSEngine(tts_latency_ms)
+    for module_name, attr in (
+        ("core.llm_chains", "resume_summarizer"),
+        ("core.llm_chains", "interview_chain"),
+        ("core.graph", "resume_summarizer"),
+        ("backend.main", "interview_chain"),
+    ):
+        module = sys.modules.get(module_name)
+        if module is not None and hasattr(module, attr):
+            setattr(module, attr, llm)
+    backend = sys.modules.get("backend.main")
+    if backend is not None and hasattr(backend, "tts_cache"):
+        backend.tts_cache.engine = tts
+    if backend is not None and hasattr(backend, "stt_engine"):
+        backend.stt_engine = FakeRecognizer()
+    return llm, tts
@@ -0,0 +1,293 @@
+"""
+In-process load test for the FastAPI backend.
+
+Runs backend.main:app behind httpx's ASGI transport (no sockets, no uvicorn), with
+fake LLM, SMTP, STT and TTS back ends and a throwaway SQLite DB, and replays a
+realistic mix concurrently:
+
+  * recruiter: a batch of resume uploads to /process_resume/, saving accepted and
+    review candidates via /candidates/ (like the dashboard does)
+  * N live interviews: /candidate/{token}, then turns of /stt/ -> /interview/ -> /tts/
+  * a dashboard poller hitting /candidates/
+
+Prints per-endpoint latency histograms, percentiles and error rates and saves JSON.
+Also samples event-loop lag (how late a short sleep wakes up): a blocking call in an
+async handler shows up there directly. With --max-loop-lag-ms the run exits non-zero
+when the worst stall exceeds that budget.
+
+    python -m benchmarks.load_test --interviews 50 --resumes 40 --turns 5
+    python -m benchmarks.load_test --interviews 20 --resumes 10 --max-loop-lag-ms 100
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+import wave
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_pipeline import RESULTS_DIR, git_revision, percentiles
+from benchmarks.fakes import FakeLLM, install_fakes
+from benchmarks.synthetic import SIZES, job_description, make_pdf, resume_text
+
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, client, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            code = response.status_code
+        except Exception:
+            response, code = None, "exception"
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.status[endpoint][str(code)] += 1
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+    def report(self):
+        out = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            histogram = {}
+            for bound in HISTOGRAM_BOUNDS_MS:
+                histogram[f"<={bound}ms"] = sum(1 for s in samples if s * 1000 <= bound)
+            histogram["+Inf"] = len(samples)
+            out[endpoint] = {
+                **percentiles(samples),
+                "error_rate": self.errors[endpoint] / len(samples),
+                "status": dict(self.status[endpoint]),
+                "histogram_cumulative": histogram,
+            }
+        return out
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+
+    async def run(self, stop):
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def report(self):
+        return {**percentiles(self.samples), "interval_ms": 1000 * self.interval}
+
+
+def print_report(report):
+    for endpoint, stats in report.items():
+        print(f"\n{endpoint}  n={stats['count']}  errors={stats['error_rate']:.1%}  "
+              f"p50={stats['p50_ms']:.0f}ms p90={stats['p90_ms']:.0f}ms p99={stats['p99_ms']:.0f}ms")
+        previous = 0
+        for bucket, cumulative in stats["histogram_cumulative"].items():
+            count = cumulative - previous
+            previous = cumulative
+            bar = "#" * int(40 * count / stats["count"]) if stats["count"] else ""
+            print(f"    {bucket:>9} {count:6d} {bar}")
+
+
+def silent_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def seed_interview_candidates(db_path, count, jd_text):
+    import sqlite3
+
+    from core.candidates import get_or_create_job
+
+    tokens = []
+    conn = sqlite3.connect(str(db_path))
+    job_id = get_or_create_job(conn, jd_text, "Load test")
+    for i in range(count):
+        token = str(uuid.uuid4())
+        conn.execute(
+            "INSERT INTO candidates (file_name, email, ats_score, decision, summary, resume_text, job_id, token) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (f"interviewee_{i}.pdf", f"interviewee{i}@example.com", 80.0, "Accepted", "Seeded.",
+             resume_text(SIZES["small"], 50_000 + i), job_id, token),
+        )
+        tokens.append(token)
+    conn.commit()
+    conn.close()
+    return tokens
+
+
+async def recruiter(client, recorder, pdfs, jd_text, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload(name, data):
+        async with semaphore:
+            response = await recorder.call(
+                client, "POST /process_resume/", "POST", "/process_resume/",
+                files={"resume_file": (name, data, "application/pdf")},
+                data={"job_description": jd_text, "expand": "resume_text"},
+            )
+            if response is None or response.status_code != 200:
+                return
+            result = response.json()
+            score = float(result.get("ats_score", 0))
+            decision = result.get("decision") or ("Accepted" if score >= 75 else "Review" if score >= 60 else "Rejected")
+            if decision in ("Accepted", "Review") and not result.get("candidate_id"):
+                await recorder.call(client, "POST /candidates/", "POST", "/candidates/", json={
+                    "file_name": name, "email": result.get("email", ""), "ats_score": score,
+                    "decision": decision, "summary": result.get("resume_summary") or "",
+                    "resume_text": result.get("resume_text", ""), "job_id": result.get("job_id"),
+                })
+
+    await asyncio.gather(*(upload(name, data) for name, data in pdfs))
+
+
+async def interview(client, recorder, token, turns, think_time, audio):
+    await asyncio.sleep(random.uniform(0, think_time))
+    response = await recorder.call(client, "GET /candidate/{token}", "GET", f"/candidate/{token}")
+    if response is None or response.status_code != 200:
+        return
+    candidate = response.json()
+    history = [f"Interviewer: {candidate.get('greeting', 'Hello!')}"]
+    for _ in range(turns):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+        stt = await recorder.call(client, "POST /stt/", "POST", "/stt/",
+                                  files={"audio_file": ("audio.wav", audio, "audio/wav")})
+        answer = stt.json().get("text", "") if stt is not None and stt.status_code == 200 else "No answer."
+        history.append(f"Candidate: {answer}")
+        reply = await recorder.call(client, "POST /interview/", "POST", "/interview/", json={
+            "resume_text": candidate.get("resume_text", ""),
+            "job_text": candidate.get("job_text", ""),
+            "chat_history": "\n".join(history),
+            "user_input": answer,
+        })
+        if reply is None or reply.status_code != 200:
+            continue
+        text = reply.json().get("response", "")
+        history.append(f"Interviewer: {text}")
+        await recorder.call(client, "POST /tts/", "POST", "/tts/", json={"text": text})
+
+
+async def dashboard(client, recorder, stop, interval):
+    while not stop.is_set():
+        await recorder.call(client, "GET /candidates/", "GET", "/candidates/")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args, app, db_path):
+    import httpx
+
+    recorder = Recorder()
+    lag = LoopLagMonitor(args.loop_lag_interval_ms / 1000.0)
+    jd_text = job_description(args.jd_words)
+    tokens = seed_interview_candidates(db_path, args.interviews, jd_text)
+    sizes = list(SIZES)
+    pdfs = [(f"resume_{i}.pdf", make_pdf(resume_text(SIZES[sizes[i % len(sizes)]], i))) for i in range(args.resumes)]
+    audio = silent_wav()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+        stop = asyncio.Event()
+        poller = asyncio.create_task(dashboard(client, recorder, stop, args.dashboard_interval))
+        monitor = asyncio.create_task(lag.run(stop))
+        start = time.perf_counter()
+        await asyncio.gather(
+            recruiter(client, recorder, pdfs, jd_text, args.recruiter_concurrency),
+            *(interview(client, recorder, token, args.turns, args.think_time, audio) for token in tokens),
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await poller
+        await monitor
+    return recorder, lag, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=40, help="resumes in the recruiter batch upload")
+    parser.add_argument("--recruiter-concurrency", type=int, default=4)
+    parser.add_argument("--interviews", type=int, default=50, help="concurrent live interviews")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--think-time", type=float, default=1.0, help="seconds between interview turns")
+    parser.add_argument("--dashboard-interval", type=float, default=2.0)
+    parser.add_argument("--jd-words", type=int, default=250)
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--smtp-latency-ms", type=float, default=50.0)
+    parser.add_argument("--tts-latency-ms", type=float, default=150.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loop-lag-interval-ms", type=float, default=10.0)
+    parser.add_argument("--max-loop-lag-ms", type=float, help="fail if the event loop ever stalls longer than this")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    workdir = tempfile.TemporaryDirectory(prefix="hr-load-")
+    db_path = Path(workdir.name) / "load.db"
+    os.environ["HR_DB_PATH"] = str(db_path)
+    os.environ["TTS_CACHE_DIR"] = str(Path(workdir.name) / "tts_cache")
+    os.environ["HR_BLOB_DB"] = str(Path(workdir.name) / "blobs.db")
+    os.environ["HR_CHECKPOINT_DB"] = str(Path(workdir.name) / "checkpoints.db")
+    os.environ["HR_SPOOL_DIR"] = str(Path(workdir.name) / "spool")
+    os.environ["HR_TEMP_DIR"] = str(Path(workdir.name) / "temp")
+    install_fakes(args.llm_latency_ms, args.smtp_latency_ms, args.tts_latency_ms)
+    import backend.main as backend
+
+    install_fakes(args.llm_latency_ms, args.smtp_latency_ms, args.tts_latency_ms)
+    backend.interview_chain = FakeLLM(args.llm_latency_ms, reply="Thanks for sharing.", unique_replies=True)
+
+    try:
+        recorder, lag, elapsed = asyncio.run(run(args, backend.app, db_path))
+    finally:
+        backend.executor.shutdown(wait=True)
+        workdir.cleanup()
+
+    report = recorder.report()
+    loop_lag = lag.report()
+    print(f"Load test finished in {elapsed:.1f}s")
+    print_report(report)
+    print(f"\nevent loop lag  p50={loop_lag['p50_ms']:.1f}ms p99={loop_lag['p99_ms']:.1f}ms "
+          f"max={loop_lag['max_ms']:.1f}ms")
+    args.output.mkdir(parents=True, exist_ok=True)
+    out_path = args.output / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out_path.write_text(json.dumps({
+        "benchmark": "load",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "elapsed_seconds": elapsed,
+        "endpoints": report,
+        "event_loop_lag": loop_lag,
+    }, indent=2))
+    print(f"\nSaved {out_path}")
+    if args.max_loop_lag_ms is not None and loop_lag["max_ms"] > args.max_loop_lag_ms:
+        print(f"FAIL: event loop blocked for {loop_lag['max_ms']:.1f}ms (budget {args.max_loop_lag_ms:.0f}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Per-worker memory of the embedding model across several worker processes.
+
+Starts N workers the way a multi-worker deployment would and has each one encode a
+few resumes (so every weight page is touched), then reads /proc/<pid>/smaps_rollup:
+
+  * RSS - resident pages, shared ones counted in full in every worker
+  * PSS - shared pages split evenly between the processes mapping them; the sum
+    over workers is the real memory cost
+  * USS - pages private to the worker
+
+Modes:
+  * preload (default) - the parent loads the model, gc.freeze()s, then forks (gunicorn --preload)
+  * --no-preload      - each worker is forked first and loads the model itself
+
+    python -m benchmarks.memory_profile --workers 4
+    python -m benchmarks.memory_profile --workers 4 --no-preload
+    python -m benchmarks.memory_profile --workers 4 --no-preload --no-mmap
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_pipeline import RESULTS_DIR, git_revision
+from benchmarks.synthetic import SIZES, resume_text
+
+
+def smaps_rollup_mb(pid: int) -> dict:
+    # Linux only, like the rest of the suite's memory numbers.
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "uss_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+    }
+
+
+def load_and_encode(texts):
+    from core.tools import embedding_batcher
+
+    embedding_batcher.encode(texts)
+
+
+def run_worker(ready_w: int, done_r: int, texts, preloaded: bool):
+    if not preloaded:
+        from core.tools import model  # noqa: F401  (loads the model in this process)
+    load_and_encode(texts)
+    os.write(ready_w, b"1")
+    os.read(done_r, 1)  # stay alive until the parent has measured us
+    os._exit(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="load the model in each worker")
+    parser.add_argument("--no-mmap", dest="mmap", action="store_false", help="keep weights in private memory")
+    parser.add_argument("--texts", type=int, default=8, help="resumes each worker encodes")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.TemporaryDirectory(prefix="hr-mem-")
+    os.environ.setdefault("HR_DB_PATH", str(Path(workdir.name) / "candidates.db"))
+    os.environ["EMBED_MMAP_WEIGHTS"] = "1" if args.mmap else "0"
+    texts = [resume_text(SIZES["medium"], i) for i in range(args.texts)]
+
+    parent_before = smaps_rollup_mb(os.getpid())
+    if args.preload:
+        load_and_encode(texts[:1])
+        gc.freeze()
+
+    workers = []
+    for _ in range(args.workers):
+        ready_r, ready_w = os.pipe()
+        done_r, done_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(ready_w, done_r, texts, args.preload)
+        workers.append((pid, ready_r, done_w))
+    for _, ready_r, _ in workers:
+        os.read(ready_r, 1)
+
+    per_worker = [{"pid": pid, **smaps_rollup_mb(pid)} for pid, _, _ in workers]
+    parent = smaps_rollup_mb(os.getpid())
+    for pid, _, done_w in workers:
+        os.write(done_w, b"1")
+        os.waitpid(pid, 0)
+    workdir.cleanup()
+
+    totals = {key: sum(w[key] for w in per_worker) for key in ("rss_mb", "pss_mb", "uss_mb")}
+    mode = f"{'preload' if args.preload else 'no-preload'}, {'mmap' if args.mmap else 'no-mmap'}"
+    print(f"{args.workers} workers ({mode})")
+    for w in per_worker:
+        print(f"  pid {w['pid']:>7}  rss={w['rss_mb']:7.1f}MB  pss={w['pss_mb']:7.1f}MB  "
+              f"uss={w['uss_mb']:7.1f}MB  shared={w['shared_mb']:7.1f}MB")
+    print(f"  total      rss={totals['rss_mb']:7.1f}MB  pss={totals['pss_mb']:7.1f}MB  uss={totals['uss_mb']:7.1f}MB")
+    print(f"  parent     rss={parent['rss_mb']:7.1f}MB  pss={parent['pss_mb']:7.1f}MB")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    out_path = args.output / f"memory-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out_path.write_text(json.dumps({
+        "benchmark": "memory",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "parent_before": parent_before,
+        "parent": parent,
+        "workers": per_worker,
+        "totals": totals,
+    }, indent=2))
+    print(f"\nSaved {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Synthetic resumes and job descriptions for benchmarks (no external PDF library needed)."""
+import random
+from pathlib import Path
+from typing import List
+
+SKILLS = [
+    "Python", "SQL", "Machine Learning", "Deep Learning", "PyTorch", "TensorFlow", "scikit-learn",
+    "pandas", "NumPy", "Docker", "Kubernetes", "AWS", "GCP", "Azure", "FastAPI", "Flask", "Spark",
+    "Airflow", "NLP", "Computer Vision", "LangChain", "MLOps", "Git", "Linux", "Tableau", "Power BI",
+    "Statistics", "A/B Testing", "Java", "Scala", "React", "PostgreSQL", "MongoDB", "Redis",
+]
+
+FILLER = (
+    "Designed and shipped production systems that improved reliability and reduced cost. "
+    "Collaborated with product, design and engineering teams to deliver measurable outcomes. "
+    "Mentored junior engineers and led code reviews, documentation and on-call rotations. "
+    "Built data pipelines, dashboards and experiments to inform roadmap decisions. "
+).split()
+
+# Resumes for unrelated roles, to give a pre-filter (core.prefilter) something to reject.
+OFF_TOPIC_SKILLS = [
+    "Food Safety", "Menu Planning", "Customer Service", "Inventory Control", "Cash Handling", "Forklift Operation",
+    "Staff Scheduling", "Visual Merchandising", "Bookkeeping", "Event Planning", "Housekeeping", "Catering",
+]
+
+OFF_TOPIC_FILLER = (
+    "Prepared meals for busy dinner services and kept the kitchen clean and stocked. "
+    "Greeted guests, handled payments and resolved complaints with a friendly attitude. "
+    "Trained new staff on store procedures, opening and closing checklists and safety rules. "
+    "Organised deliveries, counted stock and arranged shelves and window displays. "
+).split()
+
+# Words per size class; a PDF page holds roughly 450 words at the layout below.
+SIZES = {"small": 300, "medium": 1200, "large": 4500}
+
+
+def resume_text(words: int, seed: int, off_topic: bool = False) -> str:
+    rng = random.Random(seed)
+    pool = OFF_TOPIC_SKILLS if off_topic else SKILLS
+    filler = OFF_TOPIC_FILLER if off_topic else FILLER
+    skills = rng.sample(pool, k=min(len(pool), 6 + words // 400))
+    lines = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com  |  +1 555 {seed:04d}",
+        "Skills: " + ", ".join(skills),
+        "Experience",
+    ]
+    body = []
+    while len(body) < words:
+        body.extend(rng.sample(filler, k=12))
+        body.append(rng.choice(skills))
+    lines.append(" ".join(body[:words]))
+    return "\n".join(lines)
+
+
+def job_description(words: int, seed: int = 0) -> str:
+    rng = random.Random(10_000 + seed)
+    required = rng.sample(SKILLS, k=8)
+    text = [
+        "We are hiring a Data Scientist / ML Engineer.",
+        "Requirements: " + ", ".join(required) + ".",
+        "Responsibilities:",
+    ]
+    body = []
+    while len(body) < words:
+        body.extend(rng.sample(FILLER, k=10))
+    text.append(" ".join(body[:words]))
+    return "\n".join(text)
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines = []
+    for paragraph in text.split("\n"):
+        current = ""
+        for word in paragraph.split():
+            if current and len(current) + 1 + len(word) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        lines.append(current)
+    return lines
+
+
+def _escape_pdf(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str, lines_per_page: int = 60) -> bytes:
+    """Render text into a minimal multi-page PDF (Helvetica, text-extractable)."""
+    lines = _wrap(text)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []  # index i -> object number i + 1
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # placeholders filled once page ids are known
+    pages_id = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for page_lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        for line in page_lines:
+            ops.append(f"({_escape_pdf(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def write_corpus(directory: Path, count: int, size: str, seed: int = 0, off_topic_share: float = 0.0) -> List[Path]:
+    """Write `count` synthetic resume PDFs of a size class into directory, `off_topic_share` of them off-topic."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        off_topic = random.Random(seed + i).random() < off_topic_share
+        path = directory / f"{size}_{seed + i:05d}{'_off' if off_topic else ''}.pdf"
+        path.write_bytes(make_pdf(resume_text(SIZES[size], seed + i, off_topic)))
+        paths.append(path)
+    return paths
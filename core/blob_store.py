@@ -0,0 +1,143 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from core.config import settings
+from core.db import abandon_connection
+
+
+def content_ref(text: str) -> str:
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed text store so workflow state can carry a short ref instead of
+    the resume / job description itself.
+
+    Refs are sha256 digests, so the same JD shared by a whole batch is stored once.
+    Backed by SQLite (survives restarts, shared by worker processes) with a small
+    per-process LRU in front of it. Blobs are only needed while a run is in flight
+    (and for /texts/ lookups shortly after), so retention prunes the ones not put
+    again for a while; a put served from the LRU still refreshes last_used every
+    `touch_seconds` so a JD in constant use is never pruned.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256, touch_seconds: float = 3600.0):
+        self.path = str(path)
+        self.cache_size = cache_size
+        self.touch_seconds = touch_seconds
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._touched: Dict[str, float] = {}  # ref -> time.time() of its last DB write by this process
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            ref TEXT PRIMARY KEY,
+            body TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_last_used ON blobs(last_used)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        """Forked child: drop the inherited connection; each thread reconnects on next use."""
+        abandon_connection(getattr(self._local, "conn", None))
+        self._local = threading.local()
+
+    def put(self, text: str) -> str:
+        ref = content_ref(text)
+        now = time.time()
+        if self._cached(ref) is None or now - self._touched.get(ref, 0.0) >= self.touch_seconds:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO blobs (ref, body, size, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(ref) DO UPDATE SET last_used=excluded.last_used",
+                (ref, text, len(text), now),
+            )
+            conn.commit()
+            self._remember(ref, text)
+            with self._cache_lock:
+                self._touched[ref] = now
+        return ref
+
+    def get(self, ref: Optional[str]) -> str:
+        """Materialize a ref; unknown or empty refs yield ''."""
+        if not ref:
+            return ""
+        text = self._cached(ref)
+        if text is not None:
+            return text
+        row = self._conn().execute("SELECT body FROM blobs WHERE ref=?", (ref,)).fetchone()
+        if row is None:
+            return ""
+        self._remember(ref, row[0])
+        return row[0]
+
+    def delete(self, ref: str):
+        self.forget([ref])
+        conn = self._conn()
+        conn.execute("DELETE FROM blobs WHERE ref=?", (ref,))
+        conn.commit()
+
+    def forget(self, refs):
+        """Drop refs from this process's LRU (their rows were deleted elsewhere)."""
+        with self._cache_lock:
+            for ref in refs:
+                self._cache.pop(ref, None)
+                self._touched.pop(ref, None)
+
+    def prune(self, max_age_seconds: float, batch_size: int = 500, pause_seconds: float = 0.0) -> int:
+        """Drop blobs not written or re-put for `max_age_seconds`, `batch_size` rows per transaction."""
+        conn = self._conn()
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM blobs WHERE ref IN (SELECT ref FROM blobs WHERE last_used < ? LIMIT ?)",
+                (cutoff, batch_size),
+            )
+            conn.commit()
+            removed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+            time.sleep(pause_seconds)
+        if removed:
+            with self._cache_lock:
+                self._cache.clear()
+                self._touched.clear()
+        return removed
+
+    def _cached(self, ref: str) -> Optional[str]:
+        with self._cache_lock:
+            text = self._cache.get(ref)
+            if text is not None:
+                self._cache.move_to_end(ref)
+            return text
+
+    def _remember(self, ref: str, text: str):
+        with self._cache_lock:
+            self._cache[ref] = text
+            self._cache.move_to_end(ref)
+            while len(self._cache) > self.cache_size:
+                self._touched.pop(self._cache.popitem(last=False)[0], None)
+
+
+blob_store = BlobStore(settings.blob_db)
+os.register_at_fork(after_in_child=blob_store.after_fork)
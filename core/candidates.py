@@ -0,0 +1,239 @@
+"""
+The candidates / jobs schema and the row writes shared by the API and the workflow's
+persist_candidate stage.
+"""
+import logging
+import sqlite3
+from typing import List, Optional, Tuple
+
+from core.blob_store import content_ref
+from core.compression import COMPRESSED_COLUMNS, pack_text, unpack_text
+from core.db import DB_PATH, prepare_database
+from core.dedup import find_duplicate, fingerprint, index_candidate
+from core.invites import init_invite_tables
+from core.rules import DEFAULT_REJECTION_THRESHOLD, DEFAULT_HUMAN_REVIEW_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Fields of a candidate row as the API / workflow supply them, in insert order.
+CANDIDATE_FIELDS = ("file_name", "email", "ats_score", "decision", "summary", "resume_text")
+
+
+def connect(db_path=None) -> sqlite3.Connection:
+    return sqlite3.connect(str(db_path or DB_PATH), timeout=30)
+
+
+def get_or_create_job(conn, description: str, title: Optional[str] = None) -> int:
+    """Jobs are keyed by the JD's content hash (the same ref the workflow carries), so re-posting a JD reuses its row."""
+    content_hash = content_ref(description)
+    conn.execute(
+        "INSERT OR IGNORE INTO jobs (title, description, content_hash, rejection_threshold, human_review_threshold) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (title, description, content_hash, DEFAULT_REJECTION_THRESHOLD, DEFAULT_HUMAN_REVIEW_THRESHOLD),
+    )
+    return conn.execute("SELECT id FROM jobs WHERE content_hash=?", (content_hash,)).fetchone()[0]
+
+
+def candidate_filters(days: Optional[int] = None, job_id: Optional[int] = None, include_duplicates: bool = False,
+                      decision: Optional[str] = None, min_score: Optional[float] = None) -> Tuple[List[str], list]:
+    """SQL conditions and params for the candidate list filters (list and export endpoints)."""
+    conditions, params = [], []
+    if not include_duplicates:
+        conditions.append("duplicate_of IS NULL")
+    if days is not None:
+        conditions.append("created_at >= datetime('now', '-' || ? || ' days')")
+        params.append(days)
+    if job_id is not None:
+        conditions.append("job_id = ?")
+        params.append(job_id)
+    if decision is not None:
+        conditions.append("decision = ?")
+        params.append(decision)
+    if min_score is not None:
+        conditions.append("ats_score >= ?")
+        params.append(min_score)
+    return conditions, params
+
+
+def init_db(db_path=None):
+    prepare_database(db_path or DB_PATH)
+    conn = sqlite3.connect(str(db_path or DB_PATH))
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        description TEXT NOT NULL,
+        content_hash TEXT NOT NULL UNIQUE,
+        embedding BLOB,
+        rejection_threshold REAL NOT NULL DEFAULT 60,
+        human_review_threshold REAL NOT NULL DEFAULT 75,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_name TEXT,
+        email TEXT,
+        ats_score REAL,
+        decision TEXT,
+        summary TEXT,
+        resume_text TEXT,
+        job_description TEXT,
+        token TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    # Check/Add columns if missing (simple migration)
+    try:
+        cursor.execute("SELECT token FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN token TEXT")
+    
+    try:
+        cursor.execute("SELECT resume_text FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN resume_text TEXT")
+        
+    try:
+        cursor.execute("SELECT job_description FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN job_description TEXT")
+    
+    try:
+        cursor.execute("SELECT created_at FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        # SQLite doesn't support DEFAULT CURRENT_TIMESTAMP in ALTER TABLE
+        # Add column with NULL default, then update existing rows
+        cursor.execute("ALTER TABLE candidates ADD COLUMN created_at TIMESTAMP")
+        cursor.execute("UPDATE candidates SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    try:
+        cursor.execute("SELECT resume_embedding FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        # float32 sentence embedding of resume_text, filled lazily by re-scoring
+        cursor.execute("ALTER TABLE candidates ADD COLUMN resume_embedding BLOB")
+
+    try:
+        cursor.execute("SELECT job_id FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN job_id INTEGER REFERENCES jobs(id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_job_id ON candidates(job_id)")
+
+    # Move inline JD text into jobs: one row per distinct JD, candidates keep only job_id.
+    legacy = cursor.execute(
+        "SELECT DISTINCT job_description FROM candidates WHERE job_id IS NULL AND job_description IS NOT NULL"
+    ).fetchall()
+    for (description,) in legacy:
+        job_id = get_or_create_job(conn, description)
+        cursor.execute(
+            "UPDATE candidates SET job_id=?, job_description=NULL WHERE job_id IS NULL AND job_description=?",
+            (job_id, description),
+        )
+    if legacy:
+        logger.info("Migrated %d distinct job descriptions into the jobs table.", len(legacy))
+
+    # Dedup fingerprints (see core.dedup); duplicates point at the original via duplicate_of.
+    for column, kind in (("email_normalized", "TEXT"), ("content_hash", "TEXT"), ("minhash", "BLOB"),
+                         ("duplicate_of", "INTEGER REFERENCES candidates(id)")):
+        try:
+            cursor.execute(f"SELECT {column} FROM candidates LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute(f"ALTER TABLE candidates ADD COLUMN {column} {kind}")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_lsh (
+        job_id INTEGER NOT NULL,
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+        PRIMARY KEY (job_id, band, bucket, candidate_id)
+    ) WITHOUT ROWID
+    """)
+    # Lets retention drop a batch's buckets without scanning the whole table.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_lsh_candidate ON candidate_lsh(candidate_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_job_email ON candidates(job_id, email_normalized)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_job_content ON candidates(job_id, content_hash)")
+    unindexed = cursor.execute(
+        "SELECT id, job_id, email, resume_text FROM candidates WHERE content_hash IS NULL AND job_id IS NOT NULL"
+    ).fetchall()
+    for candidate_id, job_id, email, resume_text in unindexed:
+        index_candidate(conn, candidate_id, job_id, fingerprint(email, unpack_text(resume_text)))
+    if unindexed:
+        logger.info("Fingerprinted %d existing candidates for deduplication.", len(unindexed))
+
+    try:
+        cursor.execute("SELECT run_id FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        # Workflow thread id of the run that persisted the row; makes the persist stage idempotent.
+        cursor.execute("ALTER TABLE candidates ADD COLUMN run_id TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_candidates_run_id ON candidates(run_id)")
+
+    try:
+        cursor.execute("SELECT token_expires_at FROM candidates LIMIT 1")
+    except sqlite3.OperationalError:
+        # NULL = link never expires (tokens issued before expiry existed)
+        cursor.execute("ALTER TABLE candidates ADD COLUMN token_expires_at TIMESTAMP")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_token ON candidates(token)")
+    # Retention selects expired rows by age (core.retention).
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_created_at ON candidates(created_at)")
+
+    init_invite_tables(conn)
+        
+    conn.commit()
+    conn.close()
+
+
+def insert_candidate(conn: sqlite3.Connection, candidate: dict, job_id: int, run_id: Optional[str] = None) -> dict:
+    """
+    Insert one candidate row (resume_text / summary compressed, see core.compression).
+    A duplicate of an earlier candidate for the same job is still stored, but linked
+    via duplicate_of and left out of the dedup index.
+    Callers hold the write transaction, so check-then-insert is atomic.
+    """
+    fp = fingerprint(candidate.get("email"), candidate.get("resume_text"))
+    original = find_duplicate(conn, job_id, fp)
+    cursor = conn.execute(
+        "INSERT INTO candidates (file_name, email, ats_score, decision, summary, resume_text, job_id, duplicate_of, run_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        tuple(pack_text(candidate.get(field)) if field in COMPRESSED_COLUMNS else candidate.get(field)
+              for field in CANDIDATE_FIELDS) + (job_id, original["id"] if original else None, run_id),
+    )
+    candidate_id = cursor.lastrowid
+    if original:
+        conn.execute(
+            "UPDATE candidates SET email_normalized=?, content_hash=? WHERE id=?",
+            (fp["email_normalized"], fp["content_hash"], candidate_id),
+        )
+    else:
+        index_candidate(conn, candidate_id, job_id, fp)
+    return {
+        "id": candidate_id,
+        "duplicate_of": original["id"] if original else None,
+        "duplicate_reason": original["reason"] if original else None,
+    }
+
+
+def insert_candidates(conn: sqlite3.Connection, candidates, job_ids) -> list:
+    """
+    Insert a batch in the caller's transaction, so the whole batch costs one commit.
+    Rows are indexed as they go, so later rows dedup against earlier ones in the batch.
+    """
+    return [insert_candidate(conn, candidate, job_id) for candidate, job_id in zip(candidates, job_ids)]
+
+
+def persist_run(run_id: str, job_text: str, candidate: dict) -> dict:
+    """Save a finished workflow run's candidate once; a retried/resumed run gets the same row back."""
+    conn = connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT id, duplicate_of FROM candidates WHERE run_id=?", (run_id,)).fetchone()
+        if row:
+            conn.rollback()
+            return {"id": row[0], "duplicate_of": row[1], "duplicate_reason": None}
+        job_id = get_or_create_job(conn, job_text)
+        saved = insert_candidate(conn, candidate, job_id, run_id=run_id)
+        conn.commit()
+        return {**saved, "job_id": job_id}
+    finally:
+        conn.close()
@@ -0,0 +1,167 @@
+"""
+Durable execution for the screening workflow.
+
+* `checkpointer` - a LangGraph SqliteSaver; the compiled graph writes a checkpoint
+  after every node, keyed by a per-candidate thread id.
+* `run_registry` - which runs are in flight (and where their spooled PDF lives), so
+  a restarted backend can resume them from the last completed node, plus an email
+  ledger that keeps the email nodes idempotent across retries and resumes.
+
+Both are fork-safe: a forked worker process opens its own connections instead of
+using the ones it inherited, and only resumes runs whose owning process is gone.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from core.config import settings
+from core.db import abandon_connection
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB = str(settings.checkpoint_db)
+
+
+def thread_id_for(pdf_bytes: bytes, job_ref: str) -> str:
+    """Deterministic per-candidate thread id: same resume against the same JD -> same run."""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()[:24]
+    return f"resume-{digest}-{job_ref.split(':')[-1][:16]}"
+
+
+def run_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class RunRegistry:
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+        CREATE TABLE IF NOT EXISTS workflow_runs (
+            thread_id TEXT PRIMARY KEY,
+            file_name TEXT,
+            pdf_path TEXT NOT NULL,
+            job_ref TEXT NOT NULL,
+            status TEXT NOT NULL,
+            owner_pid INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_workflow_runs_status ON workflow_runs(status);
+        CREATE TABLE IF NOT EXISTS email_ledger (
+            thread_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            recipient TEXT,
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (thread_id, kind)
+        );
+        """)
+        try:
+            self._conn.execute("SELECT owner_pid FROM workflow_runs LIMIT 1")
+        except sqlite3.OperationalError:
+            self._conn.execute("ALTER TABLE workflow_runs ADD COLUMN owner_pid INTEGER")
+        self._conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+
+    def after_fork(self):
+        abandon_connection(self._conn)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def start(self, thread_id: str, pdf_path: str, job_ref: str, file_name: Optional[str] = None):
+        self._execute(
+            "INSERT INTO workflow_runs (thread_id, file_name, pdf_path, job_ref, status, owner_pid) "
+            "VALUES (?, ?, ?, ?, 'running', ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET status='running', pdf_path=excluded.pdf_path, "
+            "owner_pid=excluded.owner_pid, updated_at=CURRENT_TIMESTAMP",
+            (thread_id, file_name, str(pdf_path), job_ref, os.getpid()),
+        )
+
+    def finish(self, thread_id: str, status: str = "done"):
+        self._execute(
+            "UPDATE workflow_runs SET status=?, updated_at=CURRENT_TIMESTAMP WHERE thread_id=?",
+            (status, thread_id),
+        )
+
+    def incomplete(self) -> List[dict]:
+        """
+        Runs left 'running' by a process that no longer exists, each claimed for this
+        process (so sibling workers starting at the same time never resume one twice).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, file_name, pdf_path, job_ref, owner_pid FROM workflow_runs WHERE status='running'"
+            ).fetchall()
+        claimed = []
+        for thread_id, file_name, pdf_path, job_ref, owner_pid in rows:
+            if _pid_alive(owner_pid):
+                continue
+            cursor = self._execute(
+                "UPDATE workflow_runs SET owner_pid=? WHERE thread_id=? AND status='running' AND owner_pid IS ?",
+                (os.getpid(), thread_id, owner_pid),
+            )
+            if cursor.rowcount == 1:
+                claimed.append({"thread_id": thread_id, "file_name": file_name, "pdf_path": pdf_path, "job_ref": job_ref})
+        return claimed
+
+    def claim_email(self, thread_id: Optional[str], kind: str, recipient: str) -> bool:
+        """
+        Reserve the right to send `kind` for this run. Returns False if it was already
+        claimed, i.e. the email went out (or may have) before a crash/retry.
+        We prefer at-most-once: a candidate never gets the same email twice.
+        """
+        if not thread_id:
+            return True
+        cursor = self._execute(
+            "INSERT OR IGNORE INTO email_ledger (thread_id, kind, recipient) VALUES (?, ?, ?)",
+            (thread_id, kind, recipient),
+        )
+        return cursor.rowcount == 1
+
+    def release_email(self, thread_id: Optional[str], kind: str):
+        """Undo a claim after a send that definitely failed, so a retry may send it."""
+        if thread_id:
+            self._execute("DELETE FROM email_ledger WHERE thread_id=? AND kind=?", (thread_id, kind))
+
+
+checkpointer = SqliteSaver(sqlite3.connect(CHECKPOINT_DB, check_same_thread=False, timeout=30))
+checkpointer.setup()
+run_registry = RunRegistry(CHECKPOINT_DB)
+
+
+def _after_fork_in_child():
+    # A SQLite handle must not be used on both sides of a fork (e.g. gunicorn --preload).
+    abandon_connection(checkpointer.conn)
+    checkpointer.conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False, timeout=30)
+    checkpointer.lock = threading.Lock()
+    run_registry.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
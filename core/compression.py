@@ -0,0 +1,66 @@
+"""
+Transparent compression of the large text columns of `candidates` (resume_text, summary).
+
+A value is stored zlib-compressed as a BLOB once its UTF-8 encoding reaches
+TEXT_COMPRESS_MIN_BYTES, and as plain TEXT below that (or if compressing would not
+shrink it). The SQLite storage class tells the two apart, so rows written before
+compression existed read back unchanged and no flag column is needed.
+
+Readers call unpack_text only where they actually need the text (the interview
+lookup, re-scoring, dedup); list queries never select these columns.
+"""
+import os
+import sqlite3
+import time
+import zlib
+from typing import Optional, Union
+
+COMPRESS_MIN_BYTES = int(os.getenv("TEXT_COMPRESS_MIN_BYTES", "256"))
+COMPRESS_LEVEL = int(os.getenv("TEXT_COMPRESS_LEVEL", "6"))
+COMPRESSED_COLUMNS = ("resume_text", "summary")
+
+
+def pack_text(text: Optional[str]) -> Union[str, bytes, None]:
+    if not text:
+        return text
+    raw = text.encode("utf-8")
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return text
+    packed = zlib.compress(raw, COMPRESS_LEVEL)
+    return packed if len(packed) < len(raw) else text
+
+
+def unpack_text(value: Union[str, bytes, None]) -> Optional[str]:
+    if isinstance(value, (bytes, memoryview)):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+def compress_existing(conn: sqlite3.Connection, batch_size: int = 500, pause_seconds: float = 0.05) -> int:
+    """
+    Compress large TEXT values left by older versions, one batch per short write
+    transaction. Returns the number of rows rewritten.
+    """
+    large = " OR ".join(
+        f"(typeof({column})='text' AND length(CAST({column} AS BLOB)) >= :min_bytes)" for column in COMPRESSED_COLUMNS
+    )
+    select = (f"SELECT id, {', '.join(COMPRESSED_COLUMNS)} FROM candidates "
+              f"WHERE id > :after AND ({large}) ORDER BY id LIMIT :limit")
+    update = f"UPDATE candidates SET {', '.join(f'{c}=?' for c in COMPRESSED_COLUMNS)} WHERE id=?"
+    rewritten, after = 0, 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(select, {"after": after, "min_bytes": COMPRESS_MIN_BYTES, "limit": batch_size}).fetchall()
+            if not rows:
+                conn.rollback()
+                break
+            conn.executemany(update, [tuple(pack_text(unpack_text(v)) for v in row[1:]) + (row[0],) for row in rows])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        rewritten += len(rows)
+        after = rows[-1][0]
+        time.sleep(pause_seconds)
+    return rewritten
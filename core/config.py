@@ -0,0 +1,87 @@
+"""
+Process-independent settings.
+
+Every path is resolved to an absolute one when the settings are built, so the backend
+finds the same databases and directories no matter which directory it is started
+from, and every worker of a multi-process deployment agrees on them. Relative values
+given in the environment are taken relative to HR_DATA_DIR (default: the repo root).
+Older versions kept the candidates DB at ../hr_smarthire.db relative to the working
+directory; with neither HR_DATA_DIR nor HR_DB_PATH set, that file is still used if
+it exists and the new default does not.
+The directories holding the SQLite databases are created along with the settings,
+since sqlite3.connect() does not create them.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DB_NAME = "hr_smarthire.db"
+
+logger = logging.getLogger(__name__)
+
+
+def _path(base: Path, env: str, default: str) -> Path:
+    return (base / os.getenv(env, default)).expanduser().resolve()
+
+
+def _db_path(data_dir: Path) -> Path:
+    db_path = _path(data_dir, "HR_DB_PATH", DB_NAME)
+    if "HR_DB_PATH" in os.environ or "HR_DATA_DIR" in os.environ or db_path.exists():
+        return db_path
+    legacy = (Path.cwd().parent / DB_NAME).resolve()
+    if legacy.exists():
+        logger.warning("Using the candidates DB at its old location %s; move it to %s or set HR_DB_PATH.",
+                       legacy, db_path)
+        return legacy
+    return db_path
+
+
+@dataclass(frozen=True)
+class Settings:
+    data_dir: Path
+    db_path: Path
+    blob_db: Path
+    checkpoint_db: Path
+    archive_db: Path
+    spool_dir: Path
+    temp_dir: Path
+    tts_cache_dir: Path
+    # Directories the /ingest/directory endpoint may read resumes from.
+    ingest_root: Path
+    # Memory-mappable copy of the embedding model's weights (see core.embedding_service.load_model).
+    model_dir: Path
+    # Worker processes in the multi-worker mode (gunicorn.conf.py).
+    workers: int
+    # How stale another worker's cache invalidation may be seen, in seconds.
+    shared_state_poll_seconds: float
+
+    @property
+    def databases(self):
+        return (self.db_path, self.blob_db, self.checkpoint_db, self.archive_db)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        data_dir = Path(os.getenv("HR_DATA_DIR", str(REPO_ROOT))).expanduser().resolve()
+        settings = cls(
+            data_dir=data_dir,
+            db_path=_db_path(data_dir),
+            blob_db=_path(data_dir, "HR_BLOB_DB", "hr_blobs.db"),
+            checkpoint_db=_path(data_dir, "HR_CHECKPOINT_DB", "hr_checkpoints.db"),
+            archive_db=_path(data_dir, "HR_ARCHIVE_DB", "hr_archive.db"),
+            spool_dir=_path(data_dir, "HR_SPOOL_DIR", "backend/spool"),
+            temp_dir=_path(data_dir, "HR_TEMP_DIR", "backend/temp_files"),
+            tts_cache_dir=_path(data_dir, "TTS_CACHE_DIR", "backend/tts_cache"),
+            ingest_root=_path(data_dir, "HR_INGEST_ROOT", "resumes"),
+            model_dir=_path(data_dir, "HR_MODEL_DIR", "models"),
+            workers=max(1, int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))),
+            shared_state_poll_seconds=float(os.getenv("SHARED_STATE_POLL_SECONDS", "1.0")),
+        )
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for path in settings.databases:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        return settings
+
+
+settings = Settings.from_env()
@@ -0,0 +1,33 @@
+import sqlite3
+
+from core.config import settings
+
+# Shared by the backend and anything in core that reads candidate/job rows.
+DB_PATH = settings.db_path
+
+# Connections a forked child inherited from its parent. They are never used again and
+# never closed: closing them in the child could disturb the parent's locks on the file.
+_inherited_connections = []
+
+
+def abandon_connection(conn):
+    if conn is not None:
+        _inherited_connections.append(conn)
+
+
+def prepare_database(path):
+    """
+    Give a new, empty database auto_vacuum=INCREMENTAL (see core.retention). SQLite
+    only takes the setting while the file holds no tables (or through a full VACUUM),
+    so this runs before any module creates one.
+    """
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")  # writes the header, so the setting sticks before the first table
+    finally:
+        conn.close()
+
+
+prepare_database(DB_PATH)
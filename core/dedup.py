@@ -0,0 +1,152 @@
+"""
+Duplicate candidate detection.
+
+A candidate is a duplicate of an earlier one for the same job when any of these hold:
+  * same normalized email
+  * same normalized resume text (content hash)
+  * near-identical resume text: MinHash over word shingles, bucketed with LSH into the
+    indexed `candidate_lsh` table, confirmed by the estimated Jaccard similarity.
+
+Every check is an indexed lookup, so the cost does not grow with the table size.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from core.compression import unpack_text
+from core.db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+JACCARD_THRESHOLD = float(os.getenv("DEDUP_JACCARD_THRESHOLD", "0.85"))
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240611)  # fixed: signatures are persisted and compared across processes
+_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """Lower-case and drop a +tag, so Jane+jobs@x.com and jane@x.com collide."""
+    email = (email or "").strip().lower()
+    local, at, domain = email.partition("@")
+    if not at:
+        return email
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+
+def content_hash(text: Optional[str]) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def minhash(text: Optional[str]) -> np.ndarray:
+    words = normalize_text(text).split()
+    span = min(SHINGLE_WORDS, len(words)) or 1
+    shingles = {zlib.crc32(" ".join(words[i:i + span]).encode("utf-8")) for i in range(max(len(words) - span + 1, 0))}
+    if not shingles:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    # (a*x + b) mod p per permutation; a < 2^31 and x < 2^32 keep this within uint64.
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def lsh_buckets(signature: np.ndarray):
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+def fingerprint(email: Optional[str], resume_text: Optional[str]) -> dict:
+    """
+    Empty resumes get no content fingerprint, so they never match each other. Their
+    content_hash is "" rather than NULL, which marks the row as already fingerprinted.
+    """
+    has_text = bool(normalize_text(resume_text))
+    return {
+        "email_normalized": normalize_email(email),
+        "content_hash": content_hash(resume_text) if has_text else "",
+        "minhash": minhash(resume_text) if has_text else None,
+    }
+
+
+def find_duplicate(conn: sqlite3.Connection, job_id: int, fp: dict) -> Optional[dict]:
+    """Earliest original (non-duplicate) candidate of `job_id` matching `fp`, with the reason."""
+    columns = "id, ats_score, decision, summary"
+    checks = [("email", "email_normalized", fp["email_normalized"]), ("content", "content_hash", fp["content_hash"])]
+    for reason, column, value in checks:
+        if not value:
+            continue
+        row = conn.execute(
+            f"SELECT {columns} FROM candidates WHERE job_id=? AND {column}=? AND duplicate_of IS NULL ORDER BY id LIMIT 1",
+            (job_id, value),
+        ).fetchone()
+        if row:
+            return {"id": row[0], "ats_score": row[1], "decision": row[2], "summary": unpack_text(row[3]), "reason": reason}
+    if fp["minhash"] is None:
+        return None
+
+    buckets = list(lsh_buckets(fp["minhash"]))
+    values = ", ".join(["(?, ?)"] * len(buckets))
+    params = [value for bucket in buckets for value in bucket]
+    # Driving the join from the probe buckets keeps it to one primary-key seek per band.
+    rows = conn.execute(
+        f"WITH probe(band, bucket) AS (VALUES {values}) "
+        f"SELECT DISTINCT c.id, c.ats_score, c.decision, c.summary, c.minhash FROM probe "
+        f"JOIN candidate_lsh l ON l.job_id=? AND l.band=probe.band AND l.bucket=probe.bucket "
+        f"JOIN candidates c ON c.id = l.candidate_id "
+        f"WHERE c.duplicate_of IS NULL ORDER BY c.id",
+        params + [job_id],
+    ).fetchall()
+    for row in rows:
+        if row[4] and jaccard(fp["minhash"], np.frombuffer(row[4], dtype=np.uint32)) >= JACCARD_THRESHOLD:
+            return {"id": row[0], "ats_score": row[1], "decision": row[2], "summary": unpack_text(row[3]), "reason": "near_duplicate"}
+    return None
+
+
+def index_candidate(conn: sqlite3.Connection, candidate_id: int, job_id: int, fp: dict):
+    """Store the fingerprint on the row and register its LSH buckets (originals only)."""
+    signature = fp["minhash"]
+    conn.execute(
+        "UPDATE candidates SET email_normalized=?, content_hash=?, minhash=? WHERE id=?",
+        (fp["email_normalized"], fp["content_hash"], signature.tobytes() if signature is not None else None, candidate_id),
+    )
+    if signature is None:
+        return
+    conn.executemany(
+        "INSERT OR IGNORE INTO candidate_lsh (job_id, band, bucket, candidate_id) VALUES (?, ?, ?, ?)",
+        [(job_id, band, bucket, candidate_id) for band, bucket in lsh_buckets(signature)],
+    )
+
+
+def lookup_duplicate(job_ref: Optional[str], email: Optional[str], resume_text: Optional[str]) -> Optional[dict]:
+    """find_duplicate for workflow state (which carries the JD's content ref, not a job id)."""
+    if not job_ref or not resume_text:
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        try:
+            job = conn.execute("SELECT id FROM jobs WHERE content_hash=?", (job_ref,)).fetchone()
+            return find_duplicate(conn, job[0], fingerprint(email, resume_text)) if job else None
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        logger.debug("Duplicate lookup unavailable (%s).", e)
+        return None
@@ -0,0 +1,174 @@
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+EMBED_MMAP_WEIGHTS = os.getenv("EMBED_MMAP_WEIGHTS", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _mmap_weights(model, path: Path):
+    """
+    Re-point the model's parameters at a memory-mapped copy of its weights.
+
+    The weights file is written once (atomically) by the first process that needs it.
+    Every process that maps it shares the same page-cache pages, whether it was forked
+    from a preloaded parent or started on its own, so N workers hold one physical copy
+    instead of N private ones.
+    """
+    import torch
+
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        os.close(fd)
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+    state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    # assign=True keeps the mapped tensors instead of copying them into the existing ones.
+    model.load_state_dict(state, assign=True)
+    for parameter in model.parameters():
+        parameter.requires_grad_(False)  # inference only; the mapping is never written
+
+
+def load_model(name: str = EMBED_MODEL, mmap_weights: bool = EMBED_MMAP_WEIGHTS):
+    """Load the SentenceTransformer; on CPU, serve its weights from a shared memory map."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(name)
+    if mmap_weights and model.device.type == "cpu":
+        path = settings.model_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.pt"
+        try:
+            _mmap_weights(model, path)
+            logger.info("Embedding weights memory-mapped from %s", path)
+        except Exception as e:
+            # Stale/foreign file or an older torch: keep the private in-memory weights.
+            logger.warning("Could not memory-map embedding weights from %s (%s); using in-memory weights.", path, e)
+    model.eval()
+    return model
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for a SentenceTransformer model.
+
+    Concurrent callers submit their texts and get a Future back. A single worker
+    thread collects requests for up to `max_wait_ms` (or until `max_batch_size`
+    texts are queued), runs one `model.encode` over the whole batch and hands each
+    caller its own slice of the resulting vectors.
+
+    Threads do not survive fork(), so a batcher inherited by a forked worker process
+    starts a fresh queue and worker thread on first use.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._pid = os.getpid()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding. The Future resolves to an (n, dim) array."""
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0), dtype=np.float32))
+            return future
+        if self._closed:
+            raise RuntimeError("EmbeddingBatcher is closed.")
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: List[str], timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking helper: submit texts and wait for their embeddings."""
+        return self.submit(texts).result(timeout=timeout)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # Forked: the parent's worker thread and anything queued for it stay behind.
+            self._queue = queue.Queue()
+            self._lock = threading.Lock()
+            self._worker = None
+            self._pid = os.getpid()
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the shutdown marker back so the run loop sees it after this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            pending = [(texts, fut) for texts, fut in batch if fut.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            all_texts = [text for texts, _ in pending for text in texts]
+            try:
+                vectors = self.model.encode(all_texts, batch_size=len(all_texts), convert_to_numpy=True)
+            except Exception as e:
+                for _, fut in pending:
+                    fut.set_exception(e)
+                continue
+            offset = 0
+            for texts, fut in pending:
+                fut.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+
+
+def batcher_from_env(model) -> EmbeddingBatcher:
+    """Build a batcher using EMBED_MAX_BATCH_SIZE / EMBED_MAX_WAIT_MS from the environment."""
+    return EmbeddingBatcher(
+        model,
+        max_batch_size=int(os.getenv("EMBED_MAX_BATCH_SIZE", "32")),
+        max_wait_ms=float(os.getenv("EMBED_MAX_WAIT_MS", "5")),
+    )
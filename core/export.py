@@ -0,0 +1,127 @@
+"""
+Streaming export of screening results as CSV, JSON Lines or Parquet.
+
+Rows are read newest first in keyset pages (`id < last id`), each page its own short
+query, so memory stays at one page whatever the table size and no read lock is held
+on the candidates DB while a slow client downloads. Every page is encoded and
+yielded as one chunk of the response body.
+"""
+import csv
+import io
+import json
+import sqlite3
+from typing import Iterator, List, Sequence
+
+from core.compression import unpack_text
+from core.db import DB_PATH
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+EXPORT_COLUMNS = ("id", "file_name", "email", "ats_score", "decision", "summary", "created_at", "job_id", "duplicate_of")
+TEXT_COLUMNS = {"summary", "resume_text"}
+
+
+def check_format(fmt: str):
+    """Raise ValueError for an unknown format, or parquet without pyarrow installed."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(EXPORT_FORMATS)}.")
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow).")
+
+
+def export_columns(include_resume_text: bool = False) -> List[str]:
+    return list(EXPORT_COLUMNS) + (["resume_text"] if include_resume_text else [])
+
+
+def iter_pages(columns: Sequence[str], conditions: List[str], params: list, page_size: int = 1000,
+               db_path=None) -> Iterator[List[dict]]:
+    """Candidate rows matching `conditions`, newest first, `page_size` rows at a time."""
+    select = f"SELECT {', '.join(columns)} FROM candidates WHERE {' AND '.join(conditions + ['id < ?'])} " \
+             f"ORDER BY id DESC LIMIT ?"
+    last_id = 2 ** 63 - 1  # above any rowid
+    while True:
+        conn = sqlite3.connect(str(db_path or DB_PATH), timeout=30)
+        try:
+            rows = conn.execute(select, params + [last_id, page_size]).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+        page = [dict(zip(columns, row)) for row in rows]
+        for row in page:
+            for column in TEXT_COLUMNS.intersection(row):
+                row[column] = unpack_text(row[column])
+        yield page
+        last_id = rows[-1][0]
+        if len(rows) < page_size:
+            return
+
+
+def csv_chunks(pages: Iterator[List[dict]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(page)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def jsonl_chunks(pages: Iterator[List[dict]]) -> Iterator[bytes]:
+    for page in pages:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in page).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def parquet_chunks(pages: Iterator[List[dict]], columns: Sequence[str]) -> Iterator[bytes]:
+    """One Parquet row group per page; the footer goes out after the last one."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"id": pa.int64(), "ats_score": pa.float64(), "job_id": pa.int64(), "duplicate_of": pa.int64()}
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for page in pages:
+            writer.write_table(pa.Table.from_pylist(page, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_chunks(fmt: str, columns: Sequence[str], pages: Iterator[List[dict]]) -> Iterator[bytes]:
+    if fmt == "csv":
+        return csv_chunks(pages, columns)
+    if fmt == "jsonl":
+        return jsonl_chunks(pages)
+    check_format(fmt)
+    return parquet_chunks(pages, columns)
@@ -1,8 +1,14 @@
+import logging
+import os
+import sqlite3
+
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional
 
 from core.state import HRApplicationState
 from core.tools import (
+    EMAIL_PATTERN,
+    embedding_batcher,
     extract_text_from_pdf,
     llm_ats_score,
     send_rejection_email,
@@ -10,199 +16,267 @@ from core.tools import (
     send_review_email,
 )
 from core.llm_chains import resume_summarizer
+from core.blob_store import blob_store
+from core.checkpoint import checkpointer, run_config, run_registry
+from core.metrics import instrument_node, track_stage
+from core.rules import rules_engine
+from core.dedup import lookup_duplicate
+from core.candidates import persist_run
+from core.prefilter import PREFILTER_DECISIONS, evaluate, policy_from_env, read_first_pages
+
+logger = logging.getLogger(__name__)
 
+prefilter_policy = policy_from_env()
 
+
+@instrument_node("prefilter")
+def prefilter_node(state: HRApplicationState) -> HRApplicationState:
+    """Reject clearly unqualified resumes from their first pages (core.prefilter), if enabled."""
+    if not prefilter_policy.enabled:
+        return {}
+    try:
+        text, page_count = read_first_pages(state["pdf_path"], prefilter_policy.pages)
+    except Exception as e:
+        # Unreadable here means unreadable for extract_resume too; it reports the error.
+        logger.debug("Pre-filter could not read %s: %s", state.get("pdf_path"), e)
+        return {}
+    job_text = blob_store.get(state.get("job_ref"))
+    threshold = rules_engine.for_ref(state.get("job_ref")).rejection_threshold
+    verdict = evaluate(text, page_count, job_text, threshold, prefilter_policy, embedding_batcher.encode)
+    PREFILTER_DECISIONS.inc(outcome=verdict["reason"] or "passed")
+    if verdict["reason"] is None:
+        return {}
+    logger.info("Pre-filter rejected %s (%s, estimate %s).", state.get("file_name") or state.get("pdf_path"),
+                verdict["reason"], verdict["estimate"])
+    email_match = EMAIL_PATTERN.search(text)
+    updated_state: HRApplicationState = {
+        "prefilter_reason": verdict["reason"],
+        "resume_ref": blob_store.put(text),
+        "resume_chars": len(text),
+        "email": email_match.group(0) if email_match else "",
+        "ats_score": verdict["estimate"] or 0.0,
+    }
+    return updated_state
+
+
+@instrument_node("extract_resume")
 def extract_resume_node(state: HRApplicationState) -> HRApplicationState:
     """Extract text and email from the PDF resume."""
-    print(f"--- Node: extract_resume --- Processing {state.get('pdf_path', 'N/A')}")
+    logger.debug("extract_resume: %s", state.get("pdf_path", "N/A"))
     pdf_path = state["pdf_path"]
     extracted_data = extract_text_from_pdf.invoke({"pdf_path": pdf_path})
+    resume_text = extracted_data.get("resume_text", "")
+    error_message = extracted_data.get("error_message", None)
     updated_state: HRApplicationState = {
-        **state,
-        "resume_text": extracted_data.get("resume_text", ""),
+        "resume_ref": blob_store.put(resume_text) if resume_text else None,
+        "resume_chars": len(resume_text),
         "email": extracted_data.get("email", ""),
         "extraction_error": extracted_data.get("extraction_error", False),
-        "error_message": extracted_data.get("error_message", None),
+        "error_message": str(error_message) if error_message is not None else None,
+    }
+    return updated_state
+
+
+@instrument_node("check_duplicate")
+def check_duplicate_node(state: HRApplicationState) -> HRApplicationState:
+    """Link to an earlier candidate for the same job instead of scoring and emailing again."""
+    original = lookup_duplicate(state.get("job_ref"), state.get("email"), blob_store.get(state.get("resume_ref")))
+    if original is None:
+        return {"duplicate_of": None}
+    logger.info("Resume matches candidate %s (%s); skipping the rest of the pipeline.", original["id"], original["reason"])
+    updated_state: HRApplicationState = {
+        "duplicate_of": original["id"],
+        "ats_score": original["ats_score"] or 0.0,
+        "resume_summary": original["summary"],
+        "prefilter_reason": None,  # the original's result stands, not the early rejection
     }
-    print(f"Node: extract_resume finished. State update: {updated_state}")
     return updated_state
 
 
+@instrument_node("ats_scorer")
 def ats_scorer_node(state: HRApplicationState) -> HRApplicationState:
     """Compute ATS compatibility score."""
-    print("--- Node: ats_scorer ---")
     if state.get("extraction_error"):
-        print("Skipping ATS scoring due to prior extraction error.")
+        logger.info("Skipping ATS scoring due to prior extraction error.")
         updated_state: HRApplicationState = {
-            **state,
             "scoring_error": True,
             "error_message": "Skipped ATS scoring due to extraction error.",
         }
-        print(f"Node: ats_scorer skipped. State update: {updated_state}")
         return updated_state
 
-    resume_text = state.get("resume_text", "")
-    job_text = state.get("job_text", "")
+    resume_text = blob_store.get(state.get("resume_ref"))
+    job_text = blob_store.get(state.get("job_ref"))
     if not resume_text or not job_text:
         error_msg = "'resume_text' or 'job_text' is missing for ATS scoring."
-        print(error_msg)
+        logger.warning(error_msg)
         updated_state: HRApplicationState = {
-            **state,
             "ats_score": 0.0,
             "scoring_error": True,
             "error_message": error_msg,
         }
-        print(f"Node: ats_scorer error. State update: {updated_state}")
         return updated_state
 
     score_data = llm_ats_score.invoke({"resume_text": resume_text, "job_text": job_text})
     updated_state: HRApplicationState = {
-        **state,
         "ats_score": score_data.get("ats_score", 0.0),
         "scoring_error": score_data.get("scoring_error", False),
-        "error_message": score_data.get("error_message", None),
+        "error_message": str(score_data["error_message"]) if score_data.get("error_message") is not None else None,
     }
-    print(f"Node: ats_scorer finished. State update: {updated_state}")
     return updated_state
 
 
+@instrument_node("summarize_resume")
 def summarize_resume_node(state: HRApplicationState) -> HRApplicationState:
     """Summarize the resume using an LLM."""
-    print("--- Node: summarize_resume ---")
     if state.get("extraction_error") or state.get("scoring_error"):
-        print("Skipping resume summarization due to prior errors.")
-        updated_state: HRApplicationState = {**state, "resume_summary": None}
-        print(f"Node: summarize_resume skipped. State update: {updated_state}")
+        logger.info("Skipping resume summarization due to prior errors.")
+        updated_state: HRApplicationState = {"resume_summary": None}
         return updated_state
 
     if not resume_summarizer:
         error_msg = "LLM summarizer is not initialized. Skipping summarization."
-        print(error_msg)
-        updated_state: HRApplicationState = {**state, "resume_summary": None, "error_message": error_msg}
-        print(f"Node: summarize_resume error. State update: {updated_state}")
+        logger.error(error_msg)
+        updated_state: HRApplicationState = {"resume_summary": None, "error_message": error_msg}
         return updated_state
 
-    resume_text = state.get("resume_text", "")
-    job_text = state.get("job_text", "")
+    resume_text = blob_store.get(state.get("resume_ref"))
+    job_text = blob_store.get(state.get("job_ref"))
     if not resume_text or not job_text:
         error_msg = "'resume_text' or 'job_text' missing for summarization."
-        print(error_msg)
-        updated_state: HRApplicationState = {**state, "resume_summary": None, "error_message": error_msg}
-        print(f"Node: summarize_resume error. State update: {updated_state}")
+        logger.warning(error_msg)
+        updated_state: HRApplicationState = {"resume_summary": None, "error_message": error_msg}
         return updated_state
 
     try:
-        summary = resume_summarizer.invoke({"resume_text": resume_text, "job_text": job_text})
-        print("Resume summarized.")
-        updated_state: HRApplicationState = {**state, "resume_summary": summary}
-        print(f"Node: summarize_resume finished. State update: {updated_state}")
+        with track_stage("llm"):
+            summary = resume_summarizer.invoke({"resume_text": resume_text, "job_text": job_text})
+        logger.debug("Resume summarized.")
+        updated_state: HRApplicationState = {"resume_summary": summary}
         return updated_state
     except Exception as e:
         error_msg = f"Error summarizing resume: {e}"
-        print(error_msg)
-        updated_state: HRApplicationState = {**state, "resume_summary": None, "error_message": error_msg}
-        print(f"Node: summarize_resume error. State update: {updated_state}")
+        logger.error(error_msg)
+        updated_state: HRApplicationState = {"resume_summary": None, "error_message": error_msg}
         return updated_state
 
 
-def send_rejection_node(state: HRApplicationState) -> HRApplicationState:
-    print("--- Node: send_rejection ---")
-    if state.get("email_error"):
-        print("Skipping rejection email due to prior email configuration error.")
-        return state
-    email = state.get("email")
-    if not email:
-        error_msg = "Skipping rejection email: No email address found."
-        print(f"❌ {error_msg}")
-        updated_state: HRApplicationState = {**state, "email_error": True, "error_message": error_msg, "email_sent": False}
-        print(f"Node: send_rejection error. State update: {updated_state}")
-        return updated_state
-    email_sent_data = send_rejection_email.invoke({"email": email})
+def _send_email_once(state: HRApplicationState, kind: str, email_tool) -> HRApplicationState:
+    """Send via email_tool unless the run's ledger shows this email already went out."""
+    email = state["email"]
+    run_id = state.get("run_id")
+    if not run_registry.claim_email(run_id, kind, email):
+        logger.info("%s email already sent for run %s; not sending again.", kind.capitalize(), run_id)
+        return {"email_sent": True, "email_error": False, "error_message": None}
+    email_sent_data = email_tool.invoke({"email": email})
+    if not email_sent_data.get("email_sent", False):
+        run_registry.release_email(run_id, kind)
     updated_state: HRApplicationState = {
-        **state,
         "email_sent": email_sent_data.get("email_sent", False),
         "email_error": email_sent_data.get("email_error", False),
         "error_message": email_sent_data.get("error_message", None),
     }
-    print(f"Node: send_rejection finished. State update: {updated_state}")
     return updated_state
 
 
+@instrument_node("send_rejection")
+def send_rejection_node(state: HRApplicationState) -> HRApplicationState:
+    if state.get("email_error"):
+        logger.info("Skipping rejection email due to prior email configuration error.")
+        return {}
+    email = state.get("email")
+    if not email:
+        error_msg = "Skipping rejection email: No email address found."
+        logger.warning(error_msg)
+        updated_state: HRApplicationState = {"email_error": True, "error_message": error_msg, "email_sent": False}
+        return updated_state
+    return _send_email_once(state, "rejection", send_rejection_email)
+
+
+@instrument_node("send_acceptance")
 def send_acceptance_node(state: HRApplicationState) -> HRApplicationState:
-    print("--- Node: send_acceptance ---")
     if state.get("email_error"):
-        print("Skipping acceptance email due to prior email configuration error.")
-        return state
+        logger.info("Skipping acceptance email due to prior email configuration error.")
+        return {}
     email = state.get("email")
     if not email:
         error_msg = "Skipping acceptance email: No email address found."
-        print(error_msg)
-        updated_state: HRApplicationState = {**state, "email_error": True, "error_message": error_msg, "email_sent": False}
-        print(f"Node: send_acceptance error. State update: {updated_state}")
+        logger.warning(error_msg)
+        updated_state: HRApplicationState = {"email_error": True, "error_message": error_msg, "email_sent": False}
         return updated_state
-    email_sent_data = send_acceptance_email.invoke({"email": email})
-    updated_state: HRApplicationState = {
-        **state,
-        "email_sent": email_sent_data.get("email_sent", False),
-        "email_error": email_sent_data.get("email_error", False),
-        "error_message": email_sent_data.get("error_message", None),
-    }
-    print(f"Node: send_acceptance finished. State update: {updated_state}")
-    return updated_state
+    return _send_email_once(state, "acceptance", send_acceptance_email)
 
 
+@instrument_node("send_review")
 def send_review_email_node(state: HRApplicationState) -> HRApplicationState:
-    print("--- Node: send_review_email ---")
     if state.get("email_error"):
-        print("Skipping review email due to prior email configuration error.")
-        return state
+        logger.info("Skipping review email due to prior email configuration error.")
+        return {}
     email = state.get("email")
     if not email:
         error_msg = "Skipping review email: No email address found."
-        print(error_msg)
-        updated_state: HRApplicationState = {**state, "email_error": True, "error_message": error_msg, "email_sent": False}
-        print(f"Node: send_review_email error. State update: {updated_state}")
+        logger.warning(error_msg)
+        updated_state: HRApplicationState = {"email_error": True, "error_message": error_msg, "email_sent": False}
         return updated_state
-    email_sent_data = send_review_email.invoke({"email": email})
-    updated_state: HRApplicationState = {
-        **state,
-        "email_sent": email_sent_data.get("email_sent", False),
-        "email_error": email_sent_data.get("email_error", False),
-        "error_message": email_sent_data.get("error_message", None),
-    }
-    print(f"Node: send_review_email finished. State update: {updated_state}")
-    return updated_state
+    return _send_email_once(state, "review", send_review_email)
 
 
+@instrument_node("human_review")
 def human_review_node(state: HRApplicationState) -> HRApplicationState:
     """Log details for human review."""
-    print("--- Node: human_review ---")
-    print("\n--- CANDIDATE FOR HUMAN REVIEW ---")
-    print(f"Email: {state.get('email', 'N/A')}")
-    print(f"ATS Score: {state.get('ats_score', 'N/A')}")
-    print(f"Resume Summary:\n{state.get('resume_summary', 'No summary available.')}\n")
-    print("----------------------------------")
-    print(f"Node: human_review finished. State update: {state}")
-    return state
+    logger.info(
+        "Candidate for human review: email=%s ats_score=%s",
+        state.get("email", "N/A"),
+        state.get("ats_score", "N/A"),
+    )
+    return {}
 
 
+@instrument_node("handle_error")
 def handle_error_node(state: HRApplicationState) -> HRApplicationState:
-    print("--- Node: handle_error ---")
-    print("\n--- WORKFLOW ERROR ENCOUNTERED ---")
     if state.get("extraction_error"):
-        print(f"Extraction Error: {state.get('error_message', 'Unknown extraction error')}")
+        logger.error("Extraction Error: %s", state.get("error_message", "Unknown extraction error"))
     if state.get("scoring_error"):
-        print(f"Scoring Error: {state.get('error_message', 'Unknown scoring error')}")
+        logger.error("Scoring Error: %s", state.get("error_message", "Unknown scoring error"))
     if state.get("email_error"):
-        print(f"Email Error: {state.get('error_message', 'Unknown email error')}")
-    print("Application processing terminated due to errors.")
-    print("----------------------------------")
-    print(f"Node: handle_error finished. State update: {state}")
-    return state
+        logger.error("Email Error: %s", state.get("error_message", "Unknown email error"))
+    logger.warning("Application processing terminated due to errors: %s", state.get("pdf_path", "N/A"))
+    return {}
+
+# Decisions the workflow saves to the candidates table (the dashboard's old save rule).
+PERSISTED_DECISIONS = {d.strip() for d in os.getenv("PERSIST_DECISIONS", "Accepted,Review").split(",") if d.strip()}
+
+
+@instrument_node("persist_candidate")
+def persist_candidate_node(state: HRApplicationState) -> HRApplicationState:
+    """Save the candidate row from the workflow itself, so clients need no follow-up POST."""
+    if not state.get("run_id"):
+        return {}
+    decision = rules_engine.for_ref(state.get("job_ref")).decide(state.get("ats_score", 0.0))
+    if decision not in PERSISTED_DECISIONS:
+        return {}
+    candidate = {
+        "file_name": state.get("file_name") or os.path.basename(state.get("pdf_path", "")),
+        "email": state.get("email", ""),
+        "ats_score": state.get("ats_score", 0.0),
+        "decision": decision,
+        "summary": state.get("resume_summary") or "",
+        "resume_text": blob_store.get(state.get("resume_ref")),
+    }
+    try:
+        with track_stage("db"):
+            saved = persist_run(state["run_id"], blob_store.get(state.get("job_ref")), candidate)
+    except sqlite3.Error as e:
+        # Not fatal: the screening result stands and the client can still save it.
+        logger.warning("Could not persist candidate for run %s: %s", state["run_id"], e)
+        return {}
+    return {"candidate_id": saved["id"]}
+
 
 # Build workflow
 workflow = StateGraph(HRApplicationState)
+workflow.add_node("prefilter", prefilter_node)
 workflow.add_node("extract_resume", extract_resume_node)
+workflow.add_node("check_duplicate", check_duplicate_node)
 workflow.add_node("ats_scorer", ats_scorer_node)
 workflow.add_node("summarize_resume", summarize_resume_node)
 workflow.add_node("send_rejection", send_rejection_node)
@@ -210,25 +284,49 @@ workflow.add_node("send_acceptance", send_acceptance_node)
 workflow.add_node("send_review", send_review_email_node)
 workflow.add_node("human_review", human_review_node)
 workflow.add_node("handle_error", handle_error_node)
+workflow.add_node("persist_candidate", persist_candidate_node)
 
-workflow.set_entry_point("extract_resume")
+workflow.set_entry_point("prefilter")
 
 # Conditional edges
 
+def check_prefilter_status(state: HRApplicationState) -> str:
+    # Early rejections still go through duplicate linking, so a re-upload is not emailed again.
+    if state.get("prefilter_reason"):
+        return "check_duplicate"
+    return "extract_resume"
+
+workflow.add_conditional_edges(
+    "prefilter",
+    check_prefilter_status,
+    {"check_duplicate": "check_duplicate", "extract_resume": "extract_resume"},
+)
+
 def check_extraction_status(state: HRApplicationState) -> str:
-    print("--- Edge: check_extraction_status ---")
     if state.get("extraction_error"):
         return "handle_error"
-    return "ats_scorer"
+    return "check_duplicate"
 
 workflow.add_conditional_edges(
     "extract_resume",
     check_extraction_status,
-    {"handle_error": "handle_error", "ats_scorer": "ats_scorer"},
+    {"handle_error": "handle_error", "check_duplicate": "check_duplicate"},
+)
+
+def check_duplicate_status(state: HRApplicationState) -> str:
+    if state.get("duplicate_of"):
+        return "duplicate"
+    if state.get("prefilter_reason"):
+        return "send_rejection"
+    return "ats_scorer"
+
+workflow.add_conditional_edges(
+    "check_duplicate",
+    check_duplicate_status,
+    {"duplicate": "persist_candidate", "send_rejection": "send_rejection", "ats_scorer": "ats_scorer"},
 )
 
 def check_scoring_status(state: HRApplicationState) -> str:
-    print("--- Edge: check_scoring_status ---")
     if state.get("scoring_error"):
         return "handle_error"
     return "summarize_resume"
@@ -239,24 +337,20 @@ workflow.add_conditional_edges(
     {"handle_error": "handle_error", "summarize_resume": "summarize_resume"},
 )
 
+# Decision labels (core.rules) -> email node decide_next routes to
+ROUTE_FOR_DECISION = {"Rejected": "send_rejection", "Review": "human_review", "Accepted": "send_acceptance"}
+
+
 def decide_next(state: HRApplicationState) -> str:
     """Determine next step based on ATS score and route to appropriate email node."""
-    print(f"--- Edge: decide_next (ATS Score: {state.get('ats_score', 'N/A')}) ---")
     if state.get("extraction_error") or state.get("scoring_error") or state.get("error_message"):
-        print("Prior error detected, routing to handle_error.")
+        logger.debug("Prior error detected, routing to handle_error.")
         return "handle_error"
     score = state.get("ats_score", 0.0)
-    REJECTION_THRESHOLD = 60
-    HUMAN_REVIEW_THRESHOLD = 75
-    if score < REJECTION_THRESHOLD:
-        print(f"Score {score} < {REJECTION_THRESHOLD}, routing to send_rejection.")
-        return "send_rejection"
-    elif REJECTION_THRESHOLD <= score < HUMAN_REVIEW_THRESHOLD:
-        print(f"Score {REJECTION_THRESHOLD} <= {score} < {HUMAN_REVIEW_THRESHOLD}, routing to human_review.")
-        return "human_review"
-    else:
-        print(f"Score {score} >= {HUMAN_REVIEW_THRESHOLD}, routing to send_acceptance.")
-        return "send_acceptance"
+    rules = rules_engine.for_ref(state.get("job_ref"))
+    route = ROUTE_FOR_DECISION[rules.decide(score)]
+    logger.debug("Score %s with thresholds %s, routing to %s.", score, rules.as_dict(), route)
+    return route
 
 workflow.add_conditional_edges(
     "summarize_resume",
@@ -270,18 +364,42 @@ workflow.add_conditional_edges(
 )
 
 # Final edges
-workflow.add_edge("send_rejection", END)
-workflow.add_edge("send_review", END)
-workflow.add_edge("send_acceptance", END)
+workflow.add_edge("send_rejection", "persist_candidate")
+workflow.add_edge("send_review", "persist_candidate")
+workflow.add_edge("send_acceptance", "persist_candidate")
+workflow.add_edge("persist_candidate", END)
 workflow.add_edge("handle_error", END)
 
-hr_app_workflow = workflow.compile()
-print("LangGraph workflow compiled successfully.")
+# Checkpoint after every node so a crashed run resumes where it stopped.
+hr_app_workflow = workflow.compile(checkpointer=checkpointer)
+logger.info("LangGraph workflow compiled successfully.")
+
+
+def run_application(initial_state: HRApplicationState, thread_id: str) -> HRApplicationState:
+    """
+    Run one candidate's workflow under its checkpoint thread.
+
+    A thread that already finished cleanly returns its stored result; one that was
+    interrupted (crash, restart) resumes from its last completed node; otherwise,
+    including a finished run that ended with any error (a transient LLM or SMTP
+    failure), a fresh run starts from `initial_state`. The email ledger still keeps
+    an email that did go out from being sent again.
+    """
+    config = run_config(thread_id)
+    snapshot = hr_app_workflow.get_state(config)
+    if snapshot.next:
+        logger.info("Resuming run %s at %s", thread_id, ", ".join(snapshot.next))
+        return hr_app_workflow.invoke(None, config)
+    values = snapshot.values or {}
+    failed = any(values.get(flag) for flag in ("extraction_error", "scoring_error", "email_error", "error_message"))
+    if values and not failed:
+        return values
+    return hr_app_workflow.invoke({**initial_state, "run_id": thread_id}, config)
 
 try:
     graph_image_bytes = hr_app_workflow.get_graph().draw_mermaid_png()
     with open("hr_workflow_graph.png", "wb") as f:
         f.write(graph_image_bytes)
-    print("Graph visualization saved as hr_workflow_graph.png")
+    logger.info("Graph visualization saved as hr_workflow_graph.png")
 except Exception as e:
-    print(f"Could not generate graph visualization: {e}. Ensure graphviz is installed.")
\ No newline at end of file
+    logger.warning("Could not generate graph visualization: %s. Ensure graphviz is installed.", e)
\ No newline at end of file
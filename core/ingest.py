@@ -0,0 +1,155 @@
+"""
+Bulk resume ingestion from ZIP archives and directories.
+
+Sources yield (name, payload) pairs lazily: a ZIP member or a file is only read when
+the caller pulls it, and run_bounded pulls the next one only once a slot in its
+in-flight window frees up. So an archive of thousands of resumes is never unpacked
+to disk and at most `max_in_flight` PDFs are held (and spooled) at a time.
+
+A payload is the PDF's bytes, an IngestError saying why the entry was not
+processed, or, from watch_directory only, None for a "nothing new yet" tick.
+"""
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+INGEST_MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "4"))
+INGEST_MAX_FILE_BYTES = int(float(os.getenv("INGEST_MAX_FILE_MB", "20")) * 1024 * 1024)
+
+Payload = Union[bytes, "IngestError", None]
+
+
+class IngestError(Exception):
+    """An entry that could not be read (too large, encrypted, unreadable)."""
+
+
+class SkippedEntry(IngestError):
+    """An entry that is not a resume PDF."""
+
+
+def _ignored(name: str) -> bool:
+    # Archive/OS metadata rather than content: __MACOSX/ forks, .DS_Store, ._ files.
+    parts = name.replace("\\", "/").split("/")
+    return parts[0] == "__MACOSX" or parts[-1].startswith(".")
+
+
+def iter_zip(source: Union[str, Path, BinaryIO], max_bytes: int = INGEST_MAX_FILE_BYTES) -> Iterator[Tuple[str, Payload]]:
+    """Members of a ZIP archive, decompressed one at a time as they are pulled."""
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or _ignored(info.filename):
+                continue
+            if not info.filename.lower().endswith(".pdf"):
+                yield info.filename, SkippedEntry("not a PDF")
+            elif info.flag_bits & 0x1:
+                yield info.filename, IngestError("encrypted ZIP member")
+            elif info.file_size > max_bytes:
+                yield info.filename, IngestError(f"larger than {max_bytes // (1024 * 1024)} MB")
+            else:
+                try:
+                    with archive.open(info) as member:
+                        # Read one byte past the limit: the header's size can lie.
+                        data = member.read(max_bytes + 1)
+                except (zipfile.BadZipFile, OSError, NotImplementedError) as e:
+                    yield info.filename, IngestError(f"unreadable: {e}")
+                    continue
+                if len(data) > max_bytes:
+                    yield info.filename, IngestError(f"larger than {max_bytes // (1024 * 1024)} MB")
+                else:
+                    yield info.filename, data
+
+
+def _read_file(path: Path, max_bytes: int) -> Payload:
+    try:
+        if path.stat().st_size > max_bytes:
+            return IngestError(f"larger than {max_bytes // (1024 * 1024)} MB")
+        return path.read_bytes()
+    except OSError as e:
+        return IngestError(f"unreadable: {e}")
+
+
+def _pdfs(root: Path, recursive: bool) -> List[Path]:
+    paths = root.rglob("*") if recursive else root.iterdir()
+    return sorted(p for p in paths if p.is_file() and p.suffix.lower() == ".pdf" and not _ignored(p.name))
+
+
+def iter_directory(root: Union[str, Path], recursive: bool = True,
+                   max_bytes: int = INGEST_MAX_FILE_BYTES) -> Iterator[Tuple[str, Payload]]:
+    """PDFs under `root` (names relative to it), each read when pulled."""
+    root = Path(root)
+    for path in _pdfs(root, recursive):
+        yield str(path.relative_to(root)), _read_file(path, max_bytes)
+
+
+def watch_directory(root: Union[str, Path], interval: float = 5.0, recursive: bool = True,
+                    max_bytes: int = INGEST_MAX_FILE_BYTES,
+                    stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[str, Payload]]:
+    """
+    Existing PDFs under `root`, then every new or modified one, polling every
+    `interval` seconds until `stop()` is true. A file is taken once its size and
+    mtime are unchanged across two polls, so half-copied files are not read.
+    Yields (None, None) after each poll so callers can report finished work.
+    """
+    root = Path(root)
+    done: Dict[Path, Tuple[float, int]] = {}
+    seen: Dict[Path, Tuple[float, int]] = {}
+    first = True
+    while True:
+        for path in _pdfs(root, recursive):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime, stat.st_size)
+            if done.get(path) == signature:
+                continue
+            if first or seen.get(path) == signature:
+                done[path] = signature
+                yield str(path.relative_to(root)), _read_file(path, max_bytes)
+            else:
+                seen[path] = signature
+        first = False
+        yield None, None
+        if stop is not None and stop():
+            return
+        time.sleep(interval)
+
+
+def run_bounded(sources: Iterator[Tuple[str, Payload]], submit: Callable[[str, bytes], Future],
+                max_in_flight: int = INGEST_MAX_CONCURRENCY) -> Iterator[Tuple[str, object, Optional[Exception]]]:
+    """
+    Submit each source's PDF, with at most `max_in_flight` runs outstanding, and yield
+    (name, result, error) per entry as runs finish. Entries that were never submitted
+    come back with their IngestError.
+    """
+    pending: Dict[Future, List[str]] = {}
+
+    def finished(timeout=None):
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            for name in pending.pop(future):
+                yield name, None if error else future.result(), error
+
+    for name, payload in sources:
+        if payload is None:
+            if pending:
+                yield from finished(timeout=0)
+            continue
+        if isinstance(payload, Exception):
+            yield name, None, payload
+            continue
+        while len(pending) >= max_in_flight:
+            yield from finished()
+        try:
+            future = submit(name, payload)
+        except Exception as e:
+            yield name, None, e
+            continue
+        # Identical PDFs share one run (and future), so several names may wait on it.
+        pending.setdefault(future, []).append(name)
+    while pending:
+        yield from finished()
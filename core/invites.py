@@ -0,0 +1,380 @@
+"""
+Interview invitations: the invite email itself, and a background dispatcher that works
+through queued invites at the mail provider's rate over one reused SMTP session.
+
+Queue state lives in the candidates DB (`invite_jobs` / `invite_queue`), so a bulk
+invite returns at once and its progress can be polled from any worker. With several
+worker processes, a shared lease makes exactly one of them the sender, so the rate
+limit holds for the whole host.
+"""
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Optional
+
+from core.db import DB_PATH
+from core.metrics import track_stage
+from core.shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+INTERVIEW_URL = os.getenv("INTERVIEW_URL", "http://localhost:8501/")
+# Gmail allows roughly 20 messages/minute from one account before throttling.
+INVITE_RATE_PER_MINUTE = float(os.getenv("INVITE_RATE_PER_MINUTE", "20"))
+INVITE_BURST = int(os.getenv("INVITE_BURST", "5"))
+# Interview links stop working this many days after the invite.
+INVITE_TOKEN_TTL_DAYS = float(os.getenv("INVITE_TOKEN_TTL_DAYS", "7"))
+# Close the SMTP session after this long with nothing to send.
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "30"))
+# The sending process renews its lease well within this; another takes over once it lapses.
+INVITE_LEASE_SECONDS = float(os.getenv("INVITE_LEASE_SECONDS", "60"))
+# How often an idle sender looks for invites queued by other worker processes.
+INVITE_POLL_SECONDS = 2.0
+INVITE_LEASE = "invite_dispatcher"
+
+
+# SQL expression for a new token's expiry; bind INVITE_TOKEN_TTL_DAYS.
+TOKEN_EXPIRY_SQL = "datetime('now', '+' || ? || ' days')"
+
+
+def invite_link(token: str) -> str:
+    return f"{INTERVIEW_URL}?token={token}"
+
+
+def build_invite_message(sender_email: str, name: str, email: str, link: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = email
+    msg['Subject'] = "Invitation to AI Mock Interview"
+
+    # Plain text version
+    plain_text = f"""Dear {name},
+
+Congratulations! You have been selected for the next round of our recruitment process.
+
+We are excited to invite you to an AI-powered mock interview. This is a unique opportunity for us to learn more about your skills and experience in an interactive format.
+
+To start your interview, please click the link below:
+{link}
+
+Please ensure you have a stable internet connection and are in a quiet environment before starting.
+
+Best regards,
+HR Team
+"""
+
+    # HTML version
+    html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+<style>
+    body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; }}
+    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; }}
+    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+    .content {{ background: white; padding: 30px; border-radius: 0 0 10px 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+    .footer {{ text-align: center; margin-top: 20px; font-size: 12px; color: #666; }}
+    h1 {{ margin: 0; font-size: 24px; }}
+    p {{ margin: 15px 0; }}
+    .button {{ display: inline-block; padding: 12px 24px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; font-weight: bold; margin: 20px 0; }}
+    .button:hover {{ background-color: #5a6fd6; }}
+    .note {{ background-color: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0; font-size: 14px; }}
+</style>
+</head>
+<body>
+<div class="container">
+    <div class="header">
+        <h1>Interview Invitation</h1>
+    </div>
+    <div class="content">
+        <p>Dear {name},</p>
+        
+        <p><strong>Congratulations!</strong> You have been selected for the next round of our recruitment process.</p>
+        
+        <p>We are excited to invite you to an <strong>AI-powered mock interview</strong>. This is a unique opportunity for us to learn more about your skills and experience in an interactive format.</p>
+        
+        <div style="text-align: center;">
+            <a href="{link}" class="button">Start Interview Now</a>
+        </div>
+        
+        <p>If the button above doesn't work, you can copy and paste the following link into your browser:</p>
+        <p style="word-break: break-all; color: #667eea;">{link}</p>
+        
+        <div class="note">
+            <p style="margin: 0;"><strong>📝 Important Tips:</strong></p>
+            <ul style="margin: 10px 0; padding-left: 20px;">
+                <li>Ensure you have a stable internet connection</li>
+                <li>Find a quiet environment with minimal background noise</li>
+                <li>Allow access to your microphone when prompted</li>
+            </ul>
+        </div>
+        
+        <p>Best regards,<br>
+        <strong>HR Team</strong></p>
+    </div>
+    <div class="footer">
+        <p>This is an automated message from our AI-powered recruitment system.</p>
+    </div>
+</div>
+</body>
+</html>
+"""
+
+    msg.attach(MIMEText(plain_text, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+def open_smtp_session(sender_email: str, sender_password: str) -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    server.starttls()
+    server.login(sender_email, sender_password)
+    return server
+
+
+class TokenBucket:
+    """Allows `burst` sends at once, refilled at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """Block until a token is available; False if `stop` was set meanwhile."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            wait = (1 - self.tokens) / self.rate
+            if stop is not None and stop.wait(wait):
+                return False
+            if stop is None:
+                time.sleep(wait)
+
+
+def init_invite_tables(conn: sqlite3.Connection):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS invite_jobs (
+        id TEXT PRIMARY KEY,
+        total INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS invite_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL REFERENCES invite_jobs(id),
+        candidate_id INTEGER NOT NULL,
+        name TEXT,
+        email TEXT NOT NULL,
+        token TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        sent_at TIMESTAMP
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invite_queue_status ON invite_queue(status, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invite_queue_job ON invite_queue(job_id)")
+
+
+def enqueue_invites(conn: sqlite3.Connection, candidates) -> str:
+    """
+    Give each (id, name, email) candidate a fresh interview token and queue its invite,
+    in the caller's transaction. Returns the invite job id.
+    """
+    job_id = uuid.uuid4().hex
+    rows = [(candidate_id, name, email, str(uuid.uuid4())) for candidate_id, name, email in candidates]
+    conn.execute("INSERT INTO invite_jobs (id, total) VALUES (?, ?)", (job_id, len(rows)))
+    conn.executemany(
+        f"UPDATE candidates SET token=?, token_expires_at={TOKEN_EXPIRY_SQL} WHERE id=?",
+        [(token, INVITE_TOKEN_TTL_DAYS, cid) for cid, _, _, token in rows],
+    )
+    conn.executemany(
+        "INSERT INTO invite_queue (job_id, candidate_id, name, email, token) VALUES (?, ?, ?, ?, ?)",
+        [(job_id, cid, name, email, token) for cid, name, email, token in rows],
+    )
+    return job_id
+
+
+def invite_job_status(conn: sqlite3.Connection, job_id: str) -> Optional[dict]:
+    job = conn.execute("SELECT total, created_at FROM invite_jobs WHERE id=?", (job_id,)).fetchone()
+    if job is None:
+        return None
+    items = conn.execute(
+        "SELECT candidate_id, email, status, error, sent_at FROM invite_queue WHERE job_id=? ORDER BY id", (job_id,)
+    ).fetchall()
+    counts = {"queued": 0, "sending": 0, "sent": 0, "failed": 0}
+    for item in items:
+        counts[item[2]] = counts.get(item[2], 0) + 1
+    done = counts["queued"] == 0 and counts["sending"] == 0
+    return {
+        "job_id": job_id,
+        "status": "done" if done else "running",
+        "total": job[0],
+        "created_at": job[1],
+        **counts,
+        "items": [
+            {"candidate_id": i[0], "email": i[1], "status": i[2], "error": i[3], "sent_at": i[4]} for i in items
+        ],
+    }
+
+
+class InviteDispatcher:
+    """
+    Single background thread draining invite_queue. Sends are paced by a token bucket
+    and share one logged-in SMTP session, reconnecting only if the server drops it
+    and closing it after SMTP_IDLE_SECONDS without work.
+
+    Only the holder of the INVITE_LEASE sends; dispatchers in other processes wait
+    and take over if the holder stops renewing it.
+    """
+
+    def __init__(self, db_path=None, rate_per_minute: float = INVITE_RATE_PER_MINUTE, burst: int = INVITE_BURST,
+                 max_attempts: int = 3, shared: Optional[SharedState] = None):
+        self.db_path = str(db_path or DB_PATH)
+        self.shared = shared or SharedState(self.db_path)
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.max_attempts = max_attempts
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._server: Optional[smtplib.SMTP] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="invite-dispatcher", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._close_session()
+
+    def queue_depth(self) -> int:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                return conn.execute("SELECT COUNT(*) FROM invite_queue WHERE status='queued'").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    def _session(self) -> smtplib.SMTP:
+        if self._server is None:
+            sender, password = os.getenv("EMAIL_SENDER"), os.getenv("EMAIL_PASSWORD")
+            if not sender or not password:
+                raise RuntimeError("Email credentials not configured.")
+            self._server = open_smtp_session(sender, password)
+        return self._server
+
+    def _close_session(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _send(self, name: str, email: str, token: str):
+        msg = build_invite_message(os.getenv("EMAIL_SENDER"), name, email, invite_link(token))
+        for attempt in range(2):
+            try:
+                with track_stage("smtp"):
+                    self._session().send_message(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Long-lived sessions get dropped by the provider; reconnect once.
+                self._close_session()
+                if attempt:
+                    raise
+
+    def _lead(self, owner: str, leading: bool, conn: sqlite3.Connection) -> bool:
+        """Take or renew the sender lease; on taking it over, requeue the old sender's in-flight items."""
+        if not self.shared.acquire_lease(INVITE_LEASE, owner, INVITE_LEASE_SECONDS):
+            return False
+        if not leading:
+            # Only the lease holder sends, so anything still 'sending' was left by a dead sender.
+            with conn:
+                conn.execute("UPDATE invite_queue SET status='queued' WHERE status='sending'")
+        return True
+
+    def _run(self):
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        leading = False
+        renewed = last_sent = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if not leading or time.monotonic() - renewed >= INVITE_LEASE_SECONDS / 3:
+                    leading = self._lead(owner, leading, conn)
+                    renewed = time.monotonic()
+                    if not leading:
+                        self._wake.wait(INVITE_LEASE_SECONDS / 3)
+                        self._wake.clear()
+                        continue
+                item = conn.execute(
+                    "SELECT id, name, email, token, attempts FROM invite_queue WHERE status='queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if item is None:
+                    self._wake.clear()
+                    if not self._wake.wait(INVITE_POLL_SECONDS) and time.monotonic() - last_sent >= SMTP_IDLE_SECONDS:
+                        self._close_session()
+                    continue
+                item_id, name, email, token, attempts = item
+                if not self.bucket.acquire(self._stop):
+                    break
+                # Renew right before claiming, so a send never outlives the lease.
+                if not self._lead(owner, True, conn):
+                    leading = False
+                    continue
+                renewed = time.monotonic()
+                with conn:
+                    claimed = conn.execute(
+                        "UPDATE invite_queue SET status='sending', attempts=attempts+1 WHERE id=? AND status='queued'",
+                        (item_id,),
+                    ).rowcount
+                if not claimed:
+                    continue
+                try:
+                    self._send(name, email, token)
+                    status, error = "sent", None
+                except Exception as e:
+                    logger.warning("Invite to %s failed (attempt %d): %s", email, attempts + 1, e)
+                    self._close_session()
+                    status = "failed" if attempts + 1 >= self.max_attempts else "queued"
+                    error = str(e)
+                last_sent = time.monotonic()
+                with conn:
+                    conn.execute(
+                        "UPDATE invite_queue SET status=?, error=?, "
+                        "sent_at=CASE WHEN ?='sent' THEN CURRENT_TIMESTAMP ELSE sent_at END WHERE id=?",
+                        (status, error, status, item_id),
+                    )
+        finally:
+            if leading:
+                self.shared.release_lease(INVITE_LEASE, owner)
+            conn.close()
+            self._close_session()
@@ -1,4 +1,5 @@
 import os
+import logging
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
@@ -8,7 +9,7 @@ from langchain_google_genai import GoogleGenerativeAI
 try:
     llm = ChatGroq(model="openai/gpt-oss-20b",temperature=0.2)
     #llm = GoogleGenerativeAI(model="gemini-1.5-pro")
-    print(" LLM initialized successfully")
+    logging.getLogger(__name__).info("LLM initialized successfully")
 except Exception as e:
     raise e 
 
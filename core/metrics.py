@@ -0,0 +1,251 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Kept dependency-free on purpose: the workflow runs in worker threads, so every
+metric guards its samples with a lock and the /metrics endpoint simply renders
+the registry.
+"""
+import bisect
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {value}"
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        with self._lock:
+            self._callbacks[_label_key(self.labelnames, labels)] = fn
+
+    def samples(self):
+        with self._lock:
+            items = list(self._callbacks.items())
+        for key, fn in items:
+            try:
+                value = float(fn())
+            except Exception:
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram:
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        # Callables receiving (value, labels) for every observation; benchmarks use
+        # these to keep exact samples instead of bucketed counts.
+        self.observers = []
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+        for observer in self.observers:
+            observer(value, labels)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> Optional[dict]:
+        """Cumulative bucket counts plus sum/count for one label set (used by benchmarks)."""
+        with self._lock:
+            state = self._values.get(_label_key(self.labelnames, labels))
+            if state is None:
+                return None
+            state = list(state)
+        cumulative, running = [], 0
+        for count in state[:-2]:
+            running += count
+            cumulative.append(running)
+        return {"buckets": dict(zip(self.buckets, cumulative)), "sum": state[-2], "count": state[-1]}
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            running = 0
+            for bound, count in zip(self.buckets, state[:-2]):
+                running += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{labels} {running}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {state[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+NODE_SECONDS = REGISTRY.register(Histogram(
+    "hr_workflow_node_seconds", "Wall time spent in each workflow node.", ["node"]))
+NODE_ERRORS = REGISTRY.register(Counter(
+    "hr_workflow_node_errors", "Workflow node runs that raised or flagged an error.", ["node"]))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "hr_stage_seconds", "Duration of external work: pdf, embedding, llm, smtp, tts, stt.", ["stage"]))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "hr_stage_errors", "Failures of external work by stage.", ["stage"]))
+WORKFLOW_SECONDS = REGISTRY.register(Histogram(
+    "hr_workflow_seconds", "End-to-end resume workflow latency.", ["outcome"]))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "hr_queue_depth", "Items waiting in internal queues.", ["queue"]))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "hr_http_request_seconds", "HTTP handler latency.", ["method", "route", "status"]))
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a block of external work and count it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+_STATE_SAMPLE_RATE = float(os.getenv("LOG_STATE_SAMPLE_RATE", "0.01"))
+_ERROR_FLAGS = ("extraction_error", "scoring_error", "email_error")
+
+
+def log_state_sample(node: str, update: dict):
+    """
+    Debug-log a sampled, size-only view of a state update.
+
+    Values are summarized (strings by length) so resume text never reaches the logs.
+    """
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= _STATE_SAMPLE_RATE:
+        return
+    summary = {
+        key: (f"<{len(value)} chars>" if isinstance(value, str) and len(value) > 80 else value)
+        for key, value in update.items()
+    }
+    logger.debug("node=%s state=%s", node, summary)
+
+
+def instrument_node(name: str):
+    """Decorator for workflow nodes: wall time, error count and sampled state logging."""
+
+    def decorator(fn):
+        node_logger = logging.getLogger(fn.__module__)
+
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                update = fn(state, *args, **kwargs)
+            except Exception:
+                NODE_ERRORS.inc(node=name)
+                node_logger.exception("node=%s raised", name)
+                raise
+            finally:
+                NODE_SECONDS.observe(time.perf_counter() - start, node=name)
+            if any(update.get(flag) and not state.get(flag) for flag in _ERROR_FLAGS):
+                NODE_ERRORS.inc(node=name)
+            log_state_sample(name, update)
+            return update
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,97 @@
+"""
+Optional cheap pre-filter in front of the screening workflow (PREFILTER_ENABLED=1).
+
+Only the first PREFILTER_PAGES pages of the PDF are extracted, and a resume is
+rejected there, before full extraction, scoring and the LLM summary, when:
+
+  * too_short - the whole document was read and holds less than PREFILTER_MIN_CHARS
+    characters of text (an empty text layer is left to the full pipeline, which
+    reports it as an error instead of rejecting a scanned resume)
+  * language  - the JD is written in Latin script but the resume mostly is not
+  * low_score - even an estimate plus PREFILTER_MARGIN stays below the job's
+    rejection threshold
+
+The estimate is the workflow's own blend (core.skills.blend) of an embedding score
+and skill coverage, both taken from the first pages only. The embedding model reads
+just the first few hundred tokens of a resume anyway; the margin absorbs the skills
+that later pages may still add. A larger margin means fewer early rejections and
+fewer qualified candidates lost.
+"""
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+import PyPDF2
+
+from core.metrics import REGISTRY, Counter, track_stage
+from core.skills import blend, matcher_for_job
+
+PREFILTER_DECISIONS = REGISTRY.register(Counter(
+    "hr_prefilter_decisions", "Pre-filter outcomes: passed or the rejection reason.", ["outcome"]))
+
+
+@dataclass(frozen=True)
+class PrefilterPolicy:
+    enabled: bool = False
+    pages: int = 1                  # pages extracted for the checks
+    min_chars: int = 200            # shorter (whole) documents are not resumes
+    min_latin_ratio: float = 0.5    # share of letters in Latin script
+    margin: float = 15.0            # recall-safety margin on the score estimate, in ATS points
+    use_embedding: bool = True      # False: only skill coverage can reject (embedding part taken as 100)
+
+
+def policy_from_env() -> PrefilterPolicy:
+    def flag(name: str, default: str) -> bool:
+        return os.getenv(name, default).strip().lower() not in ("0", "false", "no")
+
+    return PrefilterPolicy(
+        enabled=flag("PREFILTER_ENABLED", "0"),
+        pages=max(1, int(os.getenv("PREFILTER_PAGES", "1"))),
+        min_chars=int(os.getenv("PREFILTER_MIN_CHARS", "200")),
+        min_latin_ratio=float(os.getenv("PREFILTER_MIN_LATIN_RATIO", "0.5")),
+        margin=float(os.getenv("PREFILTER_MARGIN", "15")),
+        use_embedding=flag("PREFILTER_EMBEDDING", "1"),
+    )
+
+
+def read_first_pages(pdf_path, pages: int) -> Tuple[str, int]:
+    """Text of the first `pages` pages and the document's page count."""
+    with track_stage("pdf"), open(pdf_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return "".join(page.extract_text() or "" for page in reader.pages[:pages]), len(reader.pages)
+
+
+def latin_ratio(text: str) -> float:
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return 1.0
+    # Basic Latin through Latin Extended-B (U+0000-U+024F).
+    return sum(ord(c) < 0x250 for c in letters) / len(letters)
+
+
+def evaluate(text: str, page_count: int, job_text: str, rejection_threshold: float, policy: PrefilterPolicy,
+             embed: Optional[Callable[[Sequence[str]], np.ndarray]] = None) -> dict:
+    """
+    Pre-filter verdict for the first-pages `text`: {"reason": None or why it is
+    rejected, "estimate": score estimate or None}.
+    """
+    whole_document = page_count <= policy.pages
+    if 0 < len(text.strip()) < policy.min_chars and whole_document:
+        return {"reason": "too_short", "estimate": None}
+    if len(text.strip()) < policy.min_chars:
+        # Too little text to judge (or no text layer): let the full pipeline decide.
+        return {"reason": None, "estimate": None}
+    if latin_ratio(job_text) >= policy.min_latin_ratio > latin_ratio(text):
+        return {"reason": "language", "estimate": None}
+
+    embedding_score = 100.0
+    if policy.use_embedding and embed is not None:
+        with track_stage("embedding"):
+            resume_vector, job_vector = embed([text, job_text])
+        norms = float(np.linalg.norm(resume_vector) * np.linalg.norm(job_vector))
+        embedding_score = 100.0 * float(np.dot(resume_vector, job_vector)) / norms if norms else 0.0
+    estimate = blend(round(embedding_score, 2), matcher_for_job(job_text).score(text)["skill_score"])
+    if estimate + policy.margin < rejection_threshold:
+        return {"reason": "low_score", "estimate": estimate}
+    return {"reason": None, "estimate": estimate}
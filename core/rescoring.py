@@ -0,0 +1,66 @@
+"""Vectorized re-scoring of stored resumes against an edited job description."""
+from collections import Counter
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from core.skills import blend, matcher_for_job
+
+
+def vector_to_blob(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def blob_to_vector(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if not blob:
+        return None
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def ats_scores(resume_vectors: np.ndarray, job_vector: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of every resume row against the JD, as 0-100 ATS scores.
+
+    Same embedding score as llm_ats_score (cos_sim * 100, rounded to 2 places), but
+    one matrix-vector product for the whole set instead of a call per resume.
+    """
+    resumes = np.asarray(resume_vectors, dtype=np.float64)
+    job = np.asarray(job_vector, dtype=np.float64).reshape(-1)
+    norms = np.linalg.norm(resumes, axis=1) * np.linalg.norm(job)
+    similarity = (resumes @ job) / np.maximum(norms, 1e-12)
+    return np.round(similarity * 100, 2)
+
+
+def hybrid_scores(embedding_scores: np.ndarray, resume_texts: List[str], job_text: str) -> np.ndarray:
+    """Blend with skill coverage exactly like llm_ats_score; the JD's matcher is built once."""
+    matcher = matcher_for_job(job_text)
+    return np.array([
+        blend(float(score), matcher.score(text or "")["skill_score"])
+        for score, text in zip(embedding_scores.tolist(), resume_texts)
+    ])
+
+
+def decision_diff(rows: List[dict], new_scores: np.ndarray, decide: Callable[[float], str]) -> dict:
+    """
+    Compare each row's stored decision with the one its new score implies.
+
+    rows need id, file_name, ats_score and decision. Returns every updated row, the
+    subset that changed bucket, and counts per "Old->New" transition.
+    """
+    updates, moved = [], []
+    transitions = Counter()
+    for row, score in zip(rows, new_scores.tolist()):
+        new_decision = decide(score)
+        update = {
+            "id": row["id"],
+            "file_name": row["file_name"],
+            "old_score": row["ats_score"],
+            "new_score": score,
+            "old_decision": row["decision"],
+            "new_decision": new_decision,
+        }
+        updates.append(update)
+        if new_decision != row["decision"]:
+            moved.append(update)
+            transitions[f"{row['decision']}->{new_decision}"] += 1
+    return {"updates": updates, "moved": moved, "transitions": dict(transitions)}
@@ -0,0 +1,326 @@
+"""
+Retention: keep the live candidates table small.
+
+Candidates older than the policy's hot window are moved into an archive DB (or
+deleted, in "delete" mode) a small batch per transaction, so the write lock is only
+ever held briefly and the screening workflow keeps writing in between. Each batch
+also drops those candidates' workflow data in the same transaction: checkpoints
+and run records (hr_checkpoints.db) and the resume text in the blob store (unless
+a remaining candidate has the same resume). Their
+email ledger rows are dropped only in "delete" mode; an archived candidate keeps
+them, so re-uploading the same resume does not email them again. Large text
+values older versions stored uncompressed are compressed the same way (see
+core.compression). Pages freed by either are then returned to the filesystem with
+incremental vacuum. Workflow texts in the blob store (core.blob_store) are only
+needed while a run is in flight, so blobs unused for blob_days are pruned too. The
+RetentionScheduler runs a pass periodically; a shared lease keeps it to one worker
+process per interval.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from core.blob_store import BlobStore, content_ref
+from core.compression import compress_existing, unpack_text
+from core.config import settings
+from core.db import DB_PATH
+from core.dedup import content_hash
+from core.shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MODES = ("archive", "delete")
+# Derived from resume_text and rebuilt on demand, so not worth archiving.
+ARCHIVE_SKIP_COLUMNS = {"resume_embedding", "minhash"}
+RETENTION_LEASE = "retention"
+# Per-run rows in the checkpoint DB (attached as `runs`), all keyed by thread_id = candidates.run_id.
+RUN_TABLES = ("checkpoints", "writes", "workflow_runs")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    hot_days: Optional[float] = 90.0   # candidates older than this leave the live table; None = keep all
+    mode: str = "archive"              # "archive" (move to the archive DB) or "delete"
+    batch_size: int = 500              # rows per transaction
+    pause_seconds: float = 0.05        # between batches, so other writers get the lock
+    vacuum_pages: int = 2000           # pages returned per incremental_vacuum step
+    # One-time full VACUUM (locks the whole DB) converting an older DB to incremental once this
+    # much of the file is free; None = never, freed pages are then just reused by new rows.
+    full_vacuum_ratio: Optional[float] = None
+    interval_hours: float = 24.0
+    blob_days: Optional[float] = 7.0   # blob store texts unused this long are pruned; None = keep
+
+    def __post_init__(self):
+        if self.mode not in RETENTION_MODES:
+            raise ValueError(f"Unknown retention mode {self.mode!r}; use one of {', '.join(RETENTION_MODES)}.")
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__dataclass_fields__}
+
+
+def policy_from_env() -> RetentionPolicy:
+    hot_days = os.getenv("RETENTION_HOT_DAYS", "90").strip()
+    blob_days = os.getenv("BLOB_RETENTION_DAYS", "7").strip()
+    full_vacuum_ratio = os.getenv("RETENTION_FULL_VACUUM_RATIO", "").strip()
+    return RetentionPolicy(
+        hot_days=float(hot_days) if hot_days else None,
+        mode=os.getenv("RETENTION_MODE", "archive").strip().lower(),
+        batch_size=int(os.getenv("RETENTION_BATCH_SIZE", "500")),
+        interval_hours=float(os.getenv("RETENTION_INTERVAL_HOURS", "24")),
+        blob_days=float(blob_days) if blob_days else None,
+        full_vacuum_ratio=float(full_vacuum_ratio) if full_vacuum_ratio else None,
+    )
+
+
+def _columns(conn: sqlite3.Connection, schema: str) -> List[tuple]:
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_info(candidates)")]
+
+
+def attach_archive(conn: sqlite3.Connection, archive_path=None) -> List[str]:
+    """Attach the archive DB as `archive`, creating/extending its candidates table; returns the shared columns."""
+    if "archive" not in {row[1] for row in conn.execute("PRAGMA database_list")}:
+        conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path or settings.archive_db),))
+    live = [(name, kind) for name, kind in _columns(conn, "main") if name not in ARCHIVE_SKIP_COLUMNS]
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS archive.candidates (id INTEGER PRIMARY KEY, archived_at TIMESTAMP)")
+        archived = {name for name, _ in _columns(conn, "archive")}
+        for name, kind in live:
+            if name not in archived:
+                conn.execute(f"ALTER TABLE archive.candidates ADD COLUMN {name} {kind}")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_candidates_job_id ON candidates(job_id)")
+    return [name for name, _ in live]
+
+
+def attach_run_stores(conn: sqlite3.Connection, checkpoint_path=None, blob_path=None) -> List[str]:
+    """
+    Attach the checkpoint DB as `runs` and the blob store as `texts`; returns the
+    tables a batch should cascade to (those that exist yet).
+    """
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if "runs" not in attached:
+        conn.execute("ATTACH DATABASE ? AS runs", (str(checkpoint_path or settings.checkpoint_db),))
+    if "texts" not in attached:
+        conn.execute("ATTACH DATABASE ? AS texts", (str(blob_path or settings.blob_db),))
+    present = {f"{schema}.{row[0]}" for schema in ("runs", "texts")
+               for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table'")}
+    wanted = [f"runs.{table}" for table in RUN_TABLES] + ["runs.email_ledger", "texts.blobs"]
+    return [table for table in wanted if table in present]
+
+
+def _unshared_refs(conn: sqlite3.Connection, texts: List[str]) -> List[str]:
+    """
+    Blob refs of `texts` that no remaining candidate still uses. Blobs are content
+    addressed, so a live candidate with the same resume shares one; its dedup
+    content_hash (core.dedup) gives it away.
+    """
+    hashes = {content_ref(text): content_hash(text) for text in texts}
+    if not hashes:
+        return []
+    values = list(set(hashes.values()))
+    shared = {row[0] for row in conn.execute(
+        f"SELECT DISTINCT content_hash FROM main.candidates WHERE content_hash IN ({','.join('?' * len(values))})",
+        values,
+    )}
+    return [ref for ref, value in hashes.items() if value not in shared]
+
+
+def expire_candidates(conn: sqlite3.Connection, older_than_days: Optional[float], policy: RetentionPolicy,
+                      archive_path=None, blobs: Optional[BlobStore] = None) -> int:
+    """
+    Archive (or delete) candidates created more than `older_than_days` ago, or all of
+    them for None, one batch per transaction, along with their runs' workflow data.
+    `blobs` (the process's BlobStore) also forgets the deleted texts. Returns the
+    number of rows removed.
+    """
+    columns = attach_archive(conn, archive_path) if policy.mode == "archive" else []
+    cascade = attach_run_stores(conn, blob_path=blobs.path if blobs else None)
+    if policy.mode == "archive" and "runs.email_ledger" in cascade:
+        cascade.remove("runs.email_ledger")
+    column_list = ", ".join(columns)
+    if older_than_days is None:
+        select, params = "SELECT id FROM main.candidates ORDER BY id LIMIT ?", ()
+    else:
+        select = "SELECT id FROM main.candidates WHERE created_at < datetime('now', ?) ORDER BY created_at LIMIT ?"
+        params = (f"-{older_than_days} days",)
+    removed = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ids = [row[0] for row in conn.execute(select, params + (policy.batch_size,))]
+            if not ids:
+                conn.rollback()
+                break
+            marks = ",".join("?" * len(ids))
+            runs = conn.execute(
+                f"SELECT run_id, resume_text FROM main.candidates WHERE id IN ({marks})", ids
+            ).fetchall()
+            run_ids = [run_id for run_id, _ in runs if run_id]
+            texts = [unpack_text(text) for _, text in runs if text]
+            for table in cascade:
+                if table != "texts.blobs" and run_ids:
+                    conn.execute(f"DELETE FROM {table} WHERE thread_id IN ({','.join('?' * len(run_ids))})", run_ids)
+            if columns:
+                # OR IGNORE: a batch archived just before a crash is simply moved again.
+                # Text is copied as stored, so archived resume_text/summary may be compressed too.
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive.candidates ({column_list}, archived_at) "
+                    f"SELECT {column_list}, CURRENT_TIMESTAMP FROM main.candidates WHERE id IN ({marks})",
+                    ids,
+                )
+            conn.execute(f"DELETE FROM main.candidate_lsh WHERE candidate_id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM main.candidates WHERE id IN ({marks})", ids)
+            refs = _unshared_refs(conn, texts) if "texts.blobs" in cascade else []
+            if refs:
+                conn.execute(f"DELETE FROM texts.blobs WHERE ref IN ({','.join('?' * len(refs))})", refs)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if blobs is not None:
+            blobs.forget(refs)
+        removed += len(ids)
+        time.sleep(policy.pause_seconds)
+    return removed
+
+
+def reclaim_space(conn: sqlite3.Connection, policy: RetentionPolicy) -> dict:
+    """
+    Hand free pages back to the filesystem. With auto_vacuum=INCREMENTAL that is a few
+    short incremental_vacuum steps. SQLite can switch an older DB over only with a full
+    VACUUM, which holds an exclusive lock for its whole run, so that happens only when
+    policy.full_vacuum_ratio is set and enough of the file is free; otherwise the free
+    pages stay in the file and new rows reuse them.
+    """
+    auto_vacuum = conn.execute("PRAGMA main.auto_vacuum").fetchone()[0]
+    free_before = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+    pages = conn.execute("PRAGMA main.page_count").fetchone()[0]
+    action = "none"
+    if auto_vacuum == 2:
+        free = free_before
+        while free:
+            conn.execute(f"PRAGMA main.incremental_vacuum({int(policy.vacuum_pages)})").fetchall()
+            remaining = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+            if remaining >= free:
+                break
+            free = remaining
+            time.sleep(policy.pause_seconds)
+        action = "incremental"
+    elif policy.full_vacuum_ratio is not None and pages and free_before / pages >= policy.full_vacuum_ratio:
+        conn.execute("PRAGMA main.auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM main")
+        action = "full"
+    return {
+        "vacuum": action,
+        "freed_pages": free_before - conn.execute("PRAGMA main.freelist_count").fetchone()[0],
+        "page_count": conn.execute("PRAGMA main.page_count").fetchone()[0],
+    }
+
+
+def run_retention(policy: RetentionPolicy, db_path=None, archive_path=None,
+                  older_than_days: Optional[float] = None, blobs: Optional[BlobStore] = None) -> dict:
+    """
+    One retention pass: expire rows past the hot window (or `older_than_days`; nothing
+    when both are None), compress leftover uncompressed text, then reclaim space, and
+    prune `blobs` past policy.blob_days.
+    """
+    days = older_than_days if older_than_days is not None else policy.hot_days
+    conn = sqlite3.connect(str(db_path or DB_PATH), timeout=30)
+    try:
+        started = time.perf_counter()
+        removed = expire_candidates(conn, days, policy, archive_path, blobs) if days is not None else 0
+        compressed = compress_existing(conn, policy.batch_size, policy.pause_seconds)
+        report = {"removed": removed, "compressed": compressed, "mode": policy.mode, "older_than_days": days,
+                  **reclaim_space(conn, policy)}
+        if blobs is not None and policy.blob_days is not None:
+            report["pruned_blobs"] = blobs.prune(policy.blob_days * 86400, policy.batch_size, policy.pause_seconds)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return report
+    finally:
+        conn.close()
+
+
+def retention_status(policy: RetentionPolicy, db_path=None, archive_path=None) -> dict:
+    conn = sqlite3.connect(str(db_path or DB_PATH), timeout=30)
+    try:
+        status = {
+            "policy": policy.as_dict(),
+            "live_candidates": conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0],
+            "free_pages": conn.execute("PRAGMA freelist_count").fetchone()[0],
+            "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+            "incremental_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2,
+        }
+        if policy.hot_days is not None:
+            status["expired_candidates"] = conn.execute(
+                "SELECT COUNT(*) FROM candidates WHERE created_at < datetime('now', ?)", (f"-{policy.hot_days} days",)
+            ).fetchone()[0]
+        if policy.mode == "archive":
+            attach_archive(conn, archive_path)
+            status["archived_candidates"] = conn.execute("SELECT COUNT(*) FROM archive.candidates").fetchone()[0]
+        return status
+    finally:
+        conn.close()
+
+
+class RetentionScheduler:
+    """
+    Background thread running a retention pass every policy.interval_hours (the first
+    one shortly after start). Only the process holding the retention lease runs a
+    pass, so a multi-worker deployment does one pass per interval, not one per worker.
+    """
+
+    def __init__(self, policy: RetentionPolicy, db_path=None, shared: Optional[SharedState] = None,
+                 on_change: Optional[Callable[[], None]] = None, first_delay_seconds: float = 60.0,
+                 blobs: Optional[BlobStore] = None):
+        self.policy = policy
+        self.db_path = str(db_path or DB_PATH)
+        self.shared = shared or SharedState(self.db_path)
+        self.on_change = on_change
+        self.blobs = blobs
+        self.first_delay = first_delay_seconds
+        self.last_report: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> dict:
+        report = run_retention(self.policy, self.db_path, blobs=self.blobs)
+        self.last_report = report
+        if report["compressed"]:
+            logger.info("Retention: compressed text of %d candidates.", report["compressed"])
+        if report.get("pruned_blobs"):
+            logger.info("Retention: pruned %d unused workflow texts from the blob store.", report["pruned_blobs"])
+        if report["removed"]:
+            logger.info("Retention: %s %d candidates older than %s days (%s vacuum, %d pages freed).",
+                        "archived" if report["mode"] == "archive" else "deleted", report["removed"],
+                        report["older_than_days"], report["vacuum"], report["freed_pages"])
+            if self.on_change:
+                self.on_change()
+        return report
+
+    def _run(self):
+        interval = self.policy.interval_hours * 3600
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        wait = self.first_delay
+        while not self._stop.wait(wait):
+            wait = interval
+            try:
+                # Held for most of an interval, so siblings skip this round instead of repeating it.
+                if self.shared.acquire_lease(RETENTION_LEASE, owner, interval * 0.9):
+                    self.run_once()
+            except Exception as e:
+                logger.warning("Retention pass failed: %s", e)
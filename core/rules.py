@@ -0,0 +1,127 @@
+"""
+Per-job decision rules.
+
+Each job row carries its own rejection / human-review thresholds. `RulesEngine` loads
+them once per job, compiles them into a `DecisionRules` object (a bisect over the
+bounds) and caches it, so the workflow, the re-scorer and the API all bucket a score
+the same way without touching the DB per candidate. An invalidation in one worker
+process reaches the others through a shared cache generation.
+"""
+import logging
+import sqlite3
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from core.db import DB_PATH
+from core.shared_state import SharedState, shared_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REJECTION_THRESHOLD = 60.0
+DEFAULT_HUMAN_REVIEW_THRESHOLD = 75.0
+
+DECISIONS = ("Rejected", "Review", "Accepted")
+
+
+class DecisionRules:
+    """score < rejection -> Rejected, score < human_review -> Review, else Accepted."""
+
+    def __init__(self, rejection_threshold: float = DEFAULT_REJECTION_THRESHOLD,
+                 human_review_threshold: float = DEFAULT_HUMAN_REVIEW_THRESHOLD):
+        if rejection_threshold > human_review_threshold:
+            raise ValueError("rejection_threshold must not exceed human_review_threshold.")
+        self.rejection_threshold = float(rejection_threshold)
+        self.human_review_threshold = float(human_review_threshold)
+        self._bounds = (self.rejection_threshold, self.human_review_threshold)
+
+    def decide(self, score: float) -> str:
+        return DECISIONS[bisect_right(self._bounds, score)]
+
+    __call__ = decide
+
+    def sql_case(self, column: str = "ats_score") -> Tuple[str, tuple]:
+        """The same rule as a SQL CASE expression, for re-bucketing stored scores in bulk."""
+        sql = f"CASE WHEN {column} < ? THEN ? WHEN {column} < ? THEN ? ELSE ? END"
+        return sql, (self.rejection_threshold, DECISIONS[0], self.human_review_threshold, DECISIONS[1], DECISIONS[2])
+
+    def as_dict(self) -> dict:
+        return {"rejection_threshold": self.rejection_threshold, "human_review_threshold": self.human_review_threshold}
+
+
+DEFAULT_RULES = DecisionRules()
+
+
+class RulesEngine:
+    def __init__(self, db_path, shared: Optional[SharedState] = None):
+        self.db_path = str(db_path)
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, DecisionRules] = {}
+        self._generation = 0
+
+    def _load(self, where: str, key) -> DecisionRules:
+        try:
+            # Read-only: never create a DB (or a jobs table) just to look up thresholds.
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                row = conn.execute(
+                    f"SELECT rejection_threshold, human_review_threshold FROM jobs WHERE {where}=?", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError as e:
+            logger.debug("No job thresholds available (%s); using defaults.", e)
+            return DEFAULT_RULES
+        return DecisionRules(*row) if row else DEFAULT_RULES
+
+    def _get(self, where: str, key) -> DecisionRules:
+        if key is None:
+            return DEFAULT_RULES
+        if self.shared is not None:
+            generation = self.shared.generation("rules")
+            if generation != self._generation:
+                with self._lock:
+                    self._cache.clear()
+                    self._generation = generation
+        cache_key = (where, key)
+        rules = self._cache.get(cache_key)
+        if rules is None:
+            rules = self._load(where, key)
+            with self._lock:
+                self._cache[cache_key] = rules
+        return rules
+
+    def for_job(self, job_id: Optional[int]) -> DecisionRules:
+        return self._get("id", job_id)
+
+    def for_ref(self, job_ref: Optional[str]) -> DecisionRules:
+        """Rules for the job whose description has this content ref (what workflow state carries)."""
+        return self._get("content_hash", job_ref)
+
+    def invalidate(self):
+        """Drop compiled rules; call after a job's thresholds or description change."""
+        with self._lock:
+            self._cache.clear()
+        if self.shared is not None:
+            self._generation = self.shared.bump("rules")
+
+    def reapply(self, conn: sqlite3.Connection, job_id: int, rules: Optional[DecisionRules] = None) -> dict:
+        """
+        Re-bucket a job's stored scores in one UPDATE (no re-embedding), with `rules` or
+        the job's current ones. Returns counts per "Old->New" transition.
+        """
+        case, params = (rules or self.for_job(job_id)).sql_case()
+        transitions = Counter()
+        for old, new, count in conn.execute(
+            f"SELECT decision, {case}, COUNT(*) FROM candidates WHERE job_id=? GROUP BY 1, 2",
+            params + (job_id,),
+        ):
+            if old != new:
+                transitions[f"{old}->{new}"] += count
+        conn.execute(f"UPDATE candidates SET decision = {case} WHERE job_id=?", params + (job_id,))
+        return dict(transitions)
+
+
+rules_engine = RulesEngine(DB_PATH, shared_state)
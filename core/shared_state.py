@@ -0,0 +1,105 @@
+"""
+State shared by the worker processes of one host, kept in the candidates DB.
+
+* cache generations - a process that invalidates a cache bumps its counter; the other
+  processes notice the new value (polled at most every `poll_seconds`) and drop
+  their own copy of that cache.
+* leases - a named lock with an expiry, so exactly one process runs a singleton
+  task (the invite sender) and another takes over if that process dies.
+
+No connection is held between calls, so this is safe to use across fork().
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+from core.config import settings
+from core.db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class SharedState:
+    def __init__(self, db_path, poll_seconds: float = 1.0):
+        self.db_path = str(db_path)
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._seen: Dict[str, Tuple[int, float]] = {}  # name -> (generation, monotonic time read)
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._ready:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_generations (name TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+            self._ready = True
+        return conn
+
+    def generation(self, name: str) -> int:
+        """Current generation of `name`, re-read from the DB at most every poll_seconds."""
+        with self._lock:
+            seen = self._seen.get(name)
+        if seen is not None and time.monotonic() - seen[1] < self.poll_seconds:
+            return seen[0]
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT generation FROM cache_generations WHERE name=?", (name,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.debug("Shared cache generation unavailable (%s).", e)
+            return seen[0] if seen else 0
+        value = row[0] if row else 0
+        with self._lock:
+            self._seen[name] = (value, time.monotonic())
+        return value
+
+    def bump(self, name: str) -> int:
+        """Invalidate `name` in every process; returns the new generation."""
+        conn = self._connect()
+        try:
+            with conn:
+                value = conn.execute(
+                    "INSERT INTO cache_generations (name, generation) VALUES (?, 1) "
+                    "ON CONFLICT(name) DO UPDATE SET generation = generation + 1 RETURNING generation",
+                    (name,),
+                ).fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            self._seen[name] = (value, time.monotonic())
+        return value
+
+    def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """Take or renew the lease; False while another live owner holds it."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(
+                    "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET owner=excluded.owner, expires_at=excluded.expires_at "
+                    "WHERE leases.owner=excluded.owner OR leases.expires_at < ?",
+                    (name, owner, now + ttl_seconds, now),
+                ).rowcount == 1
+        finally:
+            conn.close()
+
+    def release_lease(self, name: str, owner: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM leases WHERE name=? AND owner=?", (name, owner))
+        finally:
+            conn.close()
+
+
+shared_state = SharedState(DB_PATH, settings.shared_state_poll_seconds)
@@ -0,0 +1,160 @@
+"""
+Keyword side of the hybrid ATS score.
+
+Required skills are pulled out of a JD once (by matching it against SKILL_ALIASES) and
+compiled into a single case-insensitive regex built from a trie of every alias, so a
+resume is scanned in one left-to-right pass no matter how many skills the job lists.
+Matchers are cached per JD text, so every further resume for the same job only pays
+for that scan.
+"""
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# canonical skill -> spellings that count as that skill (matched case-insensitively)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "python": ["python"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript", "ts"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp"],
+    ".net": [".net", "dotnet"],
+    "sql": ["sql"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "kafka": ["kafka"],
+    "spark": ["spark", "pyspark"],
+    "airflow": ["airflow"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud"],
+    "azure": ["azure"],
+    "linux": ["linux"],
+    "git": ["git"],
+    "ci/cd": ["ci/cd", "continuous integration"],
+    "react": ["react", "react.js", "reactjs"],
+    "angular": ["angular"],
+    "vue": ["vue", "vue.js"],
+    "node.js": ["node.js", "nodejs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring boot", "spring framework"],
+    "rest": ["restful", "rest api", "rest apis"],
+    "graphql": ["graphql"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "pytorch": ["pytorch"],
+    "tensorflow": ["tensorflow"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "llm": ["llm", "llms", "large language models"],
+    "langchain": ["langchain"],
+    "computer vision": ["computer vision"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi"],
+    "excel": ["microsoft excel", "ms excel"],
+    "agile": ["agile", "scrum"],
+    "pmp": ["pmp"],
+    "cissp": ["cissp"],
+    "aws certified": ["aws certified"],
+}
+
+# Optional extra skills, one per line, "canonical: alias, alias" or just "canonical".
+SKILLS_FILE = os.getenv("ATS_SKILLS_FILE")
+if SKILLS_FILE:
+    try:
+        with open(SKILLS_FILE, encoding="utf-8") as f:
+            for line in f:
+                name, _, aliases = line.strip().partition(":")
+                if name:
+                    spellings = [a.strip() for a in aliases.split(",") if a.strip()]
+                    SKILL_ALIASES[name.strip().lower()] = [name.strip().lower()] + [a.lower() for a in spellings]
+    except OSError as e:
+        logger.warning("Could not read ATS_SKILLS_FILE %s: %s", SKILLS_FILE, e)
+
+# Share of the ATS score that comes from skill coverage (rest is embedding similarity).
+SKILL_WEIGHT = float(os.getenv("ATS_SKILL_WEIGHT", "0.3"))
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex alternation shaped like a trie, so shared prefixes are only tried once."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not ends else "(?:" + "|".join(branches) + ")"
+        if ends:
+            body = body if body.startswith("(?:") else "(?:" + body + ")"
+            body += "?"
+        return body
+
+    return build(trie)
+
+
+def _compile(aliases: Iterable[str]) -> "re.Pattern":
+    # Skill tokens may contain + # . /, so plain \b boundaries are not enough.
+    return re.compile(r"(?<![\w+#])(" + _trie_regex(aliases) + r")(?![\w+#]|\.\w)", re.IGNORECASE)
+
+
+_ALIAS_TO_SKILL = {alias: skill for skill, aliases in SKILL_ALIASES.items() for alias in aliases}
+_VOCABULARY = _compile(_ALIAS_TO_SKILL)
+
+
+class SkillMatcher:
+    def __init__(self, required: Iterable[str]):
+        self.required = sorted(set(required))
+        aliases = [alias for skill in self.required for alias in SKILL_ALIASES.get(skill, [skill])]
+        self._pattern = _compile(aliases) if aliases else None
+
+    def matched(self, text: str) -> set:
+        if self._pattern is None:
+            return set()
+        return {_ALIAS_TO_SKILL.get(m.lower(), m.lower()) for m in self._pattern.findall(text)}
+
+    def score(self, text: str) -> dict:
+        """Skill coverage 0-100; None when the JD names no known skills."""
+        if not self.required:
+            return {"skill_score": None, "matched_skills": [], "missing_skills": []}
+        matched = self.matched(text)
+        return {
+            "skill_score": round(100.0 * len(matched) / len(self.required), 2),
+            "matched_skills": sorted(matched),
+            "missing_skills": sorted(set(self.required) - matched),
+        }
+
+
+def extract_skills(job_text: str) -> List[str]:
+    return sorted({_ALIAS_TO_SKILL[m.lower()] for m in _VOCABULARY.findall(job_text)})
+
+
+@lru_cache(maxsize=128)
+def matcher_for_job(job_text: str) -> SkillMatcher:
+    return SkillMatcher(extract_skills(job_text))
+
+
+def blend(embedding_score: float, skill_score, weight: float = SKILL_WEIGHT) -> float:
+    if skill_score is None:
+        return embedding_score
+    return round((1 - weight) * embedding_score + weight * skill_score, 2)
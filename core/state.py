@@ -1,10 +1,16 @@
 from typing import TypedDict,Optional
 
+from core.blob_store import blob_store
+
 class HRApplicationState(TypedDict):
+    run_id:Optional[str]   # checkpoint thread id; also keys the email idempotency ledger
     pdf_path:str
-    resume_text:str
+    file_name:Optional[str]
+    # Large texts live in core.blob_store; the state only carries their content refs.
+    resume_ref:Optional[str]
+    job_ref:str
+    resume_chars:int
     email:str
-    job_text:str
     ats_score:float
     resume_summary:Optional[str]
     
@@ -13,4 +19,31 @@ class HRApplicationState(TypedDict):
     extraction_error: bool        # True if PDF extraction failed
     scoring_error: bool           # True if ATS scoring failed
     email_error: bool             # True if email sending failed
-    error_message: Optional[str]
\ No newline at end of file
+    error_message: Optional[str]
+    duplicate_of: Optional[int]   # id of an earlier candidate for this job; the run stops after extraction
+    candidate_id: Optional[int]   # candidates row written by persist_candidate
+    prefilter_reason: Optional[str]  # why core.prefilter rejected the resume early; None = full pipeline
+
+
+def new_application_state(pdf_path: str, job_text: str, run_id: Optional[str] = None,
+                          file_name: Optional[str] = None) -> HRApplicationState:
+    """Initial workflow state for one resume."""
+    return {
+        'run_id': run_id,
+        'pdf_path': str(pdf_path),
+        'file_name': file_name,
+        'job_ref': blob_store.put(job_text),
+        'resume_ref': None,
+        'resume_chars': 0,
+        'email': '',
+        'ats_score': 0.0,
+        'resume_summary': None,
+        'extraction_error': False,
+        'scoring_error': False,
+        'email_error': False,
+        'error_message': None,
+        'email_sent': False,
+        'duplicate_of': None,
+        'candidate_id': None,
+        'prefilter_reason': None,
+    }
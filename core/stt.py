@@ -0,0 +1,149 @@
+import io
+import json
+import os
+import wave
+from typing import Optional
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int, channels: int = 1, sampwidth: int = 2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sampwidth)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def split_wav_header(chunk: bytes):
+    """
+    If `chunk` starts with a RIFF/WAVE header, return (sample_rate, pcm_after_header).
+    Otherwise return (None, chunk) and treat it as raw PCM.
+    """
+    if not chunk.startswith(b"RIFF") or chunk[8:12] != b"WAVE":
+        return None, chunk
+    sample_rate = int.from_bytes(chunk[24:28], "little")
+    data_at = chunk.find(b"data", 12)
+    if data_at == -1:
+        return sample_rate, b""
+    return sample_rate, chunk[data_at + 8:]
+
+
+class BufferedStream:
+    """Streaming session for engines without incremental decoding: buffer, then transcribe once."""
+
+    def __init__(self, recognizer, sample_rate: int):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self._pcm = bytearray()
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self._pcm.extend(pcm)
+        return None
+
+    def finish(self) -> str:
+        if not self._pcm:
+            return ""
+        return self.recognizer.transcribe(pcm_to_wav(bytes(self._pcm), self.sample_rate))
+
+
+class GoogleRecognizer:
+    """speech_recognition + Google Web Speech API (network)."""
+
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.language = language
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        recognizer = self._sr.Recognizer()
+        with self._sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio_data = recognizer.record(source)
+        return recognizer.recognize_google(audio_data, language=self.language)
+
+    def new_stream(self, sample_rate: int = 16000):
+        return BufferedStream(self, sample_rate)
+
+
+class VoskStream:
+    def __init__(self, model, sample_rate: int):
+        from vosk import KaldiRecognizer
+
+        self._recognizer = KaldiRecognizer(model, sample_rate)
+        self._segments = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Feed PCM; returns the running partial transcript."""
+        if self._recognizer.AcceptWaveform(pcm):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._segments.append(text)
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+            return " ".join(self._segments + ([partial] if partial else []))
+        return " ".join(self._segments)
+
+    def finish(self) -> str:
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self._segments.append(text)
+        return " ".join(self._segments)
+
+
+class VoskRecognizer:
+    """Offline Kaldi-based recognizer. Expects mono 16-bit PCM."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        # Model is read-only after load and shared by every KaldiRecognizer.
+        self.model = Model(model_path)
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as w:
+            if w.getnchannels() != 1 or w.getsampwidth() != 2:
+                raise ValueError("Vosk requires mono 16-bit PCM WAV audio.")
+            stream = self.new_stream(w.getframerate())
+            while True:
+                frames = w.readframes(4000)
+                if not frames:
+                    break
+                stream.accept(frames)
+        return stream.finish()
+
+    def new_stream(self, sample_rate: int = 16000):
+        return VoskStream(self.model, sample_rate)
+
+
+class WhisperRecognizer:
+    """Offline Whisper via faster-whisper (CTranslate2, CPU int8 by default)."""
+
+    name = "whisper"
+
+    def __init__(self, model_size_or_path: str = "base.en", compute_type: str = "int8"):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model_size_or_path, device="cpu", compute_type=compute_type)
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        segments, _ = self.model.transcribe(io.BytesIO(wav_bytes), beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def new_stream(self, sample_rate: int = 16000):
+        return BufferedStream(self, sample_rate)
+
+
+def recognizer_from_env():
+    """Pick the STT engine from STT_ENGINE (google | vosk | whisper)."""
+    name = os.getenv("STT_ENGINE", "google").strip().lower()
+    if name == "vosk":
+        return VoskRecognizer(os.getenv("STT_MODEL_PATH", "models/vosk-model-small-en-us-0.15"))
+    if name == "whisper":
+        return WhisperRecognizer(os.getenv("STT_MODEL_PATH", "base.en"))
+    return GoogleRecognizer(language=os.getenv("STT_LANGUAGE", "en-US"))
@@ -0,0 +1,110 @@
+"""In-process cache for interview-page token lookups (/candidate/{token})."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.shared_state import SharedState, shared_state
+
+
+class TokenEntry:
+    __slots__ = ("candidate_id", "payload", "expires_at", "cached_until")
+
+    def __init__(self, candidate_id: int, payload: dict, expires_at: Optional[float], cached_until: float):
+        self.candidate_id = candidate_id
+        self.payload = payload
+        self.expires_at = expires_at      # link expiry (epoch seconds); None = never
+        self.cached_until = cached_until  # monotonic deadline of this cache entry
+
+    def link_expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_at is not None and (now or time.time()) >= self.expires_at
+
+
+class TokenCache:
+    """
+    token -> candidate payload, bounded (LRU) and with a TTL so edits made elsewhere
+    show up within `ttl_seconds` even without an explicit invalidation.
+
+    With `shared`, invalidations also reach the caches of the other worker processes:
+    each one bumps a shared generation, and a cache that sees a newer generation than
+    its own starts over empty.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 4096, shared: Optional[SharedState] = None,
+                 name: str = "token_cache"):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.shared = shared
+        self.name = name
+        self._entries: "OrderedDict[str, TokenEntry]" = OrderedDict()
+        self._by_candidate = {}
+        self._lock = threading.Lock()
+        self._generation = shared.generation(name) if shared else 0
+
+    def _sync(self):
+        if self.shared is None:
+            return
+        generation = self.shared.generation(self.name)
+        if generation != self._generation:
+            with self._lock:
+                self._entries.clear()
+                self._by_candidate.clear()
+                self._generation = generation
+
+    def _publish(self):
+        if self.shared is not None:
+            self._generation = self.shared.bump(self.name)
+
+    def get(self, token: str) -> Optional[TokenEntry]:
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry.cached_until:
+                self._drop(token)
+                return None
+            self._entries.move_to_end(token)
+            return entry
+
+    def put(self, token: str, candidate_id: int, payload: dict, expires_at: Optional[float]) -> TokenEntry:
+        entry = TokenEntry(candidate_id, payload, expires_at, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._drop(token)
+            self._entries[token] = entry
+            self._by_candidate[candidate_id] = token
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return entry
+
+    def invalidate_candidates(self, candidate_ids):
+        """Forget the tokens of these candidates (re-invited or deleted)."""
+        with self._lock:
+            for candidate_id in candidate_ids:
+                token = self._by_candidate.get(candidate_id)
+                if token is not None:
+                    self._drop(token)
+        self._publish()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_candidate.clear()
+        self._publish()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is not None and self._by_candidate.get(entry.candidate_id) == token:
+            del self._by_candidate[entry.candidate_id]
+
+
+def token_cache_from_env() -> TokenCache:
+    return TokenCache(
+        ttl_seconds=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300")),
+        max_entries=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "4096")),
+        shared=shared_state,
+    )
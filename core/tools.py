@@ -1,27 +1,37 @@
 from langchain_core.tools import tool
 import PyPDF2
-from sentence_transformers import SentenceTransformer,util
+from sentence_transformers import util
 from email.message import EmailMessage
 import re ,os 
+import logging
 import smtplib
 from dotenv import load_dotenv
+from core.embedding_service import batcher_from_env, load_model
+from core.metrics import track_stage
+from core.skills import blend, matcher_for_job
 load_dotenv()
+logger = logging.getLogger(__name__)
 try:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    print("model loaded successfully")
+    model = load_model()
+    logger.info("model loaded successfully")
 except Exception as e:
     raise e 
 
+# Shared across concurrent workflow runs so their encode calls are batched together.
+embedding_batcher = batcher_from_env(model)
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
 @tool
 def extract_text_from_pdf(pdf_path):
     """Extract text and email address from a PDF resume."""
     try:
-        with open(pdf_path,"rb") as f:
+        with track_stage("pdf"), open(pdf_path,"rb") as f:
             reader = PyPDF2.PdfReader(f)
             text =""
             for page in reader.pages:
                 text += page.extract_text()
-        email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",text)
+        email_match = EMAIL_PATTERN.search(text)
         email = email_match.group(0) if email_match else ""
         
         return {"resume_text":text,"email":email,"extraction_error":False,"error_message":None}
@@ -31,7 +41,8 @@ def extract_text_from_pdf(pdf_path):
 @tool
 def llm_ats_score(resume_text:str,job_text:str):
     """
-    Compute semantic similarity between resume and job description using embeddings.
+    Compute semantic similarity between resume and job description using embeddings,
+    blended with coverage of the skills the job description asks for.
     Returns an ATS score between 0–100.
     """
     if not model:
@@ -39,10 +50,14 @@ def llm_ats_score(resume_text:str,job_text:str):
         return {"ats_score":0.0,"scoring_error":True,"error_message":error_msg}
     
     try:
-        embaddings = model.encode([resume_text,job_text])
+        with track_stage("embedding"):
+            embaddings = embedding_batcher.encode([resume_text,job_text])
         similarity= util.cos_sim(embaddings[0],embaddings[1]).item()
-        score = round(similarity*100,2)
-        return{"ats_score":score,"scoring_error":False,"error_message":None}
+        embedding_score = round(similarity*100,2)
+        with track_stage("skills"):
+            skills = matcher_for_job(job_text).score(resume_text)
+        score = blend(embedding_score, skills["skill_score"])
+        return{"ats_score":score,"embedding_score":embedding_score,**skills,"scoring_error":False,"error_message":None}
     except Exception as e :
         return{"ats_score":0.0,"scoring_error":True,"error_message":e}
 
@@ -130,14 +145,14 @@ HR Recruitment Team
         msg.set_content(plain_text)
         msg.add_alternative(html_content, subtype='html')
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+        with track_stage("smtp"), smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(sender, password)
             server.send_message(msg)
-        print(f"Rejection email sent to: {email}")
+        logger.info("Rejection email sent to: %s", email)
         return {"email_sent": True, "email_error": False, "error_message": None}
     except Exception as e:
         error_msg = f"Error sending rejection email to {email}: {e}"
-        print(f"{error_msg}")
+        logger.error(error_msg)
         return {"email_sent": False, "email_error": True, "error_message": error_msg}
 
 @tool
@@ -241,14 +256,14 @@ HR Recruitment Team
         msg.set_content(plain_text)
         msg.add_alternative(html_content, subtype='html')
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+        with track_stage("smtp"), smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(sender, password)
             server.send_message(msg)
-        print(f"Acceptance email sent to: {email}")
+        logger.info("Acceptance email sent to: %s", email)
         return {"email_sent": True, "email_error": False, "error_message": None}
     except Exception as e:
         error_msg = f"Error sending acceptance email to {email}: {e}"
-        print(f"{error_msg}")
+        logger.error(error_msg)
         return {"email_sent": False, "email_error": True, "error_message": error_msg}
     
     
@@ -353,12 +368,12 @@ HR Recruitment Team
         msg.set_content(plain_text)
         msg.add_alternative(html_content, subtype='html')
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+        with track_stage("smtp"), smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(sender, password)
             server.send_message(msg)
-        print(f"Review email sent to: {email}")
+        logger.info("Review email sent to: %s", email)
         return {"email_sent": True, "email_error": False, "error_message": None}
     except Exception as e:
         error_msg = f"Error sending review email to {email}: {e}"
-        print(f"{error_msg}")
+        logger.error(error_msg)
         return {"email_sent": False, "email_error": True, "error_message": error_msg}
\ No newline at end of file
@@ -0,0 +1,317 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from core.config import settings
+from core.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+
+GREETING_TEMPLATE = "Hello {name}! I'm your AI interviewer. I've reviewed your resume. Shall we begin?"
+
+# Phrases the interviewer says often enough that rendering them at startup pays off.
+COMMON_PHRASES = [
+    "Hello! I'm your AI interviewer. I've reviewed your resume. Shall we begin?",
+    "Thank you for your answer.",
+    "Could you elaborate on that?",
+    "Let's move on to the next question.",
+    "Thank you for your time today. This concludes the interview.",
+]
+
+
+class GTTSEngine:
+    """Google Translate TTS (network round trip per call)."""
+
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    def __init__(self, lang: str = "en", tld: str = "com"):
+        self.lang = lang
+        self.tld = tld
+        self.voice = f"gtts:{lang}:{tld}"
+
+    def synthesize(self, text: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakEngine:
+    """Offline engine that shells out to espeak-ng/espeak and returns WAV bytes."""
+
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, voice: str = "en", rate: int = 165, binary: Optional[str] = None):
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak-ng/espeak binary not found on PATH.")
+        self.rate = rate
+        self.voice_name = voice
+        self.voice = f"espeak:{voice}:{rate}"
+
+    def synthesize(self, text: str) -> bytes:
+        # Text goes in on stdin, never argv, so text starting with "-" is not read as an option.
+        result = subprocess.run(
+            [self.binary, "-v", self.voice_name, "-s", str(self.rate), "--stdout", "--stdin"],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+        return result.stdout
+
+
+class Pyttsx3Engine:
+    """Offline engine backed by pyttsx3 (SAPI5/NSSpeech/espeak drivers)."""
+
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, voice_id: Optional[str] = None, rate: Optional[int] = None):
+        import pyttsx3
+
+        self._engine = pyttsx3.init()
+        if voice_id:
+            self._engine.setProperty("voice", voice_id)
+        if rate:
+            self._engine.setProperty("rate", rate)
+        # pyttsx3 drives a single native event loop and is not thread-safe.
+        self._lock = threading.Lock()
+        self.voice = f"pyttsx3:{voice_id or 'default'}:{rate or 'default'}"
+
+    def synthesize(self, text: str) -> bytes:
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self._engine.save_to_file(text, tmp_path)
+                self._engine.runAndWait()
+                with open(tmp_path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(tmp_path)
+
+
+def engine_from_env():
+    """Pick the TTS engine from TTS_ENGINE (gtts | espeak | pyttsx3)."""
+    name = os.getenv("TTS_ENGINE", "gtts").strip().lower()
+    if name == "espeak":
+        return EspeakEngine(voice=os.getenv("TTS_VOICE", "en"))
+    if name == "pyttsx3":
+        return Pyttsx3Engine(voice_id=os.getenv("TTS_VOICE") or None)
+    return GTTSEngine(lang=os.getenv("TTS_VOICE", "en"))
+
+
+class TTSCache:
+    """
+    Content-addressed cache of rendered audio on disk.
+
+    Files are named by sha256(voice + text), so the same sentence in the same voice
+    is synthesized once. A file's mtime doubles as its last-access time; eviction
+    drops anything older than `max_age_seconds`, then least recently used files
+    until the directory fits in `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, engine, max_bytes: int = 200 * 1024 * 1024, max_age_seconds: float = 7 * 24 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._total_bytes = sum(p.stat().st_size for p in self._files())
+        self.evict()
+
+    @property
+    def media_type(self) -> str:
+        return self.engine.media_type
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.engine.voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def path_for(self, text: str) -> Path:
+        return self.cache_dir / f"{self.key(text)}.{self.engine.extension}"
+
+    def get(self, text: str) -> Path:
+        """Return the cached audio file for text, rendering it on a miss."""
+        path = self.path_for(text)
+        if self._touch(path):
+            return path
+
+        with self._lock:
+            event = self._inflight.get(path)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[path] = event
+        if not owner:
+            # Someone else is already rendering this exact text; wait for them.
+            event.wait()
+            if self._touch(path):
+                return path
+            return self.get(text)
+
+        try:
+            with track_stage("tts"):
+                audio = self.engine.synthesize(text)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._total_bytes += len(audio)
+                over_budget = self._total_bytes > self.max_bytes
+            if over_budget:
+                self.evict(keep=path)
+            return path
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+            event.set()
+
+    def read(self, text: str) -> bytes:
+        return self.get(text).read_bytes()
+
+    def prerender(self, phrases: Iterable[str]):
+        """Warm the cache; failures are logged and skipped."""
+        for phrase in phrases:
+            try:
+                self.get(phrase)
+            except Exception as e:
+                logger.warning("TTS prerender failed for %r: %s", phrase, e)
+
+    def evict(self, keep: Optional[Path] = None):
+        now = time.time()
+        entries = []
+        for p in self._files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            if p != keep and now - st.st_mtime > self.max_age_seconds:
+                self._unlink(p)
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            self._unlink(p)
+            total -= size
+        with self._lock:
+            self._total_bytes = total
+
+    def _files(self):
+        return [p for p in self.cache_dir.glob(f"*.{self.engine.extension}") if p.is_file()]
+
+    def _touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def cache_from_env(engine=None) -> TTSCache:
+    """Build a TTSCache from TTS_CACHE_DIR / TTS_CACHE_MAX_MB / TTS_CACHE_MAX_AGE_HOURS."""
+    return TTSCache(
+        settings.tts_cache_dir,
+        engine or engine_from_env(),
+        max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024),
+        max_age_seconds=float(os.getenv("TTS_CACHE_MAX_AGE_HOURS", "168")) * 3600,
+    )
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str, min_chars: int = 24) -> List[str]:
+    """
+    Split text at sentence boundaries for chunked synthesis.
+
+    Fragments shorter than `min_chars` are merged into the next sentence so we
+    don't pay a synthesis call (and an audible gap) for "Great." on its own.
+    """
+    chunks = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_chars:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        if chunks and len(pending) < min_chars:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+def _wav_stream_header(first_chunk: bytes) -> bytes:
+    """WAV header copied from the first chunk, with sizes set to 'unknown' for streaming."""
+    with wave.open(io.BytesIO(first_chunk), "rb") as w:
+        channels, sampwidth, framerate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+    block_align = channels * sampwidth
+    return b"".join([
+        b"RIFF", (0xFFFFFFFF).to_bytes(4, "little"), b"WAVE",
+        b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"),
+        channels.to_bytes(2, "little"), framerate.to_bytes(4, "little"),
+        (framerate * block_align).to_bytes(4, "little"), block_align.to_bytes(2, "little"),
+        (sampwidth * 8).to_bytes(2, "little"),
+        b"data", (0xFFFFFFFF).to_bytes(4, "little"),
+    ])
+
+
+def _wav_frames(chunk: bytes) -> bytes:
+    with wave.open(io.BytesIO(chunk), "rb") as w:
+        return w.readframes(w.getnframes())
+
+
+def stream_audio(cache: TTSCache, text: str, executor: Executor) -> Iterator[bytes]:
+    """
+    Yield audio for `text` sentence by sentence, in order.
+
+    Every sentence is submitted to `executor` up front so later sentences render
+    while the first one is already being played. MP3 frames can simply be
+    concatenated; WAV chunks are re-wrapped under a single streaming header.
+    """
+    futures = [executor.submit(cache.read, sentence) for sentence in split_sentences(text)]
+    try:
+        for index, future in enumerate(futures):
+            audio = future.result()
+            if cache.engine.extension == "wav":
+                if index == 0:
+                    yield _wav_stream_header(audio)
+                yield _wav_frames(audio)
+            else:
+                yield audio
+    finally:
+        for future in futures:
+            future.cancel()
@@ -1,4 +1,5 @@
 import os
+from urllib.parse import quote, urlencode
 import requests
 import pandas as pd
 import streamlit as st
@@ -12,6 +13,7 @@ st.set_page_config(page_title="HR SmartHire AI", page_icon="🤖", layout="wide"
 
 
 BACKEND_URL = st.sidebar.text_input("Backend URL", os.getenv("BACKEND_URL", "http://localhost:8000"))
+STREAM_TTS = st.sidebar.checkbox("Stream interviewer audio", value=True, help="Start playback at the first sentence. Requires the browser to reach the backend URL.")
 st.sidebar.info("Ensure your FastAPI backend is running.")
 st.sidebar.write("🧑‍💻 Developer: Mithurshan")
 
@@ -33,7 +35,8 @@ if "candidate_token_data" not in st.session_state:
 def process_resume(file, jd):
     try:
         files = {"resume_file": (file.name, file.getvalue(), "application/pdf")}
-        data = {"job_description": jd}
+        # The resume text is only needed to save the candidate, so ask for it inline.
+        data = {"job_description": jd, "expand": "resume_text"}
         resp = requests.post(f"{BACKEND_URL}/process_resume/", files=files, data=data, timeout=60)
         if resp.status_code == 200:
             res = resp.json()
@@ -44,7 +47,7 @@ def process_resume(file, jd):
     except Exception as e:
         return {"file_name": file.name, "ats_score": 0, "error": str(e)}
 
-def save_candidate_to_db(result, job_description):
+def candidate_payload(result, job_description):
     payload = {
         "file_name": result["file_name"],
         "email": result.get("email", ""),
@@ -52,16 +55,25 @@ def save_candidate_to_db(result, job_description):
         "decision": result["decision"],
         "summary": result.get("resume_summary", ""),
         "resume_text": result.get("resume_text", ""),
-        "job_description": job_description
     }
+    # The backend registers each JD as a job; link by id so the text isn't stored per candidate.
+    if result.get("job_id") is not None:
+        payload["job_id"] = result["job_id"]
+    else:
+        payload["job_description"] = job_description
+    return payload
+
+def save_candidates_to_db(results, job_description):
+    """One request (and one DB transaction) for the whole batch."""
+    payload = [candidate_payload(result, job_description) for result in results]
     try:
-        requests.post(f"{BACKEND_URL}/candidates/", json=payload)
+        requests.post(f"{BACKEND_URL}/candidates/bulk", json=payload)
     except Exception as e:
         st.error(f"Failed to save candidate: {e}")
 
-def get_candidates_from_db():
+def get_candidates_from_db(filters=None):
     try:
-        resp = requests.get(f"{BACKEND_URL}/candidates/")
+        resp = requests.get(f"{BACKEND_URL}/candidates/", params=filters or {})
         if resp.status_code == 200:
             return resp.json()
         return []
@@ -69,6 +81,35 @@ def get_candidates_from_db():
         st.error(f"Failed to fetch candidates: {e}")
         return []
 
+def get_jobs():
+    try:
+        resp = requests.get(f"{BACKEND_URL}/jobs/")
+        if resp.status_code == 200:
+            return resp.json()
+        return []
+    except Exception as e:
+        st.error(f"Failed to fetch jobs: {e}")
+        return []
+
+def invite_candidates_bulk(candidate_ids):
+    try:
+        resp = requests.post(f"{BACKEND_URL}/invite_candidates/bulk", json={"candidate_ids": candidate_ids})
+        if resp.status_code == 200:
+            return resp.json()
+        st.error(f"Failed to queue invites: {resp.text}")
+    except Exception as e:
+        st.error(f"Failed to queue invites: {e}")
+    return None
+
+def get_invite_job(job_id):
+    try:
+        resp = requests.get(f"{BACKEND_URL}/invite_jobs/{job_id}")
+        if resp.status_code == 200:
+            return resp.json()
+    except Exception as e:
+        st.error(f"Failed to fetch invite status: {e}")
+    return None
+
 def invite_candidate(candidate_id, name, email):
     payload = {
         "candidate_id": candidate_id,
@@ -120,16 +161,37 @@ def get_ai_response(user_input, candidate_data=None):
         return None
 
 def text_to_speech(text):
+    """(audio bytes, media type) from the backend's TTS engine, or (None, None)."""
     try:
         resp = requests.post(f"{BACKEND_URL}/tts/", json={"text": text})
         if resp.status_code == 200:
-            return resp.content
+            return resp.content, resp.headers.get("Content-Type", "audio/mpeg")
         else:
             st.error(f"TTS Error: {resp.text}")
-            return None
+            return None, None
     except Exception as e:
         st.error(f"TTS Error: {e}")
-        return None
+        return None, None
+
+def tts_stream_format():
+    # The format depends on the backend's TTS engine; ask once per session (HEAD synthesizes nothing).
+    if "tts_stream_format" not in st.session_state:
+        try:
+            resp = requests.head(f"{BACKEND_URL}/tts/stream", timeout=5)
+            resp.raise_for_status()
+            st.session_state.tts_stream_format = resp.headers.get("Content-Type", "audio/mpeg")
+        except requests.RequestException:
+            return "audio/mpeg"
+    return st.session_state.tts_stream_format
+
+def play_response_audio(text):
+    if STREAM_TTS:
+        # The browser fetches the chunked stream itself and starts playing at sentence one.
+        st.audio(f"{BACKEND_URL}/tts/stream?text={quote(text)}", format=tts_stream_format(), autoplay=True)
+        return
+    audio_content, media_type = text_to_speech(text)
+    if audio_content:
+        st.audio(audio_content, format=media_type, autoplay=True)
 
 def speech_to_text(audio_bytes):
     try:
@@ -149,9 +211,7 @@ def send_message():
     if user_input:
         ai_response = get_ai_response(user_input, st.session_state.candidate_token_data)
         if ai_response:
-             audio_content = text_to_speech(ai_response)
-             if audio_content:
-                 st.audio(audio_content, format="audio/mp3", autoplay=True)
+             play_response_audio(ai_response)
         st.session_state.user_input = ""
 
 # ---------------- ROUTING LOGIC ----------------
@@ -167,10 +227,13 @@ if token:
             resp = requests.get(f"{BACKEND_URL}/candidate/{token}")
             if resp.status_code == 200:
                 st.session_state.candidate_token_data = resp.json()
-                # Initial greeting
-                greeting = f"Hello {st.session_state.candidate_token_data['name']}! I'm your AI interviewer. I've reviewed your resume. Shall we begin?"
+                # Initial greeting (pre-rendered server side, so TTS is a cache hit)
+                greeting = st.session_state.candidate_token_data.get("greeting") or f"Hello {st.session_state.candidate_token_data['name']}! I'm your AI interviewer. I've reviewed your resume. Shall we begin?"
                 st.session_state.chat_history.append(f"Interviewer: {greeting}")
                 st.session_state.last_ai_response = greeting
+                greeting_audio, media_type = text_to_speech(greeting)
+                if greeting_audio:
+                    st.audio(greeting_audio, format=media_type, autoplay=True)
             else:
                 st.error("Invalid or expired interview link.")
                 st.stop()
@@ -190,9 +253,7 @@ if token:
             st.success(f"You said: {text}")
             ai_response = get_ai_response(text, st.session_state.candidate_token_data)
             if ai_response:
-                 audio_content = text_to_speech(ai_response)
-                 if audio_content:
-                     st.audio(audio_content, format="audio/mp3", autoplay=True)
+                 play_response_audio(ai_response)
     
     for msg in st.session_state.chat_history:
         if msg.startswith("Interviewer:"):
@@ -227,35 +288,45 @@ else:
             os.makedirs("resumes/rejected", exist_ok=True)
 
             progress = st.progress(0)
+            unsaved = []
             for i, file in enumerate(uploaded_files):
                 result = process_resume(file, job_description)
 
-                score = result.get("ats_score", 0)
-                if score >= 70:
-                    decision = "Accepted"
-                elif 60 <= score < 70:
-                    decision = "Review"
-                else:
-                    decision = "Rejected"
+                # The backend applies the job's thresholds; failed screenings come back without a decision.
+                decision = result.get("decision") or "Rejected"
                 result["decision"] = decision
+                if result.get("duplicate_of"):
+                    st.info(f"{file.name} matches candidate #{result['duplicate_of']} for this job; linked instead of re-screened.")
 
                 # Save file locally
                 save_path = f"resumes/{decision.lower()}/{file.name}"
                 with open(save_path, "wb") as f:
                     f.write(file.getvalue())
 
-                # Save to DB via API
-                if decision in ["Accepted", "Review"]:
-                    save_candidate_to_db(result, job_description)
+                # The backend's workflow saves accepted/review candidates itself (candidate_id);
+                # anything it couldn't save is sent in one bulk request below.
+                if decision in ["Accepted", "Review"] and not result.get("candidate_id"):
+                    unsaved.append(result)
 
                 st.session_state.results.append(result)
                 progress.progress((i+1)/len(uploaded_files))
 
+            if unsaved:
+                save_candidates_to_db(unsaved, job_description)
             st.success("✅ Resume processing completed!")
 
     # ---------------- DASHBOARD ----------------
-    # Fetch latest candidates from DB
-    candidates_data = get_candidates_from_db()
+    # Fetch latest candidates from DB; the backend applies the filters, so exports can reuse them.
+    jobs = get_jobs()
+    job_labels = {None: "All jobs", **{job["id"]: f"#{job['id']} {job['title'] or ''}".strip() for job in jobs}}
+    fcol1, fcol2, fcol3 = st.columns(3)
+    job_filter = fcol1.selectbox("Job", list(job_labels), format_func=job_labels.get)
+    decision_filter = fcol2.selectbox("Decision", ["All", "Accepted", "Review", "Rejected"])
+    min_score = fcol3.slider("Minimum ATS score", 0, 100, 0)
+    filters = {"job_id": job_filter, "decision": None if decision_filter == "All" else decision_filter,
+               "min_score": min_score or None}
+    filters = {key: value for key, value in filters.items() if value is not None}
+    candidates_data = get_candidates_from_db(filters)
     
     
     if candidates_data:
@@ -268,6 +339,9 @@ else:
         col4.metric("Rejected", (df["decision"] == "Rejected").sum())
         col5.metric("Avg ATS", round(df["ats_score"].mean(), 2))
         st.dataframe(df[["file_name", "ats_score", "decision", "email"]], use_container_width=True)
+        # The backend streams the file, so exports don't go through this page's memory.
+        for col, fmt in zip(st.columns(3), ("csv", "parquet", "jsonl")):
+            col.link_button(f"⬇️ Export {fmt.upper()}", f"{BACKEND_URL}/candidates/export?{urlencode({'format': fmt, **filters})}")
         
         st.markdown("---")
         st.subheader("📧 Send Interview Invites")
@@ -276,6 +350,21 @@ else:
         invite_candidates = [c for c in candidates_data if c["decision"] in ["Accepted", "Review"]]
         
         if invite_candidates:
+            with_email = [c["id"] for c in invite_candidates if c["email"]]
+            if st.button(f"📨 Invite all {len(with_email)} candidates with an email", disabled=not with_email):
+                job = invite_candidates_bulk(with_email)
+                if job:
+                    st.session_state.invite_job_id = job["job_id"]
+                    st.success(f"Queued {job['queued']} invites; they are sent in the background.")
+            if st.session_state.get("invite_job_id"):
+                status = get_invite_job(st.session_state.invite_job_id)
+                if status:
+                    st.progress((status["sent"] + status["failed"]) / max(status["total"], 1))
+                    st.caption(f"Invites: {status['sent']} sent, {status['failed']} failed, "
+                               f"{status['queued'] + status['sending']} pending")
+                    if status["status"] == "running":
+                        st.button("🔄 Refresh invite status")
+
             for cand in invite_candidates:
                 c_id = cand["id"]
                 c_name = cand["file_name"]
@@ -295,5 +384,7 @@ else:
         else:
             st.info("No candidates available for interview invites yet.")
 
+    elif filters:
+        st.info("No candidates match these filters.")
     else:
         st.info("Upload resumes and click *Analyze* to start.")
@@ -0,0 +1,43 @@
+"""
+Multi-worker deployment: gunicorn running uvicorn workers, with the app preloaded.
+
+    gunicorn backend.main:app          # from the repo root; this file is picked up automatically
+
+The master imports backend.main once (embedding model, STT/TTS engines, compiled
+graph) and then forks WEB_CONCURRENCY workers, which share those pages copy-on-write
+instead of each loading its own copy (the embedding weights are additionally memory-mapped
+from HR_MODEL_DIR, so even separately started processes share them). State that must agree across workers lives in
+SQLite: the invite queue and its sender lease, cache invalidations and run ownership
+(see core/shared_state.py and core/checkpoint.py).
+"""
+import gc
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()  # before core.config reads the environment
+
+from core.config import settings  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Screening a resume can take a while; don't let the arbiter kill a busy worker.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+
+def pre_fork(server, worker):
+    # Move everything the preload created out of the collector's reach, so a worker's GC
+    # passes don't write to (and thereby un-share) the pages it inherited.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # One torch pool per worker would claim every core; split the cores between workers instead.
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // settings.workers))
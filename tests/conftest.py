@@ -0,0 +1,16 @@
+"""
+Tests run against throwaway databases: every path in core.config is resolved under a
+temporary HR_DATA_DIR, set here before any test imports core or backend.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+DATA_DIR = tempfile.mkdtemp(prefix="hr-tests-")
+os.environ["HR_DATA_DIR"] = DATA_DIR
+for name in ("HR_DB_PATH", "HR_BLOB_DB", "HR_CHECKPOINT_DB", "HR_ARCHIVE_DB", "HR_SPOOL_DIR", "HR_TEMP_DIR",
+             "TTS_CACHE_DIR", "HR_MODEL_DIR"):
+    os.environ.pop(name, None)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,75 @@
+"""
+The backend must never block its event loop: blocking work (sqlite, SMTP, PDF and
+model calls) runs in threads, so a short sleep on the loop always wakes up on time.
+
+Drives backend.main:app in-process with the benchmark fakes (LLM, SMTP, TTS) while
+resumes are screened concurrently through /process_resume/, interview pages hit
+/candidate/{token} and the dashboard polls /candidates/, and asserts the worst
+loop stall stays under LOOP_LAG_BUDGET_MS.
+"""
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("sentence_transformers")
+httpx = pytest.importorskip("httpx")
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+from benchmarks.load_test import LoopLagMonitor, Recorder, dashboard, recruiter, seed_interview_candidates  # noqa: E402
+from benchmarks.synthetic import SIZES, job_description, make_pdf, resume_text  # noqa: E402
+
+LOOP_LAG_BUDGET_MS = float(os.getenv("LOOP_LAG_BUDGET_MS", "200"))
+RESUMES = 12
+INTERVIEW_PAGES = 8
+
+
+@pytest.fixture(scope="module")
+def backend():
+    install_fakes(llm_latency_ms=50, smtp_latency_ms=10, tts_latency_ms=20)
+    import backend.main as backend
+
+    install_fakes(llm_latency_ms=50, smtp_latency_ms=10, tts_latency_ms=20)
+    yield backend
+    backend.executor.shutdown(wait=True)
+
+
+async def interview_pages(client, recorder, tokens, rounds):
+    # Every Streamlit rerun of an interview page re-fetches its token: cache hits and misses.
+    for _ in range(rounds):
+        await asyncio.gather(*(recorder.call(client, "GET /candidate/{token}", "GET", f"/candidate/{token}")
+                               for token in tokens))
+        await asyncio.sleep(0.05)
+
+
+async def screen_concurrently(app, tokens):
+    recorder = Recorder()
+    lag = LoopLagMonitor(0.005)
+    jd_text = job_description(250)
+    sizes = list(SIZES)
+    pdfs = [(f"lag_{i}.pdf", make_pdf(resume_text(SIZES[sizes[i % len(sizes)]], 70_000 + i))) for i in range(RESUMES)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://looplag", timeout=120) as client:
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(lag.run(stop))
+        poller = asyncio.create_task(dashboard(client, recorder, stop, 0.2))
+        await asyncio.gather(
+            recruiter(client, recorder, pdfs, jd_text, concurrency=4),
+            interview_pages(client, recorder, tokens, rounds=5),
+        )
+        stop.set()
+        await poller
+        await monitor
+    return recorder, lag
+
+
+def test_event_loop_never_blocked_during_concurrent_screening(backend):
+    tokens = seed_interview_candidates(backend.DB_PATH, INTERVIEW_PAGES, job_description(250))
+    recorder, lag = asyncio.run(screen_concurrently(backend.app, tokens))
+
+    report = recorder.report()
+    assert report["POST /process_resume/"]["error_rate"] == 0, report["POST /process_resume/"]["status"]
+    assert report["GET /candidate/{token}"]["error_rate"] == 0, report["GET /candidate/{token}"]["status"]
+    worst = lag.report()["max_ms"]
+    assert worst < LOOP_LAG_BUDGET_MS, f"event loop blocked for {worst:.1f}ms (budget {LOOP_LAG_BUDGET_MS:.0f}ms)"